@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: JSON extraction from multi-KB agent transcripts.
+
+Compares the old ``json.loads`` + greedy-regex fallback against
+``pipeline.parsing.parse_json_result``.
+
+    python benchmarks/json_extract.py [--sizes 4 16 64] [--repeat 200]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import timeit
+
+from pipeline.parsing import TEST_RESULT, parse_json_result
+
+RESULT = {"total": 42, "passed": 41, "failed": 1, "coverage": 87.5}
+
+
+def legacy_parse(result: object) -> object:
+    raw = str(result)
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        try:
+            match = re.search(r"(\{.*\}|\[.*\])", raw, re.DOTALL)
+            if match:
+                return json.loads(match.group(1))
+        except Exception:  # noqa: S110 - reproduces the old behaviour
+            pass
+    return None
+
+
+def transcript(kib: int, seed: int = 0) -> str:
+    """A ReAct-style transcript of roughly ``kib`` KiB ending in a fenced result."""
+    rng = random.Random(seed)  # noqa: S311 - test data, not crypto
+    parts: list[str] = []
+    size = 0
+    while size < kib * 1024:
+        step = (
+            f"Thought: run pytest on shard {rng.randint(0, 9)} [attempt {rng.randint(1, 3)}]\n"
+            f'Action Input: {{"path": "tests/test_{rng.randint(0, 99)}.py", "args": ["-q"]}}\n'
+            f"Observation: {'.' * rng.randint(20, 80)} ({rng.randint(1, 9)} passed)\n"
+        )
+        parts.append(step)
+        size += len(step)
+    parts.append(f"Final Answer:\n```json\n{json.dumps(RESULT)}\n```\nLet me know {{if}} needed.")
+    return "".join(parts)
+
+
+def single(kib: int) -> str:
+    """Plain prose with one JSON object at the end; both parsers should succeed."""
+    return "All shards ran cleanly. " * (kib * 1024 // 24) + json.dumps(RESULT)
+
+
+def truncated(kib: int) -> str:
+    """Output cut off mid-answer: many openers and no closing bracket."""
+    return 'Partial {"log": ' * (kib * 1024 // 16)
+
+
+SCENARIOS = {"transcript": transcript, "single": single, "truncated": truncated}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64], help="KiB")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    parse_json_result("{}", TEST_RESULT)  # build the schema validator outside the timings
+    print(
+        f"{'scenario':<11} {'size':>6} {'legacy µs':>12} {'stream µs':>12} "
+        f"{'legacy ok':>10} {'stream ok':>10}"
+    )
+    for name, make in SCENARIOS.items():
+        expected = None if name == "truncated" else RESULT
+        for kib in args.sizes:
+            text = make(kib)
+            legacy = timeit.timeit(lambda t=text: legacy_parse(t), number=args.repeat)
+            stream = timeit.timeit(
+                lambda t=text: parse_json_result(t, TEST_RESULT), number=args.repeat
+            )
+            print(
+                f"{name:<11} {kib:>4}KB {legacy / args.repeat * 1e6:>12.1f} "
+                f"{stream / args.repeat * 1e6:>12.1f} "
+                f"{legacy_parse(text) == expected!s:>10} "
+                f"{parse_json_result(text, TEST_RESULT) == expected!s:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
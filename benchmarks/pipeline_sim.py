@@ -0,0 +1,295 @@
+"""
+End-to-end pipeline benchmark with simulated agents.
+
+Runs ``build_graph()`` in live mode with every Crew replaced by a fake that
+sleeps for a log-normally distributed latency and fails at a configurable
+rate. The planner returns ``N`` tickets with a random dependency DAG. Each
+scenario runs in a fresh process, so peak RSS and module-level state belong to
+that run alone. The report gives throughput, p50/p95 ticket latency, the
+graph and scheduler overhead on top of the simulated agent time, peak memory
+and checkpoint size.
+
+    python benchmarks/pipeline_sim.py [--tickets 10 100 1000] [--async]
+        [--parallel 4] [--latency-scale 1.0] [--fail-rate 0.05] [--output results.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Median latency per agent role in seconds, before --latency-scale.
+MEDIANS = {"planner": 0.05, "coder": 0.02, "tester": 0.01, "reviewer": 0.01, "notifier": 0.005}
+
+
+@dataclass
+class Scenario:
+    tickets: int
+    parallel: int = 4
+    use_async: bool = False
+    latency_scale: float = 1.0
+    sigma: float = 0.5
+    fail_rate: float = 0.05
+    max_deps: int = 3
+    seed: int = 0
+    medians: dict[str, float] = field(default_factory=lambda: dict(MEDIANS))
+
+
+def random_dag(n: int, max_deps: int, rng: random.Random) -> list[dict[str, Any]]:
+    """Tickets whose dependencies all point at earlier tickets, so the graph is acyclic."""
+    tickets = []
+    for i in range(n):
+        earlier = rng.sample(range(i), k=min(i, rng.randint(0, max_deps)))
+        tickets.append({
+            "gid": f"t{i}",
+            "title": f"Ticket {i}",
+            "dependencies": [f"t{j}" for j in sorted(earlier)],
+            "complexity": rng.choice("SML"),
+        })
+    return tickets
+
+
+class FakeAgents:
+    """Stand-ins for ``make_*``, ``Task`` and ``Crew`` in ``pipeline.graph.nodes``."""
+
+    def __init__(self, scenario: Scenario) -> None:
+        self.scenario = scenario
+        self.rng = random.Random(scenario.seed)  # noqa: S311 - simulation, not crypto
+        self.lock = threading.Lock()
+        self.simulated: dict[str | None, float] = {}  # gid -> seconds slept in fake crews
+        self.calls: dict[str, int] = {}
+
+    def latency(self, role: str) -> float:
+        median = self.scenario.medians[role] * self.scenario.latency_scale
+        with self.lock:
+            return median * self.rng.lognormvariate(0, self.scenario.sigma)
+
+    def fails(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.scenario.fail_rate
+
+    def output(self, role: str, description: str) -> str:
+        if role == "planner":
+            rng = random.Random(self.scenario.seed)  # noqa: S311
+            return json.dumps(random_dag(self.scenario.tickets, self.scenario.max_deps, rng))
+        if role == "coder":
+            gid = description.split("(GID: ", 1)[1].split(")", 1)[0]
+            return json.dumps({"branch": f"feature/ticket-{gid}", "pr_number": "1"})
+        if role == "tester":
+            failed = int(self.fails())
+            return json.dumps({"total": 10, "passed": 10 - failed, "failed": failed,
+                               "coverage": round(80 + 20 * self.rng.random(), 1)})
+        if role == "reviewer":
+            return json.dumps({"approved": not self.fails(), "reason": "simulated"})
+        return "posted"
+
+    def _record(self, role: str, seconds: float) -> None:
+        from pipeline.metrics import current_span
+
+        span = current_span()
+        with self.lock:
+            self.calls[role] = self.calls.get(role, 0) + 1
+            gid = span.gid if span is not None else None
+            self.simulated[gid] = self.simulated.get(gid, 0.0) + seconds
+
+    def agent(self, role: str):
+        return lambda *_args, **_kwargs: role
+
+    def task(self, *, description: str, agent: str, **_kwargs: object) -> tuple[str, str]:
+        return agent, description
+
+    def crew(self, *, tasks: list[tuple[str, str]], **_kwargs: object) -> FakeCrew:
+        role, description = tasks[0]
+        return FakeCrew(self, role, description)
+
+    def install(self) -> None:
+        from pipeline.graph import nodes
+
+        nodes.make_planner = self.agent("planner")
+        nodes.make_coder = self.agent("coder")
+        nodes.make_tester = self.agent("tester")
+        nodes.make_reviewer = self.agent("reviewer")
+        nodes.make_notifier = self.agent("notifier")
+        nodes.Task = self.task
+        nodes.Crew = self.crew
+
+
+class FakeCrew:
+    def __init__(self, agents: FakeAgents, role: str, description: str) -> None:
+        self.agents = agents
+        self.role = role
+        self.description = description
+
+    def kickoff(self) -> str:
+        seconds = self.agents.latency(self.role)
+        time.sleep(seconds)
+        self.agents._record(self.role, seconds)
+        return self.agents.output(self.role, self.description)
+
+    async def kickoff_async(self) -> str:
+        seconds = self.agents.latency(self.role)
+        await asyncio.sleep(seconds)
+        self.agents._record(self.role, seconds)
+        return self.agents.output(self.role, self.description)
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    from pipeline.metrics import percentile
+
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "max": round(max(values, default=0.0), 4),
+    }
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _drive(graph, inputs: dict | None, config: dict, use_async: bool) -> None:
+    if use_async:
+        async def consume(value: dict | None) -> None:
+            async for _ in graph.astream(value, config=config, stream_mode="updates"):
+                pass
+        asyncio.run(consume(inputs))
+    else:
+        for _ in graph.stream(inputs, config=config, stream_mode="updates"):
+            pass
+
+
+def run_scenario(scenario: Scenario) -> dict[str, Any]:
+    """One end-to-end run in the current process; call it in a fresh one."""
+    from pipeline.config import settings
+
+    workdir = Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+    os.chdir(workdir)  # logs/ and .pipeline/ land in the scratch directory
+    Path("SPEC.md").write_text("# Benchmark\n\nSimulated spec.\n", encoding="utf-8")
+    for name, value in {
+        "dry_run": False, "cache_enabled": False, "incremental_planning": False,
+        "review_gate": False, "llm_notifier": False, "metrics_export_path": "",
+        "retry_backoff_base": scenario.medians["coder"] * scenario.latency_scale,
+        "asana_access_token": "", "slack_bot_token": "",
+        "max_parallel_coders": scenario.parallel,
+        "max_concurrent_agents": max(settings.max_concurrent_agents, scenario.parallel),
+        "checkpoint_backend": "sqlite", "checkpoint_path": str(workdir / "checkpoints.sqlite"),
+    }.items():
+        setattr(settings, name, value)
+
+    from pipeline.graph.pipeline_graph import build_graph, finish_run, start_run
+    from pipeline.metrics import get_run_metrics
+
+    fakes = FakeAgents(scenario)
+    fakes.install()
+    graph = build_graph()
+    run_id, config, inputs = start_run(graph, "SPEC.md", None, False)
+
+    started = time.perf_counter()
+    _drive(graph, inputs, config, scenario.use_async)
+    graph.update_state(config, {"human_approved": True})  # the human gate interrupts live runs
+    _drive(graph, None, config, scenario.use_async)
+    wall = time.perf_counter() - started
+
+    spans = [s for s in get_run_metrics(run_id).spans if s.node == "process_ticket"]
+    final = {t["gid"]: t["status"] for t in graph.get_state(config).values["failed_tickets"]}
+    final.update({t["gid"]: t["status"] for t in graph.get_state(config).values["completed_tickets"]
+                  if t["status"] == "approved"})
+    finish_run(graph, run_id)
+
+    checkpoint_bytes = sum(p.stat().st_size for p in workdir.glob("checkpoints.sqlite*"))
+    os.chdir(tempfile.gettempdir())
+    shutil.rmtree(workdir, ignore_errors=True)
+    approved = sum(status == "approved" for status in final.values())
+    overhead = [
+        max(0.0, s.wall - s.queue_wait - fakes.simulated.get(s.gid, 0.0)) for s in spans
+    ]
+    return {
+        "scenario": asdict(scenario),
+        "wall_seconds": round(wall, 3),
+        "tickets_processed": len(spans),
+        "tickets_approved": approved,
+        "throughput_per_second": round(len(spans) / wall, 2) if wall else 0.0,
+        "ticket_latency": _percentiles([s.wall for s in spans]),
+        "ticket_queue_wait": _percentiles([s.queue_wait for s in spans]),
+        "ticket_overhead": _percentiles(overhead),
+        "simulated_agent_seconds": round(sum(fakes.simulated.values()), 3),
+        "crew_calls": fakes.calls,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "checkpoint_bytes": checkpoint_bytes,
+    }
+
+
+def _git_sha() -> str:
+    proc = subprocess.run(
+        ["git", "rev-parse", "HEAD"],  # noqa: S607 - benchmark metadata only
+        capture_output=True, text=True, check=False,
+        cwd=Path(__file__).resolve().parent,
+    )
+    return proc.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--parallel", type=int, default=4, help="max_parallel_coders")
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="multiplies the per-role median latencies")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal shape")
+    parser.add_argument("--fail-rate", type=float, default=0.05,
+                        help="chance that a test run or a review fails")
+    parser.add_argument("--max-deps", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print(f"{'tickets':>8} {'approved':>9} {'wall s':>8} {'tickets/s':>10} {'p50 s':>8} "
+          f"{'p95 s':>8} {'ovh p95':>8} {'peak MB':>8} {'ckpt KB':>9}")
+    for n in args.tickets:
+        scenario = Scenario(
+            tickets=n, parallel=args.parallel, use_async=args.use_async,
+            latency_scale=args.latency_scale, sigma=args.sigma, fail_rate=args.fail_rate,
+            max_deps=args.max_deps, seed=args.seed,
+        )
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_scenario, scenario).result()
+        results.append(result)
+        print(
+            f"{n:>8} {result['tickets_approved']:>9} {result['wall_seconds']:>8.2f} "
+            f"{result['throughput_per_second']:>10.2f} {result['ticket_latency']['p50']:>8.3f} "
+            f"{result['ticket_latency']['p95']:>8.3f} {result['ticket_overhead']['p95']:>8.3f} "
+            f"{result['peak_rss_bytes'] / 2**20:>8.1f} {result['checkpoint_bytes'] / 1024:>9.1f}"
+        )
+
+    if args.output:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_sha": _git_sha(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
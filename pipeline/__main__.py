@@ -0,0 +1,34 @@
+"""
+``pipeline`` command line.
+
+    pipeline run [--spec SPEC.md] [--async] [--resume RUN_ID [--approve]]
+    pipeline batch "specs/*.md" [--max-runs N]
+    pipeline worker [--processes N] [--concurrency N]
+"""
+from __future__ import annotations
+
+import argparse
+
+
+def main(argv: list[str] | None = None) -> None:
+    from pipeline import batch, worker
+    from pipeline.graph import pipeline_graph
+
+    parser = argparse.ArgumentParser(prog="pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="plan, code, test and review a spec")
+    pipeline_graph.add_arguments(run)
+    run.set_defaults(main=pipeline_graph.main)
+    many = commands.add_parser("batch", help="run every spec matching a glob concurrently")
+    batch.add_arguments(many)
+    many.set_defaults(main=batch.main)
+    serve = commands.add_parser("worker", help="run ticket jobs from the job queue")
+    worker.add_arguments(serve)
+    serve.set_defaults(main=worker.main)
+
+    args = parser.parse_args(argv)
+    args.main(args)
+
+
+if __name__ == "__main__":
+    main()
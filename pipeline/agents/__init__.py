@@ -1,11 +1,21 @@
 """
 Expose agent factory functions from their respective modules.
+
+The factories are imported on first access: each agent module pulls in
+crewai and the Anthropic SDK, which would otherwise be paid by every process
+that merely imports the graph, including dry runs and ``--help``.
 """
-from pipeline.agents.coder import make_coder
-from pipeline.agents.notifier import make_notifier
-from pipeline.agents.planner import make_planner
-from pipeline.agents.reviewer import make_reviewer
-from pipeline.agents.tester import make_tester
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pipeline.agents.coder import make_coder
+    from pipeline.agents.notifier import make_notifier
+    from pipeline.agents.planner import make_planner
+    from pipeline.agents.reviewer import make_reviewer
+    from pipeline.agents.tester import make_tester
 
 __all__ = [
     "make_coder",
@@ -14,3 +24,15 @@ __all__ = [
     "make_reviewer",
     "make_tester",
 ]
+
+# make_coder lives in pipeline.agents.coder, and so on.
+_FACTORIES = {name: f"{__name__}.{name.removeprefix('make_')}" for name in __all__}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401 - module attribute hook
+    module = _FACTORIES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    factory = getattr(importlib.import_module(module), name)
+    globals()[name] = factory
+    return factory
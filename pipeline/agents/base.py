@@ -1,12 +1,203 @@
-from langchain_anthropic import ChatAnthropic
+"""
+Process-wide LLM client registry.
+
+Every agent used to get a fresh LLM with its own HTTP connection pool, so each
+ticket branch paid client construction and a TLS handshake per agent. The
+registry owns one keep-alive HTTP transport (sized by ``llm_pool_size``) and
+hands out one CrewAI LLM per role and set of ``llm_overrides`` (model,
+temperature, max_tokens) that shares it; overrides never rebuild the transport.
+
+``stable_backstory`` keeps each role's system prompt identical across tickets
+so the provider's prompt cache can serve it.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import anthropic
+from crewai.llms.providers.anthropic.completion import AnthropicCompletion
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import Field
 
 from pipeline.config import settings
+from pipeline.metrics import record_llm
+
+ROLE_OVERRIDE_KEYS = frozenset({"model", "temperature", "max_tokens"})
+DEFAULT_TEMPERATURE = 0.2
+
+# Newer SDKs no longer take sampling parameters as ``messages.create`` arguments;
+# the API still accepts them in the request body.
+_SAMPLING_KEYS = ("temperature", "top_p")
+_SDK_TAKES_SAMPLING = "temperature" in inspect.signature(
+    anthropic.resources.Messages.create
+).parameters
+
+
+class LLMRegistry:
+    """Shared Anthropic transport plus a per-role cache of CrewAI LLMs."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None = None,
+        pool_size: int = 20,
+        timeout: float = 600.0,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        # The SDK pins its own httpx flavour; build limits from the same class it uses.
+        self._limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+        )
+        self._lock = threading.Lock()
+        self._llms: dict[tuple, PooledAnthropicLLM] = {}
+
+    @cached_property
+    def http_client(self) -> anthropic.DefaultHttpxClient:
+        return anthropic.DefaultHttpxClient(limits=self._limits, timeout=self.timeout)
+
+    @cached_property
+    def async_http_client(self) -> anthropic.DefaultAsyncHttpxClient:
+        return anthropic.DefaultAsyncHttpxClient(limits=self._limits, timeout=self.timeout)
+
+    @cached_property
+    def client(self) -> anthropic.Client:
+        return anthropic.Client(
+            api_key=self.api_key, base_url=self.base_url, http_client=self.http_client
+        )
+
+    @cached_property
+    def async_client(self) -> anthropic.AsyncClient:
+        return anthropic.AsyncClient(
+            api_key=self.api_key, base_url=self.base_url, http_client=self.async_http_client
+        )
+
+    def get(self, role: str = "default", **overrides: str | float | int) -> PooledAnthropicLLM:
+        """Return the cached LLM for ``role`` and ``overrides``, creating it on first use."""
+        unknown = overrides.keys() - ROLE_OVERRIDE_KEYS
+        if unknown:
+            raise ValueError(f"Unsupported LLM overrides for {role}: {', '.join(sorted(unknown))}")
+
+        key = (role, *sorted(overrides.items()))
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                params: dict[str, Any] = {
+                    "model": settings.model,
+                    "temperature": DEFAULT_TEMPERATURE,
+                    **overrides,
+                }
+                llm = self._llms[key] = PooledAnthropicLLM(
+                    registry=self, api_key=self.api_key, base_url=self.base_url, **params
+                )
+            return llm
+
+    def close(self) -> None:
+        """Drop cached models and close the sync transport."""
+        with self._lock:
+            self._llms.clear()
+            http_client = self.__dict__.pop("http_client", None)
+            if http_client is not None:
+                http_client.close()
+            for name in ("client", "async_http_client", "async_client"):
+                self.__dict__.pop(name, None)
+
+
+# AnthropicCompletion methods overridden below. They are private to CrewAI, so
+# pyproject pins its minor version and a test checks that they still exist.
+CREWAI_HOOKS = (
+    "_build_sync_client",
+    "_build_async_client",
+    "_track_token_usage_internal",
+    "_prepare_completion_params",
+)
+
+
+class PooledAnthropicLLM(AnthropicCompletion):
+    """
+    CrewAI's native Anthropic LLM, with its SDK clients borrowed from an
+    ``LLMRegistry``. Being a ``BaseLLM``, an Agent uses it as it is instead of
+    building its own LLM from the model name.
+
+    One instance serves every crew of its role, so its lifetime token counters
+    (and the ``token_usage`` a crew derives from them) cover all of them. Each
+    call's usage is recorded on the metrics span that made it instead.
+    """
+
+    registry: LLMRegistry | None = Field(default=None, exclude=True)
+
+    def _build_sync_client(self) -> anthropic.Client:
+        if self.registry is None:
+            return super()._build_sync_client()
+        return self.registry.client
+
+    def _build_async_client(self) -> anthropic.AsyncClient:
+        if self.registry is None:
+            return super()._build_async_client()
+        return self.registry.async_client
+
+    def _track_token_usage_internal(self, usage_data: dict[str, Any]) -> None:
+        super()._track_token_usage_internal(usage_data)
+        record_llm(UsageMetrics.from_provider_dict(usage_data), self.model)
+
+    def _prepare_completion_params(self, *args: object, **kwargs: object) -> dict[str, Any]:
+        params = super()._prepare_completion_params(*args, **kwargs)
+        if not _SDK_TAKES_SAMPLING:
+            sampling = {k: params.pop(k) for k in _SAMPLING_KEYS if k in params}
+            if sampling:
+                params["extra_body"] = {**params.get("extra_body", {}), **sampling}
+        return params
+
+
+_registry: LLMRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMRegistry(
+                api_key=settings.anthropic_api_key,
+                base_url=settings.anthropic_base_url,
+                pool_size=settings.llm_pool_size,
+            )
+        return _registry
+
+
+def get_llm(role: str = "default") -> PooledAnthropicLLM:
+    """Shared LLM configuration for all agents, with per-role overrides from settings."""
+    return get_llm_registry().get(role, **settings.llm_overrides.get(role, {}))
+
+
+# ── Stable prompt prefixes ────────────────────────────────────────────────────
+
+@functools.cache
+def _conventions(path: str) -> str:
+    if not path or not Path(path).is_file():
+        return ""
+    return Path(path).read_text(encoding="utf-8").strip()
+
 
+def stable_backstory(backstory: str) -> str:
+    """
+    ``backstory`` followed by the target repo's conventions (``repo_conventions_path``).
 
-def get_llm() -> ChatAnthropic:
-    """Shared LLM configuration for all agents."""
-    return ChatAnthropic(
-        model=settings.model,
-        anthropic_api_key=settings.anthropic_api_key,
-        temperature=0.2,
-    )
+    CrewAI renders role, goal, backstory and the tool schemas into the system
+    prompt and marks its end as a cache breakpoint, which the Anthropic provider
+    sends as ``cache_control``. The prefix is only reused if it is byte-identical,
+    so nothing that varies per ticket may go into an agent: ids, titles and
+    branches belong in the task description, which comes after it.
+    """
+    conventions = _conventions(settings.repo_conventions_path)
+    if not conventions:
+        return backstory
+    return f"{backstory}\n\nConventions of the repository you work on:\n{conventions}"
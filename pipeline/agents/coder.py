@@ -1,23 +1,30 @@
 from crewai import Agent
 
-from pipeline.agents.base import get_llm
+from pipeline.agents.base import get_llm, stable_backstory
 from pipeline.tools.git_tools import CommitFileTool, CreateBranchTool, OpenPRTool
 
 
 def make_coder(ticket_id: str) -> Agent:
-    """Implements a single ticket on a feature branch."""
+    """
+    Implements a single ticket on a feature branch. ``ticket_id`` only binds the
+    tools to the ticket's worktree; the prompt is the same for every ticket.
+    """
     return Agent(
         role="Software Engineer",
         goal=(
-            f"Implement ticket {ticket_id} by creating or modifying the relevant files on a "
-            "feature branch, then open a pull request."
+            "Implement the ticket described in your task by creating or modifying the relevant "
+            "files on a feature branch, then open a pull request."
         ),
-        backstory=(
+        backstory=stable_backstory(
             "You are a pragmatic backend engineer. You write clean, tested Python. You never modify "
             "files outside the scope of your ticket. Your PRs are small, focused, and always green."
         ),
-        tools=[CreateBranchTool(), CommitFileTool(), OpenPRTool()],
-        llm=get_llm(),
+        tools=[
+            CreateBranchTool(ticket_id=ticket_id),
+            CommitFileTool(ticket_id=ticket_id),
+            OpenPRTool(ticket_id=ticket_id),
+        ],
+        llm=get_llm("coder"),
         verbose=True,
         max_iter=8,
     )
@@ -20,7 +20,7 @@ def make_notifier() -> Agent:
             "what they need to know in under 10 lines."
         ),
         tools=[GitBlameTool(), PostSlackMessageTool()],
-        llm=get_llm(),
+        llm=get_llm("notifier"),
         verbose=True,
         max_iter=3,
     )
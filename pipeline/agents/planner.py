@@ -1,7 +1,7 @@
 from crewai import Agent
 
-from pipeline.agents.base import get_llm
-from pipeline.tools.asana_tools import CreateTicketTool, UpdateTicketTool
+from pipeline.agents.base import get_llm, stable_backstory
+from pipeline.tools.asana_tools import CreateTicketsTool, CreateTicketTool, UpdateTicketTool
 
 
 def make_planner() -> Agent:
@@ -13,13 +13,13 @@ def make_planner() -> Agent:
             "tickets, create them in Asana with acceptance criteria and dependency links, and return "
             "a JSON list of ticket GIDs in topological order."
         ),
-        backstory=(
+        backstory=stable_backstory(
             "You are a senior staff engineer who excels at breaking vague requirements into crisp, "
             "small tasks. You think in dependency graphs and know how to scope tickets so a single "
             "developer can finish one in under half a day."
         ),
-        tools=[CreateTicketTool(), UpdateTicketTool()],
-        llm=get_llm(),
+        tools=[CreateTicketsTool(), CreateTicketTool(), UpdateTicketTool()],
+        llm=get_llm("planner"),
         verbose=True,
         max_iter=5,
     )
@@ -1,6 +1,6 @@
 from crewai import Agent
 
-from pipeline.agents.base import get_llm
+from pipeline.agents.base import get_llm, stable_backstory
 from pipeline.tools.git_tools import GitBlameTool
 
 
@@ -12,12 +12,12 @@ def make_reviewer() -> Agent:
             "Analyse the PR diff. Reject if: diff > 400 lines, coverage decreased, or ruff reports "
             "errors. Approve otherwise. Post a structured review comment."
         ),
-        backstory=(
+        backstory=stable_backstory(
             "You are a meticulous reviewer who cares about maintainability and test coverage. "
             "You give specific, actionable feedback and never approve code that lowers quality."
         ),
         tools=[GitBlameTool()],
-        llm=get_llm(),
+        llm=get_llm("reviewer"),
         verbose=True,
         max_iter=3,
     )
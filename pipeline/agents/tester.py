@@ -1,6 +1,6 @@
 from crewai import Agent
 
-from pipeline.agents.base import get_llm
+from pipeline.agents.base import get_llm, stable_backstory
 from pipeline.tools.test_tools import RunTestsTool
 
 
@@ -12,12 +12,12 @@ def make_tester() -> Agent:
             "Check out the feature branch, run the full pytest suite with coverage, and return a "
             "structured pass/fail/coverage report."
         ),
-        backstory=(
+        backstory=stable_backstory(
             "You are obsessive about test quality. You run tests, read failures carefully, and "
             "produce concise, actionable reports. You never mark a branch as passing if any test fails."
         ),
         tools=[RunTestsTool()],
-        llm=get_llm(),
+        llm=get_llm("tester"),
         verbose=True,
         max_iter=3,
     )
@@ -0,0 +1,290 @@
+"""
+Batched Asana client.
+
+All calls share one keep-alive ``httpx.Client``, pass through a token bucket
+sized to Asana's per-minute quota, and retry with exponential backoff plus full
+jitter (honouring ``Retry-After``). Idempotent methods are retried on 429, 5xx
+and transport failures. A POST, which may already have been applied when it
+fails, is only retried on 429 or when the connection was never made. Bulk work
+goes through Asana's batch endpoint, ten actions per request: creating tasks,
+linking dependencies and applying status changes. Asana counts each action of a
+batch against the quota, so the bucket is charged per action, not per request.
+Status updates from the graph nodes are queued and coalesced by
+``StatusUpdater``, which flushes them from a background thread in batches and
+logs the ones that fail.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from pipeline.config import settings
+from pipeline.ratelimit import TokenBucket
+
+BATCH_LIMIT = 10  # actions per /batch request, fixed by Asana
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+logger = logging.getLogger(__name__)
+
+
+class AsanaError(RuntimeError):
+    pass
+
+
+class AsanaClient:
+    def __init__(
+        self,
+        token: str,
+        base_url: str = "https://app.asana.com/api/1.0",
+        requests_per_minute: float = 150,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # Asana counts every action of a batch against the quota; a full batch
+        # must fit in the bucket.
+        self.bucket = TokenBucket(
+            requests_per_minute / 60, capacity=max(BATCH_LIMIT, requests_per_minute / 10)
+        )
+        self.http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+            timeout=timeout,
+        )
+
+    def close(self) -> None:
+        self.http.close()
+
+    def _delay(self, attempt: int, response: httpx.Response | None) -> float:
+        if response is not None and "Retry-After" in response.headers:
+            try:
+                return float(response.headers["Retry-After"])
+            except ValueError:
+                pass
+        return random.uniform(0, self.backoff * 2**attempt)  # noqa: S311 - jitter, not crypto
+
+    @staticmethod
+    def _retryable(
+        method: str, response: httpx.Response | None, error: httpx.TransportError | None
+    ) -> bool:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            # Without a connection Asana cannot have applied the request.
+            return idempotent or isinstance(error, httpx.ConnectError | httpx.ConnectTimeout)
+        if response.status_code not in RETRY_STATUSES:
+            return False
+        return idempotent or response.status_code == 429
+
+    def request(
+        self, method: str, path: str, data: object = None, cost: int = 1
+    ) -> Any:  # noqa: ANN401 - JSON
+        """One API call, charged as ``cost`` requests; returns the response's ``data``."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire(cost)
+            response = error = None
+            try:
+                response = self.http.request(
+                    method, path, json={"data": data} if data is not None else None
+                )
+            except httpx.TransportError as e:
+                error = e
+            if attempt == self.max_retries or not self._retryable(method, response, error):
+                break
+            time.sleep(self._delay(attempt, response))
+
+        if error is not None:
+            raise AsanaError(f"{method} {path}: {error}") from error
+        if response.status_code >= 400:
+            raise AsanaError(f"{method} {path}: {response.status_code} {response.text[:200]}")
+        return response.json().get("data")
+
+    def batch(self, actions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Run actions (``method``, ``relative_path``, ``data``) ten per request, in order."""
+        results: list[dict[str, Any]] = []
+        for i in range(0, len(actions), BATCH_LIMIT):
+            chunk = actions[i : i + BATCH_LIMIT]
+            results += self.request("POST", "/batch", {"actions": chunk}, cost=len(chunk))
+        return results
+
+    def create_tasks(self, tasks: list[dict[str, Any]]) -> list[str]:
+        """Create tasks (``name``, ``notes``, ...) in the configured project; return their gids."""
+        actions = [
+            {
+                "method": "post",
+                "relative_path": "/tasks",
+                "data": {"projects": [settings.asana_project_gid], **task},
+            }
+            for task in tasks
+        ]
+        gids = []
+        for task, result in zip(tasks, self.batch(actions), strict=True):
+            if result.get("status_code", 500) >= 400:
+                raise AsanaError(f"creating {task.get('name')!r} failed: {result.get('body')}")
+            gids.append(result["body"]["data"]["gid"])
+        return gids
+
+    def add_dependencies(self, links: dict[str, list[str]]) -> None:
+        """``{task_gid: [gids it depends on]}``, one batched action per task."""
+        actions = [
+            {
+                "method": "post",
+                "relative_path": f"/tasks/{gid}/addDependencies",
+                "data": {"dependencies": deps},
+            }
+            for gid, deps in links.items()
+            if deps
+        ]
+        self._check(self.batch(actions), "linking dependencies")
+
+    def update_statuses(self, statuses: dict[str, str]) -> None:
+        """Apply pipeline statuses: a comment, completion and an optional section move."""
+        actions: list[dict[str, Any]] = []
+        for gid, status in statuses.items():
+            actions.append({
+                "method": "post",
+                "relative_path": f"/tasks/{gid}/stories",
+                "data": {"text": f"Pipeline status: {status}"},
+            })
+            actions.append({
+                "method": "put",
+                "relative_path": f"/tasks/{gid}",
+                "data": {"completed": status == "approved"},
+            })
+            section = settings.asana_status_sections.get(status)
+            if section:
+                actions.append({
+                    "method": "post",
+                    "relative_path": f"/sections/{section}/addTask",
+                    "data": {"task": gid},
+                })
+        self._check(self.batch(actions), "updating statuses")
+
+    @staticmethod
+    def _check(results: list[dict[str, Any]], what: str) -> None:
+        failed = [r for r in results if r.get("status_code", 500) >= 400]
+        if failed:
+            first = failed[0].get("body")
+            raise AsanaError(f"{what}: {len(failed)} action(s) failed, first: {first}")
+
+
+_client: AsanaClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_asana_client() -> AsanaClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AsanaClient(
+                settings.asana_access_token,
+                base_url=settings.asana_base_url,
+                requests_per_minute=settings.asana_requests_per_minute,
+                max_retries=settings.asana_max_retries,
+            )
+        return _client
+
+
+def asana_enabled() -> bool:
+    return settings.is_live and bool(settings.asana_access_token)
+
+
+# ── Status updates ────────────────────────────────────────────────────────────
+
+class StatusUpdater(threading.Thread):
+    """Coalesces queued (gid, status) pairs and applies them in batches."""
+
+    def __init__(
+        self, client: AsanaClient, max_pending: int = BATCH_LIMIT, interval: float = 2.0
+    ) -> None:
+        super().__init__(name="asana-status-updater", daemon=True)
+        self.client = client
+        self.max_pending = max_pending
+        self.interval = interval
+        self._queue: queue.Queue[tuple[str, str] | threading.Event | None] = queue.Queue()
+
+    def submit(self, gid: str, status: str) -> None:
+        self._queue.put((gid, status))
+
+    def flush(self, timeout: float | None = None) -> None:
+        if not self.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def stop(self) -> None:
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+    def run(self) -> None:
+        pending: dict[str, str] = {}
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, tuple) and item:
+                gid, status = item
+                pending[gid] = status  # only the latest status per ticket is sent
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+                if len(pending) < self.max_pending and time.monotonic() < deadline:
+                    continue
+
+            if pending:
+                try:
+                    self.client.update_statuses(pending)
+                except AsanaError as e:
+                    logger.warning("Asana status update failed: %s", e)
+            pending, deadline = {}, None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+
+_updater: StatusUpdater | None = None
+_updater_lock = threading.Lock()
+
+
+def queue_status(gid: str, status: str) -> None:
+    """Record a ticket status change in Asana (batched); a no-op without Asana credentials."""
+    global _updater
+    if not asana_enabled():
+        return
+    with _updater_lock:
+        if _updater is None or not _updater.is_alive():
+            _updater = StatusUpdater(get_asana_client())
+            _updater.start()
+        updater = _updater
+    updater.submit(gid, status)
+
+
+def flush_status_updates(timeout: float | None = None) -> None:
+    if _updater is not None:
+        _updater.flush(timeout)
+
+
+def shutdown_status_updates() -> None:
+    global _updater
+    with _updater_lock:
+        updater, _updater = _updater, None
+    if updater is not None:
+        updater.stop()
+
+
+atexit.register(shutdown_status_updates)
@@ -0,0 +1,258 @@
+"""
+Test-result and coverage store keyed by commit.
+
+A row holds the tester's full result (``TestResult`` fields plus per-file
+coverage) for one (repo, commit sha, test-selection hash). A commit's results
+never change, so the tester skips re-running anything it has already seen and
+the reviewer's "no coverage drop" check is an indexed lookup of the base
+commit's full-suite row. Least-recently-used rows are evicted past
+``max_entries`` rows or ``max_bytes`` of stored JSON.
+
+    python -m pipeline.baselines list [--repo R] [--limit N]
+    python -m pipeline.baselines show SHA [--repo R]
+    python -m pipeline.baselines prune [--max-entries N] [--max-bytes B] [--older-than DAYS]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from pipeline.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    selection TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (repo, sha, selection)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class BaselineStore:
+    def __init__(self, path: str | Path, max_entries: int, max_bytes: int) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def selection_hash(test_ids: list[str]) -> str:
+        return hashlib.sha256("\n".join(sorted(test_ids)).encode("utf-8")).hexdigest()[:16]
+
+    def get(self, repo: str, sha: str, selection: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE repo = ? AND sha = ? AND selection = ?",
+                (repo, sha, selection),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touch(repo, sha, selection)
+            self.hits += 1
+            return json.loads(row[0])
+
+    def baseline(self, repo: str, sha: str) -> dict[str, Any] | None:
+        """The full-suite result recorded for ``sha``, if any."""
+        return self._newest(repo, sha, full_only=True)
+
+    def latest(self, repo: str, sha: str) -> dict[str, Any] | None:
+        """The newest result recorded for ``sha``, full or incremental."""
+        return self._newest(repo, sha, full_only=False)
+
+    def _newest(self, repo: str, sha: str, full_only: bool) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT selection, value FROM results WHERE repo = ? AND sha = ? "
+                "AND (mode = 'full' OR NOT ?) ORDER BY created_at DESC LIMIT 1",
+                (repo, sha, full_only),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touch(repo, sha, row[0])
+            self.hits += 1
+            return json.loads(row[1])
+
+    def _touch(self, repo: str, sha: str, selection: str) -> None:
+        self._conn.execute(
+            "UPDATE results SET last_used = ? WHERE repo = ? AND sha = ? AND selection = ?",
+            (time.time(), repo, sha, selection),
+        )
+
+    def put(self, repo: str, sha: str, selection: str, mode: str, result: dict[str, Any]) -> None:
+        value = json.dumps(result)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(repo, sha, selection, mode, value, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (repo, sha, selection, mode, value, len(value), now, now),
+            )
+            self._evict(self.max_entries, self.max_bytes)
+
+    def _evict(
+        self, max_entries: int | None, max_bytes: int | None, before: float | None = None
+    ) -> int:
+        deleted = 0
+        if before is not None:
+            deleted += self._conn.execute(
+                "DELETE FROM results WHERE last_used < ?", (before,)
+            ).rowcount
+        if max_entries is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+            if count > max_entries:
+                deleted += self._conn.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY last_used ASC LIMIT ?)",
+                    (count - max_entries,),
+                ).rowcount
+        if max_bytes:
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+            rows = self._conn.execute("SELECT rowid, size FROM results ORDER BY last_used ASC")
+            doomed = []
+            for rowid, size in rows:
+                if total <= max_bytes:
+                    break
+                doomed.append((rowid,))
+                total -= size
+            self._conn.executemany("DELETE FROM results WHERE rowid = ?", doomed)
+            deleted += len(doomed)
+        return deleted
+
+    def prune(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        older_than: float | None = None,
+    ) -> int:
+        """Evict down to the given limits (and rows unused for ``older_than`` seconds)."""
+        before = time.time() - older_than if older_than is not None else None
+        with self._lock:
+            return self._evict(max_entries, max_bytes, before)
+
+    def entries(
+        self, repo: str | None = None, sha: str | None = None, limit: int = 50
+    ) -> list[dict]:
+        query = "SELECT repo, sha, selection, mode, size, created_at, last_used, value FROM results"
+        clauses, params = [], []
+        if repo:
+            clauses.append("repo = ?")
+            params.append(repo)
+        if sha:
+            clauses.append("sha LIKE ?")  # prefix match, as with git
+            params.append(f"{sha}%")
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY last_used DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        keys = ("repo", "sha", "selection", "mode", "size", "created_at", "last_used")
+        return [
+            {**dict(zip(keys, row[:7], strict=True)), "result": json.loads(row[7])}
+            for row in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: BaselineStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_baseline_store() -> BaselineStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BaselineStore(
+                settings.baseline_path, settings.baseline_max_entries, settings.baseline_max_bytes
+            )
+        return _store
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _summary(entry: dict) -> str:
+    result = entry["result"]
+    used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_used"]))
+    return (
+        f"{entry['repo']}  {entry['sha'][:12]}  {entry['mode']:<11} sel={entry['selection']}  "
+        f"{result.get('passed', 0)}/{result.get('total', 0)} passed  "
+        f"cov={result.get('coverage', '-')}  {entry['size']}B  used {used}"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and prune the test baseline store.")
+    parser.add_argument("--path", default=settings.baseline_path)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ls = sub.add_parser("list", help="List stored results, most recently used first.")
+    ls.add_argument("--repo")
+    ls.add_argument("--limit", type=int, default=50)
+
+    show = sub.add_parser("show", help="Print the stored results for a commit (sha prefix).")
+    show.add_argument("sha")
+    show.add_argument("--repo")
+
+    prune = sub.add_parser("prune", help="Evict least-recently-used results.")
+    prune.add_argument("--max-entries", type=int)
+    prune.add_argument("--max-bytes", type=int)
+    prune.add_argument("--older-than", type=float, help="days since last use")
+
+    sub.add_parser("clear", help="Delete every stored result.")
+
+    args = parser.parse_args(argv)
+    store = BaselineStore(args.path, settings.baseline_max_entries, settings.baseline_max_bytes)
+    if args.command == "list":
+        entries = store.entries(args.repo, limit=args.limit)
+        for entry in entries:
+            print(_summary(entry))
+        print(f"{len(store)} stored result(s)")
+    elif args.command == "show":
+        for entry in store.entries(args.repo, args.sha, limit=20):
+            print(json.dumps(entry, indent=2))
+    elif args.command == "prune":
+        older = args.older_than * 86400 if args.older_than is not None else None
+        print(f"Pruned {store.prune(args.max_entries, args.max_bytes, older)} result(s)")
+    else:
+        store.clear()
+        print("Cleared")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Run many specs concurrently in one orchestrator process.
+
+    pipeline batch "specs/*.md" [--max-runs N]
+
+Every spec gets its own run, with its own ``run_id`` used as the checkpoint
+``thread_id``, on one compiled graph. The runs therefore share what is
+process-wide already: the checkpointer, the response cache, the LLM client
+registry, the log writer and the AgentPool, whose ``max_concurrent_agents``
+slots are the batch's global budget. The pool hands a freed slot to the run
+holding the fewest, so a 50-ticket spec does not starve a 3-ticket hotfix.
+Runs paused at the human gate are resumed one by one with ``--resume``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import glob
+from dataclasses import dataclass
+
+from pipeline.graph.pipeline_graph import build_graph, drop_run, flush_checkpoints, start_run
+
+
+@dataclass
+class BatchRun:
+    spec: str
+    run_id: str = ""
+    status: str = "pending"  # complete, paused or failed
+    error: str = ""
+
+
+async def _run_one(graph, run: BatchRun, limit: asyncio.Semaphore) -> None:
+    async with limit:
+        run.run_id, config, inputs = start_run(graph, run.spec, None, False)
+        print(f"🚀 [{run.run_id}] {run.spec}")
+        try:
+            async for step in graph.astream(inputs, config=config, stream_mode="updates"):
+                node, _ = next(iter(step.items()))
+                print(f"  ✓ [{run.run_id}] {node}")
+        except Exception as e:  # one failing spec must not take the batch down
+            run.status, run.error = "failed", f"{type(e).__name__}: {e}"
+            return
+        finally:
+            drop_run(run.run_id)
+        run.status = "paused" if graph.get_state(config).next else "complete"
+
+
+async def arun_batch(pattern: str, max_runs: int | None = None) -> list[BatchRun]:
+    specs = sorted(glob.glob(pattern, recursive=True))  # noqa: PTH207 - may be absolute
+    if not specs:
+        raise SystemExit(f"No specs match {pattern!r}")
+
+    graph = build_graph()
+    runs = [BatchRun(spec) for spec in specs]
+    limit = asyncio.Semaphore(max_runs or len(runs))
+    print(f"\n📚 Batch of {len(runs)} spec(s)...\n")
+    try:
+        await asyncio.gather(*(_run_one(graph, run, limit) for run in runs))
+    finally:
+        await asyncio.to_thread(flush_checkpoints, graph)
+    _report(runs)
+    return runs
+
+
+def _report(runs: list[BatchRun]) -> None:
+    icons = {"complete": "✅", "paused": "⏸ ", "failed": "❌", "pending": "·"}
+    print()
+    for run in runs:
+        line = f"{icons[run.status]} {run.run_id or '-':<8} {run.status:<8} {run.spec}"
+        if run.status == "paused":
+            line += f"  (continue with --resume {run.run_id} [--approve])"
+        elif run.error:
+            line += f"  {run.error}"
+        print(line)
+    print()
+
+
+def run_batch(pattern: str, max_runs: int | None = None) -> list[BatchRun]:
+    return asyncio.run(arun_batch(pattern, max_runs))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("specs", help="glob of spec files, e.g. 'specs/**/*.md' (quote it)")
+    parser.add_argument("--max-runs", type=int,
+                        help="runs in flight at once (default: all)")
+
+
+def main(args: argparse.Namespace) -> None:
+    runs = run_batch(args.specs, args.max_runs)
+    if any(run.status == "failed" for run in runs):
+        raise SystemExit(1)
@@ -5,15 +5,129 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     anthropic_api_key: str = ""
     model: str = "claude-3-5-sonnet-20240620"
+    anthropic_base_url: str = ""
+    llm_pool_size: int = 20
+    # Per-role model/temperature/max_tokens, e.g. {"coder": {"max_tokens": 8192}}
+    llm_overrides: dict[str, dict] = {}
 
     asana_access_token: str = ""
     asana_workspace_gid: str = ""
     asana_project_gid: str = ""
+    asana_base_url: str = "https://app.asana.com/api/1.0"
+    asana_requests_per_minute: float = 150
+    asana_max_retries: int = 5
+    # Pipeline status -> Asana section GID that tickets are moved to, e.g. {"approved": "123"}
+    asana_status_sections: dict[str, str] = {}
 
     github_token: str = ""
     github_repo: str = "owner/repo"
 
+    # Bare clone + worktree pool used by the git tools; the remote defaults to GitHub.
+    git_remote_url: str = ""
+    git_base_branch: str = "main"
+    git_mirror_path: str = ".pipeline/git/mirror.git"
+    git_worktree_root: str = ".pipeline/git/worktrees"
+    git_worktree_pool_size: int = 0  # 0 = max_parallel_coders
+    git_fetch_interval: float = 60.0
+    git_commit_batch_size: int = 8
+    git_blame_cache_size: int = 1024
+    git_author_name: str = "agentic-dev-pipeline"
+    git_author_email: str = "pipeline@users.noreply.github.com"
+
+    # Tester: run only tests affected by a branch's diff, split across processes.
+    test_paths: list[str] = ["tests"]
+    test_cov_source: str = "."
+    test_shards: int = 0  # 0 = one per CPU
+    test_timeout: float = 1800.0
+    test_map_path: str = ".pipeline/test_map.json"
+    # Changes to any of these invalidate test selection and run the full suite.
+    test_full_run_patterns: list[str] = [
+        "conftest.py", "pyproject.toml", "setup.py", "setup.cfg", "pytest.ini", "tox.ini",
+        "requirements*.txt",
+    ]
+
+    # Test results per (repo, commit, selection); base-branch rows are review baselines.
+    baseline_path: str = ".pipeline/baselines.sqlite"
+    baseline_max_entries: int = 2000
+    baseline_max_bytes: int = 256 * 1024 * 1024
+    # Run the base commit's full suite when no baseline is stored for it yet.
+    test_baseline_on_miss: bool = True
+
+    # Reject on diff size, coverage drop or ruff errors before calling the Reviewer agent.
+    review_gate: bool = True
+    review_max_diff_lines: int = 400
+    # Start the diff review (gate and Reviewer agent) alongside the tests instead of after
+    # them; the coverage check joins at the end, and a failure in either cancels the other.
+    speculative_review: bool = False
+
+    slack_bot_token: str = ""
+    slack_channel: str = "#dev-pipeline"
+    slack_base_url: str = "https://slack.com/api/"
+    # One progress message per run, edited in place at most every slack_debounce_seconds.
+    slack_progress: bool = True
+    slack_debounce_seconds: float = 5.0
+    slack_requests_per_minute: float = 50
+    slack_max_retries: int = 5
+    # Compose the end-of-run summary with the Notifier agent instead of the template.
+    llm_notifier: bool = False
+
     dry_run: bool = False
+    max_parallel_coders: int = 4
+    max_concurrent_agents: int = 16
+    max_ticket_retries: int = 3
+    max_graph_loops: int = 5
+    # Failed tickets are re-dispatched after a random wait of up to
+    # min(retry_backoff_max, retry_backoff_base * 2 ** (retries - 1)) seconds.
+    retry_backoff_base: float = 2.0
+    retry_backoff_max: float = 60.0
+
+    # "local" runs ticket branches in this process; "queue" hands them to `pipeline worker`
+    # processes through the job queue, which may run on other hosts sharing job_queue_path.
+    ticket_executor: str = "local"
+    job_queue_backend: str = "sqlite"
+    job_queue_path: str = ".pipeline/jobs.sqlite"
+    job_lease_seconds: float = 60.0
+    job_heartbeat_seconds: float = 15.0
+    job_poll_seconds: float = 0.5
+    job_max_attempts: int = 3
+
+    # "sqlite" persists runs so they can be resumed with --resume; "memory" does not.
+    checkpoint_backend: str = "sqlite"
+    checkpoint_path: str = ".pipeline/checkpoints.sqlite"
+    checkpoint_batch_size: int = 32
+
+    # Only send new or edited spec sections to the planner; reuse the rest of the plan.
+    incremental_planning: bool = False
+    plan_index_path: str = ".pipeline/plan_index.json"
+
+    # Approximate token cap per role on a task description; oversized inputs (the spec,
+    # test reports, failure notes) are trimmed to fit. A missing role or 0 = no cap.
+    prompt_token_budgets: dict[str, int] = {
+        "planner": 24000, "coder": 4000, "tester": 1000, "reviewer": 6000, "notifier": 2000,
+    }
+    # Failing tests listed in a prompt; the rest are only counted.
+    prompt_max_failures: int = 10
+
+    # Target-repo conventions (e.g. its CONTRIBUTING.md) appended to every agent's backstory.
+    # They become part of the static, provider-cached system prompt ("" = none).
+    repo_conventions_path: str = ""
+
+    # Prometheus text-format metrics file written at the end of each run ("" = off).
+    metrics_export_path: str = ""
+    # USD per million tokens: model -> [input, output, cache read]. Calls to a model
+    # missing here are counted in tokens but not in cost.
+    model_prices: dict[str, list[float]] = {
+        "claude-3-5-sonnet-20240620": [3.0, 15.0, 0.3],
+        "claude-3-5-haiku-20241022": [0.8, 4.0, 0.08],
+        "claude-3-opus-20240229": [15.0, 75.0, 1.5],
+    }
+
+    cache_enabled: bool = True
+    cache_path: str = ".pipeline/cache.sqlite"
+    cache_ttl_seconds: int = 7 * 24 * 3600
+    cache_max_entries: int = 5000
+    # Nodes whose crew calls always go to the LLM (notify has side effects).
+    cache_bypass_nodes: list[str] = ["notify"]
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
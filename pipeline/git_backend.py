@@ -0,0 +1,359 @@
+"""
+Git backend for the coder, reviewer and notifier tools.
+
+One bare clone of the target repository is kept under ``settings.git_mirror_path``
+and refreshed with ``git fetch``; tickets never clone. Each in-flight ticket
+borrows a ``git worktree`` from ``WorktreePool`` and gives it back when its coder
+finishes, after which the checkout is reset, cleaned and detached for the next
+ticket. File commits are batched per worktree, and ``git blame`` results are
+cached per (file, commit) since a commit's blame never changes.
+"""
+from __future__ import annotations
+
+import base64
+import os
+import subprocess
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from pipeline.config import settings
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def run_git(*args: str, cwd: str | Path | None = None) -> str:
+    """Run ``git`` and return stdout; raise GitError with git's stderr on failure."""
+    proc = subprocess.run(  # noqa: S603 - fixed executable, no shell
+        ["git", *args],  # noqa: S607
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def _auth_args(remote_url: str, token: str) -> list[str]:
+    if not token or not remote_url.startswith("https://github.com/"):
+        return []
+    basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return ["-c", f"http.https://github.com/.extraheader=AUTHORIZATION: basic {basic}"]
+
+
+# ── Bare mirror ───────────────────────────────────────────────────────────────
+
+class GitMirror:
+    """Bare clone of the remote; remote branches live under ``refs/remotes/origin``."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        remote_url: str,
+        base_branch: str = "main",
+        fetch_interval: float = 60.0,
+        token: str = "",
+    ) -> None:
+        self.path = Path(path).resolve()
+        self.remote_url = remote_url
+        self.base_branch = base_branch
+        self.fetch_interval = fetch_interval
+        self._auth = _auth_args(remote_url, token)
+        self._last_fetch = 0.0
+        self.lock = threading.Lock()  # serialises fetches and worktree bookkeeping
+
+    def git(self, *args: str) -> str:
+        return run_git(*self._auth, *args, cwd=self.path)
+
+    def ensure(self) -> None:
+        with self.lock:
+            if (self.path / "HEAD").exists():
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            # Not ``clone --bare``: remote heads go under refs/remotes/origin so
+            # fetches never clobber the feature branches the worktrees create.
+            run_git("init", "--quiet", "--bare", str(self.path))
+            self.git("remote", "add", "origin", self.remote_url)
+            self.git("config", "user.name", settings.git_author_name)
+            self.git("config", "user.email", settings.git_author_email)
+            self.git("fetch", "--prune", "origin")
+            self._last_fetch = time.monotonic()
+
+    def fetch(self, force: bool = False) -> None:
+        with self.lock:
+            if not force and time.monotonic() - self._last_fetch < self.fetch_interval:
+                return
+            self.git("fetch", "--prune", "origin")
+            self._last_fetch = time.monotonic()
+
+    def rev_parse(self, rev: str) -> str:
+        return self.git("rev-parse", "--verify", f"{rev}^{{commit}}").strip()
+
+    @property
+    def base_ref(self) -> str:
+        return f"origin/{self.base_branch}"
+
+
+# ── Worktrees ─────────────────────────────────────────────────────────────────
+
+class Worktree:
+    """One checkout borrowed from the pool; commits are grouped until ``flush``."""
+
+    def __init__(self, mirror: GitMirror, path: Path) -> None:
+        self.mirror = mirror
+        self.path = path
+        self.branch: str | None = None
+        self._pending: list[str] = []
+
+    def git(self, *args: str) -> str:
+        return run_git(*self.mirror._auth, *args, cwd=self.path)
+
+    def checkout(self, branch: str) -> None:
+        """Switch to ``branch``, continuing it if it exists, else starting it from the base."""
+        self.flush()
+        try:
+            start = self.mirror.rev_parse(f"refs/heads/{branch}")
+        except GitError:
+            try:
+                start = self.mirror.rev_parse(f"origin/{branch}")
+            except GitError:
+                start = self.mirror.base_ref
+        self.git("checkout", "--force", "-B", branch, start)
+        self.branch = branch
+
+    def checkout_detached(self, rev: str) -> str:
+        """Check out ``rev`` without taking its branch (which another worktree may hold)."""
+        self.flush()
+        self.git("checkout", "--quiet", "--force", "--detach", rev)
+        self.branch = None
+        return self.git("rev-parse", "HEAD").strip()
+
+    def changed_files(self, base: str) -> list[str]:
+        """Paths changed on HEAD since it forked from ``base``."""
+        fork = self.git("merge-base", base, "HEAD").strip()
+        return self.git("diff", "--name-only", fork, "HEAD").splitlines()
+
+    def commit_file(self, file_path: str, message: str, content: str | None = None) -> str | None:
+        """Stage ``file_path``, writing ``content`` first if given; commit once a batch is full."""
+        target = (self.path / file_path).resolve()
+        if not target.is_relative_to(self.path.resolve()):
+            raise GitError(f"{file_path} is outside the worktree")
+        if content is not None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding="utf-8")
+        self.git("add", "--", file_path)
+        self._pending.append(message)
+        if len(self._pending) >= settings.git_commit_batch_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> str | None:
+        """Commit everything staged so far as one commit; return its sha."""
+        if not self._pending:
+            return None
+        messages, self._pending = self._pending, []
+        if not self.git("diff", "--cached", "--name-only").strip():
+            return None
+        if len(messages) == 1:
+            text = messages[0]
+        else:
+            text = f"{messages[0]} (+{len(messages) - 1} more)\n\n" + "\n".join(
+                f"- {m}" for m in messages
+            )
+        self.git("commit", "--quiet", "-m", text)
+        return self.git("rev-parse", "HEAD").strip()
+
+    def push(self) -> None:
+        if self.branch is None:
+            raise GitError("no branch checked out")
+        self.flush()
+        self.git("push", "--quiet", "origin", f"HEAD:refs/heads/{self.branch}")
+
+    def reset(self) -> None:
+        """Drop local changes and detach so the branch can be checked out elsewhere."""
+        self._pending = []
+        self.git("reset", "--quiet", "--hard")
+        self.git("clean", "-fdxq")
+        self.git("checkout", "--quiet", "--detach", self.mirror.base_ref)
+        self.branch = None
+
+
+class WorktreePool:
+    """Up to ``size`` worktrees of one mirror, recycled between tickets."""
+
+    def __init__(self, mirror: GitMirror, root: str | Path, size: int) -> None:
+        self.mirror = mirror
+        self.root = Path(root).resolve()
+        self.size = max(1, size)
+        self._idle: list[Worktree] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def _create(self, slot: int) -> Worktree:
+        path = self.root / f"wt-{slot}"
+        with self.mirror.lock:
+            self.mirror.git("worktree", "prune")
+            if (path / ".git").exists():
+                worktree = Worktree(self.mirror, path)
+                worktree.reset()  # left over from an earlier process
+                return worktree
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.mirror.git("worktree", "add", "--detach", str(path), self.mirror.base_ref)
+        return Worktree(self.mirror, path)
+
+    def acquire(self, timeout: float | None = None) -> Worktree:
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                if not self._cond.wait(timeout):
+                    raise GitError("timed out waiting for a free worktree")
+            if self._idle:
+                return self._idle.pop()
+            slot = self._created
+            self._created += 1
+        try:
+            return self._create(slot)
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, worktree: Worktree) -> None:
+        try:
+            worktree.reset()
+        except GitError:
+            # A broken checkout is dropped; its slot is recreated on demand.
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append(worktree)
+            self._cond.notify()
+
+
+# ── Backend ───────────────────────────────────────────────────────────────────
+
+class GitBackend:
+    """Maps tickets to borrowed worktrees and answers cached blame queries."""
+
+    def __init__(self, mirror: GitMirror, pool: WorktreePool, blame_cache_size: int = 1024) -> None:
+        self.mirror = mirror
+        self.pool = pool
+        self.blame_cache_size = blame_cache_size
+        self.blame_hits = 0
+        self._tickets: dict[str, Worktree] = {}
+        self._blame: OrderedDict[tuple[str, str], dict[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def checkout(self, ticket_id: str, branch: str) -> Worktree:
+        """Put ``branch`` in the ticket's worktree, borrowing one on first use."""
+        with self._lock:
+            worktree = self._tickets.get(ticket_id)
+        if worktree is None:
+            self.mirror.fetch()
+            worktree = self.pool.acquire()
+            with self._lock:
+                self._tickets[ticket_id] = worktree
+        worktree.checkout(branch)
+        return worktree
+
+    def worktree(self, ticket_id: str) -> Worktree:
+        with self._lock:
+            worktree = self._tickets.get(ticket_id)
+        if worktree is None or worktree.branch is None:
+            raise GitError(f"ticket {ticket_id} has no branch checked out; create one first")
+        return worktree
+
+    def release(self, ticket_id: str) -> None:
+        """Commit pending work and hand the ticket's worktree back to the pool."""
+        with self._lock:
+            worktree = self._tickets.pop(ticket_id, None)
+        if worktree is None:
+            return
+        try:
+            worktree.flush()
+        finally:
+            self.pool.release(worktree)
+
+    @contextmanager
+    def borrowed(self, rev: str) -> Iterator[Worktree]:
+        """A worktree detached at ``rev`` for read-only work such as running tests."""
+        self.mirror.fetch()
+        worktree = self.pool.acquire()
+        try:
+            for candidate in (f"refs/heads/{rev}", f"origin/{rev}", rev):
+                try:
+                    worktree.checkout_detached(self.mirror.rev_parse(candidate))
+                    break
+                except GitError:
+                    continue
+            else:
+                raise GitError(f"unknown revision {rev!r}")
+            yield worktree
+        finally:
+            self.pool.release(worktree)
+
+    def blame(self, file_path: str, rev: str | None = None) -> dict[str, int]:
+        """Lines per author email for ``file_path`` at ``rev`` (default: the base branch)."""
+        commit = self.mirror.rev_parse(rev or self.mirror.base_ref)
+        key = (file_path, commit)
+        with self._lock:
+            cached = self._blame.get(key)
+            if cached is not None:
+                self._blame.move_to_end(key)
+                self.blame_hits += 1
+                return cached
+
+        authors: Counter[str] = Counter()
+        porcelain = self.mirror.git("blame", "--line-porcelain", commit, "--", file_path)
+        for line in porcelain.splitlines():
+            if line.startswith("author-mail "):
+                authors[line[len("author-mail "):].strip("<>")] += 1
+        result = dict(authors.most_common())
+
+        with self._lock:
+            self._blame[key] = result
+            while len(self._blame) > self.blame_cache_size:
+                self._blame.popitem(last=False)
+        return result
+
+
+_backend: GitBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_git_backend() -> GitBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            remote = settings.git_remote_url or f"https://github.com/{settings.github_repo}.git"
+            mirror = GitMirror(
+                settings.git_mirror_path,
+                remote,
+                base_branch=settings.git_base_branch,
+                fetch_interval=settings.git_fetch_interval,
+                token=settings.github_token,
+            )
+            mirror.ensure()
+            pool = WorktreePool(
+                mirror,
+                settings.git_worktree_root,
+                settings.git_worktree_pool_size or settings.max_parallel_coders,
+            )
+            _backend = GitBackend(mirror, pool, settings.git_blame_cache_size)
+        return _backend
+
+
+def release_worktree(ticket_id: str) -> None:
+    """Return a ticket's worktree to the pool; a no-op if git was never used."""
+    if _backend is not None:
+        _backend.release(ticket_id)
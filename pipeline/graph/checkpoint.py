@@ -0,0 +1,171 @@
+"""
+Checkpointer selection for the pipeline graph.
+
+``settings.checkpoint_backend`` picks the saver: ``sqlite`` (default) persists
+every superstep, with the results of its ticket branches, to disk so a crashed or
+interrupted run can be resumed from another process; ``memory`` keeps the old
+in-process ``MemorySaver`` behaviour.
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from pipeline.config import settings
+
+# Our own types stored in checkpoints, allowed back in when a run is resumed.
+CHECKPOINT_TYPES = [("pipeline.graph.state", "Ticket")]
+
+
+def make_serde() -> JsonPlusSerializer:
+    return JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+
+
+class BatchedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver in WAL mode that commits once per superstep.
+
+    The writes of a superstep's branches are left pending and committed
+    together with the checkpoint that closes the superstep; only a wave wider
+    than ``batch_size`` branches commits early. When a branch crashes the
+    superstep, the writes of its finished siblings are committed by ``flush``
+    (or ``close``) as the run shuts down, so the resumed run skips those tickets.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = 32) -> None:
+        super().__init__(conn, serde=make_serde())
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    @classmethod
+    def from_path(cls, path: str | Path, **kwargs: int) -> BatchedSqliteSaver:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        with self.lock:
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+                if transaction:
+                    self._pending += 1
+                    if self._pending >= self.batch_size:
+                        self._commit()
+
+    def _commit(self) -> None:
+        self.conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self.lock:
+            self._commit()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # LangGraph puts one checkpoint per superstep, after all of its writes.
+        try:
+            return super().put(config, checkpoint, metadata, new_versions)
+        finally:
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    # SqliteSaver is sync-only; run its methods off the event loop so
+    # graph.astream can use the same on-disk store.
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+
+_savers: dict[tuple[str, str], BaseCheckpointSaver] = {}
+_savers_lock = threading.Lock()
+
+
+def get_checkpointer(backend: str | None = None, path: str | None = None) -> BaseCheckpointSaver:
+    """Return the process-wide checkpointer for ``backend`` (defaults from settings)."""
+    backend = backend or settings.checkpoint_backend
+    path = path or settings.checkpoint_path
+    key = (backend, path if backend == "sqlite" else "")
+    with _savers_lock:
+        saver = _savers.get(key)
+        if saver is None:
+            if backend == "memory":
+                saver = MemorySaver(serde=make_serde())
+            elif backend == "sqlite":
+                saver = BatchedSqliteSaver.from_path(
+                    path,
+                    batch_size=settings.checkpoint_batch_size,
+                )
+            else:
+                raise ValueError(f"Unknown checkpoint backend: {backend!r}")
+            _savers[key] = saver
+        return saver
+
+
+def flush_checkpointer(saver: BaseCheckpointSaver) -> None:
+    if isinstance(saver, BatchedSqliteSaver):
+        saver.flush()
+
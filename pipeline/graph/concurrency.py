@@ -0,0 +1,197 @@
+"""
+Process-wide bound on in-flight agent crews.
+
+Both the sync (``graph.stream``) and async (``graph.astream``) paths go through
+the same ``AgentPool`` so a run can keep dozens of ticket branches in flight
+without opening more concurrent LLM sessions than ``max_concurrent_agents``.
+
+When several runs share the process (``pipeline batch``), a freed slot goes to
+the waiting run that holds the fewest slots, and among those to the one served
+least recently, so a large spec cannot starve a small one that started after it.
+
+A sync crew cannot be interrupted once it runs. Code inside ``cancellable(flag)``
+stops at the next ``check_cancelled`` after the flag is set; ``AgentPool.kickoff``
+checks when it gets its slot, so a cancelled caller never starts its crew.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import threading
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from pipeline.config import settings
+from pipeline.metrics import current_span
+
+if TYPE_CHECKING:
+    from crewai import Crew, CrewOutput
+
+
+class KickoffCancelledError(Exception):
+    """The caller's cancellation flag was set; its crew's result is no longer wanted."""
+
+
+_cancel: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar(
+    "pipeline_cancel", default=None
+)
+
+
+@contextmanager
+def cancellable(flag: threading.Event) -> Iterator[None]:
+    token = _cancel.set(flag)
+    try:
+        yield
+    finally:
+        _cancel.reset(token)
+
+
+def check_cancelled() -> None:
+    flag = _cancel.get()
+    if flag is not None and flag.is_set():
+        raise KickoffCancelledError
+
+
+@dataclass(eq=False)
+class _Waiter:
+    wake: threading.Event | None = None
+    future: asyncio.Future | None = None
+    loop: asyncio.AbstractEventLoop | None = None
+    granted: bool = False
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.wake is not None:
+            self.wake.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AgentPool:
+    """Fair, slot-bounded executor for ``Crew.kickoff`` / ``Crew.kickoff_async``."""
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._held: Counter[str] = Counter()
+        self._served: dict[str, int] = {}  # run -> seq of its latest grant
+        self._waiting: dict[str, deque[_Waiter]] = {}
+
+    # ── Slot accounting ──────────────────────────────────────────────────────
+
+    def _free(self) -> bool:
+        return sum(self._held.values()) < self.max_in_flight
+
+    def _enqueue(self, run_id: str, waiter: _Waiter) -> bool:
+        """Take a slot now if nobody is waiting, else queue; True if granted."""
+        if self._free() and not self._waiting:
+            self._take(run_id)
+            return True
+        self._waiting.setdefault(run_id, deque()).append(waiter)
+        return False
+
+    def _take(self, run_id: str) -> None:
+        self._held[run_id] += 1
+        self._served[run_id] = next(self._seq)
+
+    def _grant_next(self) -> None:
+        while self._waiting and self._free():
+            run_id = min(self._waiting, key=lambda r: (self._held[r], self._served.get(r, -1)))
+            queue = self._waiting[run_id]
+            waiter = queue.popleft()
+            if not queue:
+                del self._waiting[run_id]
+            self._take(run_id)
+            waiter.grant()
+
+    def release(self, run_id: str) -> None:
+        with self._lock:
+            self._held[run_id] -= 1
+            if self._held[run_id] <= 0:
+                del self._held[run_id]
+                if run_id not in self._waiting:
+                    self._served.pop(run_id, None)
+            self._grant_next()
+
+    def _withdraw(self, run_id: str, waiter: _Waiter) -> None:
+        """Drop a cancelled async waiter, handing its slot on if it was already granted."""
+        with self._lock:
+            queue = self._waiting.get(run_id)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._waiting[run_id]
+                return
+        if waiter.granted:
+            self.release(run_id)
+
+    def acquire(self, run_id: str = "") -> None:
+        waiter = _Waiter(wake=threading.Event())
+        with self._lock:
+            if self._enqueue(run_id, waiter):
+                return
+        waiter.wake.wait()
+
+    async def aacquire(self, run_id: str = "") -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(future=loop.create_future(), loop=loop)
+        with self._lock:
+            if self._enqueue(run_id, waiter):
+                return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            self._withdraw(run_id, waiter)
+            raise
+
+    def held(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._held)
+
+    # ── Crew execution ───────────────────────────────────────────────────────
+
+    def kickoff(self, crew: Crew, run_id: str | None = None) -> CrewOutput:
+        run_id = _run_of(run_id)
+        self.acquire(run_id)
+        try:
+            check_cancelled()
+            return crew.kickoff()
+        finally:
+            self.release(run_id)
+
+    async def akickoff(self, crew: Crew, run_id: str | None = None) -> CrewOutput:
+        run_id = _run_of(run_id)
+        await self.aacquire(run_id)
+        try:
+            return await crew.kickoff_async()
+        finally:
+            self.release(run_id)
+
+
+def _run_of(run_id: str | None) -> str:
+    """The caller's run, taken from its metrics span when not given."""
+    if run_id is not None:
+        return run_id
+    span = current_span()
+    return span.run_id if span is not None else ""
+
+
+_pool: AgentPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_agent_pool() -> AgentPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AgentPool(settings.max_concurrent_agents)
+        return _pool
@@ -0,0 +1,163 @@
+"""
+Incremental planning support.
+
+The spec is split into Markdown sections, each fingerprinted by content. The
+plan index remembers, per spec file, which tickets each section produced on the
+last run, so only new or edited sections need to go back to the planner; the
+tickets of unchanged sections are reused as-is (same GIDs). The index also keeps
+the outcome of every approved ticket, so a later run does not code it again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+PREAMBLE = "(preamble)"
+
+# Ticket fields stored in the index once a ticket has been approved.
+OUTCOME_FIELDS = ("status", "branch", "pr_number", "test_result", "review_approved", "retries")
+
+
+@dataclass(frozen=True)
+class SpecSection:
+    key: str
+    text: str
+
+    @property
+    def fingerprint(self) -> str:
+        normalised = "\n".join(line.rstrip() for line in self.text.strip().splitlines())
+        return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def split_sections(spec: str) -> list[SpecSection]:
+    """Split Markdown into sections keyed by their heading path, e.g. ``Goal > API``."""
+    sections: list[SpecSection] = []
+    path: list[str] = []
+    key, lines = PREAMBLE, []
+    in_fence = False
+
+    def close() -> None:
+        if "".join(lines).strip():
+            sections.append(SpecSection(key, "\n".join(lines)))
+
+    for line in spec.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            close()
+            level = len(match.group(1))
+            path = [*path[: level - 1], match.group(2)]
+            key, lines = " > ".join(path), []
+        lines.append(line)
+    close()
+
+    # Keep keys unique if a heading path repeats.
+    seen: dict[str, int] = {}
+    unique = []
+    for section in sections:
+        n = seen[section.key] = seen.get(section.key, 0) + 1
+        unique.append(section if n == 1 else SpecSection(f"{section.key} #{n}", section.text))
+    return unique
+
+
+class PlanIndex:
+    """JSON file mapping spec path → section key → {fingerprint, tickets}."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return {}
+
+    def load(self, spec_path: str) -> dict[str, dict]:
+        return self._read().get(str(Path(spec_path).resolve()), {})
+
+    def save(self, spec_path: str, entries: dict[str, dict]) -> None:
+        data = self._read()
+        data[str(Path(spec_path).resolve())] = entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def record(self, spec_path: str, approved: dict[str, dict]) -> None:
+        """Store the outcome of approved tickets (gid → ticket fields) with their entries."""
+        entries = self.load(spec_path)
+        found = False
+        for entry in entries.values():
+            for ticket in entry.get("tickets", []):
+                fields = approved.get(ticket.get("gid"))
+                if fields is not None:
+                    ticket["outcome"] = {name: fields.get(name) for name in OUTCOME_FIELDS}
+                    found = True
+        if found:
+            self.save(spec_path, entries)
+
+
+@dataclass
+class IncrementalPlan:
+    sections: list[SpecSection]
+    previous: dict[str, dict]
+
+    @property
+    def changed(self) -> list[SpecSection]:
+        return [
+            s for s in self.sections
+            if self.previous.get(s.key, {}).get("fingerprint") != s.fingerprint
+        ]
+
+    @property
+    def current(self) -> bool:
+        """True when the index already matches the spec: no section changed or removed."""
+        return not self.changed and self.previous.keys() == {s.key for s in self.sections}
+
+    @property
+    def unchanged(self) -> list[SpecSection]:
+        changed = {s.key for s in self.changed}
+        return [s for s in self.sections if s.key not in changed]
+
+    def kept_tickets(self) -> list[dict]:
+        return [t for s in self.unchanged for t in self.previous[s.key].get("tickets", [])]
+
+    def prompt(self) -> str:
+        existing = "\n".join(f"- {t['gid']}: {t.get('title', '')}" for t in self.kept_tickets())
+        changed = "\n\n".join(f"### Section: {s.key}\n{s.text}" for s in self.changed)
+        return (
+            "Only the spec sections below are new or changed since the last plan. "
+            "Decompose them into Asana tickets. Tag every ticket with the `section` it "
+            "came from (use the section name exactly as given). Tickets may depend on "
+            "these existing tickets, which must not be recreated:\n"
+            f"{existing or '(none)'}\n\n{changed}"
+        )
+
+    def merge(self, planned: list[dict]) -> tuple[list[dict], dict[str, dict]]:
+        """Combine kept and freshly planned tickets; return (tickets, new index entries)."""
+        changed = self.changed
+        changed_keys = {s.key for s in changed}
+        by_section: dict[str, list[dict]] = {s.key: [] for s in changed}
+        for ticket in planned:
+            section = ticket.get("section")
+            if section not in changed_keys:
+                # Untagged or mis-tagged: attach to the first changed section.
+                section = changed[0].key if changed else PREAMBLE
+            by_section.setdefault(section, []).append(ticket)
+
+        entries: dict[str, dict] = {}
+        for s in self.sections:
+            tickets = by_section.get(s.key) if s.key in changed_keys else None
+            if tickets is None:
+                tickets = self.previous.get(s.key, {}).get("tickets", [])
+            entries[s.key] = {"fingerprint": s.fingerprint, "tickets": tickets}
+        return [t for entry in entries.values() for t in entry["tickets"]], entries
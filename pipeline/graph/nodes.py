@@ -1,111 +1,323 @@
-"""LangGraph node functions. Each node wraps one agent action."""
+"""
+LangGraph node functions. Each node wraps one agent action.
+
+Every node has a sync and an ``a``-prefixed async variant sharing the same crew
+construction and result handling; crews are run through the process-wide
+AgentPool so in-flight agents stay bounded in both modes, behind the on-disk
+ResponseCache so a retried run does not re-bill work that already succeeded.
+
+crewai and the agent factories are resolved on first use through the module's
+``__getattr__``, so importing the graph (for a dry run or ``--help``) does not
+load them; patch ``nodes.Crew`` or ``nodes.make_coder`` as before.
+"""
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import importlib
 import json
-import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from crewai import Crew, Task
-
-from pipeline.agents import (
-    make_coder,
-    make_notifier,
-    make_planner,
-    make_reviewer,
-    make_tester,
-)
+from pipeline.asana_client import queue_status
+from pipeline.cache import ResponseCache, cache_enabled_for, get_response_cache
 from pipeline.config import settings
-from pipeline.graph.state import PipelineState, Ticket
+from pipeline.git_backend import release_worktree
+from pipeline.graph.concurrency import cancellable, check_cancelled, get_agent_pool
+from pipeline.graph.incremental import IncrementalPlan, PlanIndex, split_sections
+from pipeline.graph.state import PipelineState, Ticket, TicketTask
+from pipeline.graph.summary import failure_reason, final_tickets, render_summary
 from pipeline.logger import get_run_logger
+from pipeline.metrics import (
+    export_prometheus,
+    get_run_metrics,
+    record_cache_hit,
+    record_prompt_saved,
+    track,
+)
+from pipeline.parsing import REVIEW_VERDICT, TEST_RESULT, TICKET_LIST, parse_json_result
+from pipeline.prompts import Part, Prompt, assemble, compact_test_result, shrink_spec, truncate
+from pipeline.review_gate import GateResult, check_coverage, pre_review
+from pipeline.slack_notifier import queue_thread_reply, queue_ticket_status
+from pipeline.tester_backend import take_comparison
 
+if TYPE_CHECKING:
+    from crewai import Agent, Crew
+
+_LAZY = {
+    "Crew": "crewai",
+    "Task": "crewai",
+    **dict.fromkeys(
+        ("make_coder", "make_notifier", "make_planner", "make_reviewer", "make_tester"),
+        "pipeline.agents",
+    ),
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401 - module attribute hook
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(module), name)
+    return value
+
+
+def _lazy(name: str) -> Any:  # noqa: ANN401 - as __getattr__
+    """``nodes.<name>``, importing it on first use; a monkeypatched value wins."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+# ── Crew execution ────────────────────────────────────────────────────────────
+
+@dataclass
+class CrewCall:
+    """One crew invocation: what to build, and what identifies its response in the cache."""
+
+    node: str
+    role: str
+    prompt: str | Prompt
+    build: Callable[[str], Crew]
+    context: Any = None
+    accept: Callable[[str], bool] = lambda _: True
+    saved: int = 0  # estimated tokens compaction removed from the prompt
+
+    def __post_init__(self) -> None:
+        if isinstance(self.prompt, Prompt):
+            self.prompt, self.saved = self.prompt.text, self.prompt.saved
+
+    @property
+    def model(self) -> str:
+        return settings.llm_overrides.get(self.role, {}).get("model", settings.model)
+
+    def cache_key(self) -> str | None:
+        if not cache_enabled_for(self.node):
+            return None
+        return ResponseCache.key(self.role, self.model, self.prompt, self.context)
+
+
+def _cached(call: CrewCall) -> tuple[str | None, str | None]:
+    key = call.cache_key()
+    if key is None:
+        return None, None
+    return key, get_response_cache().get(key)
+
+
+def _store(call: CrewCall, key: str | None, result: str) -> str:
+    if key is not None and call.accept(result):
+        get_response_cache().put(key, call.role, result)
+    return result
+
+
+def _kickoff(call: CrewCall) -> str:
+    key, hit = _cached(call)
+    if hit is not None:
+        record_cache_hit()
+        return hit
+    check_cancelled()
+    output = get_agent_pool().kickoff(call.build(call.prompt))
+    record_prompt_saved(call.saved)
+    check_cancelled()  # a cancelled stage's result is stale; keep it out of the cache
+    return _store(call, key, str(output))
 
-def parse_json_result(result: Any) -> Any:
-    """Robustly extract JSON from a string that may contain markdown or preamble."""
-    raw = str(result)
-    try:
-        # Try direct parse
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        try:
-            # Look for JSON block
-            match = re.search(r"(\{.*\}|\[.*\])", raw, re.DOTALL)
-            if match:
-                return json.loads(match.group(1))
-        except Exception:
-            pass
-    return None
+
+async def _akickoff(call: CrewCall) -> str:
+    key, hit = _cached(call)
+    if hit is not None:
+        record_cache_hit()
+        return hit
+    output = await get_agent_pool().akickoff(call.build(call.prompt))
+    record_prompt_saved(call.saved)
+    return _store(call, key, str(output))
+
+
+def _crew(agent: Agent, description: str, expected_output: str) -> Crew:
+    """A one-agent, one-task crew."""
+    task = _lazy("Task")(description=description, expected_output=expected_output, agent=agent)
+    return _lazy("Crew")(agents=[agent], tasks=[task], verbose=False)
+
+
+def _is_dict(result: str) -> bool:
+    return isinstance(parse_json_result(result), dict)
 
 
 # ── Planner node ──────────────────────────────────────────────────────────────
 
-def plan_node(state: PipelineState) -> dict:
-    logger = get_run_logger(state["run_id"])
-    spec = Path(state["spec_path"]).read_text(encoding="utf-8")
+_DRY_PLAN = (
+    '[{"gid": "mock-1", "title": "Setup basic structure", "dependencies": [], "complexity": "S"}]'
+)
 
-    if settings.dry_run:
-        result = '[{"gid": "mock-1", "title": "Setup basic structure", "dependencies": [], "complexity": "S"}]'
-    else:
-        agent = make_planner()
-        task = Task(
-            description=f"Decompose this spec into 10–20 Asana tickets:\n\n{spec}",
-            expected_output="JSON list of ticket objects with keys: gid, title, dependencies, complexity",
-            agent=agent,
-        )
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = crew.kickoff()
-
-    tickets_data = parse_json_result(result) or []
-
-    tickets: list[Ticket] = [
-        Ticket(
-            gid=t.get("gid", f"mock-{i}"),
-            title=t.get("title", f"Ticket {i}"),
-            dependencies=t.get("dependencies", []),
-            complexity=t.get("complexity", "M"),
-            branch=None, pr_number=None, test_result=None,
-            review_approved=None, retries=0, status="pending",
+
+def _plan_crew(description: str) -> Crew:
+    return _crew(
+        _lazy("make_planner")(),
+        description,
+        "JSON list of ticket objects with keys: gid, title, dependencies, complexity",
+    )
+
+
+def _plan_call(*parts: Part) -> CrewCall:
+    return CrewCall(
+        node="plan",
+        role="planner",
+        prompt=assemble("planner", list(parts)),
+        build=_plan_crew,
+        accept=lambda r: bool(parse_json_result(r, TICKET_LIST)),
+    )
+
+
+def _plan_start(state: PipelineState) -> tuple[CrewCall | None, IncrementalPlan | None]:
+    """The planner call to make (None if nothing changed) and the incremental plan, if any."""
+    spec = Path(state["spec_path"]).read_text(encoding="utf-8")
+    if not settings.incremental_planning:
+        return _plan_call(
+            Part("task", "Decompose this spec into 10–20 Asana tickets:\n\n"),
+            Part("spec", spec, shrink_spec),
+        ), None
+
+    previous = PlanIndex(settings.plan_index_path).load(state["spec_path"])
+    plan = IncrementalPlan(split_sections(spec), previous)
+    if not plan.changed:
+        return None, plan
+    return _plan_call(Part("changed_sections", plan.prompt(), shrink_spec)), plan
+
+
+def _planned_ticket(i: int, data: dict) -> Ticket:
+    ticket = Ticket(
+        gid=data.get("gid", f"mock-{i}"),
+        title=data.get("title", f"Ticket {i}"),
+        dependencies=data.get("dependencies", []),
+        complexity=data.get("complexity", "M"),
+        branch=None, pr_number=None, test_result=None,
+        review_approved=None, retries=0, status="pending",
+    )
+    # A ticket kept from an earlier plan comes back with its outcome, if it was approved.
+    for name, value in data.get("outcome", {}).items():
+        ticket[name] = value
+    return ticket
+
+
+def _plan_update(state: PipelineState, result: object, plan: IncrementalPlan | None = None) -> dict:
+    logger = get_run_logger(state["run_id"])
+    tickets_data = (parse_json_result(result, TICKET_LIST) if result is not None else []) or []
+
+    if plan is not None:
+        changed = [s.key for s in plan.changed]
+        reused = len(plan.kept_tickets())
+        if plan.current:
+            # No planner call and nothing to save: the index already holds this plan.
+            tickets_data = plan.kept_tickets()
+        elif isinstance(tickets_data, list) and (tickets_data or not changed):
+            tickets_data, entries = plan.merge(tickets_data)
+            PlanIndex(settings.plan_index_path).save(state["spec_path"], entries)
+        else:
+            # Unusable planner output: keep the old tickets and leave the index alone
+            # so the changed sections are retried next run.
+            tickets_data = plan.kept_tickets()
+        logger.log(
+            "plan_incremental", "Planner", {"changed_sections": changed, "reused_tickets": reused}
         )
-        for i, t in enumerate(tickets_data)
-    ]
+
+    tickets = [_planned_ticket(i, t) for i, t in enumerate(tickets_data)]
 
     logger.log("plan_complete", "Planner", {"ticket_count": len(tickets)})
     return {"tickets": tickets, "loop_count": state.get("loop_count", 0) + 1}
 
 
-# ── Coder node (runs per ticket) ──────────────────────────────────────────────
+def plan_node(state: PipelineState) -> dict:
+    if settings.dry_run:
+        return _plan_update(state, _DRY_PLAN)
 
-def code_node(state: PipelineState, ticket: Ticket) -> dict:
-    logger = get_run_logger(state["run_id"])
+    call, plan = _plan_start(state)
+    result = _kickoff(call) if call is not None else None
+
+    return _plan_update(state, result, plan)
 
-    if ticket["retries"] >= settings.max_ticket_retries:
-        ticket["status"] = "escalated"
-        logger.log("ticket_escalated", "Coder", {"gid": ticket["gid"]})
-        return {"failed_tickets": [ticket]}
 
+async def aplan_node(state: PipelineState) -> dict:
     if settings.dry_run:
-        result = '{"branch": "feature/ticket-mock-1", "pr_number": "123"}'
-    else:
-        agent = make_coder(ticket["gid"])
-        task = Task(
-            description=(
-                f"Implement ticket '{ticket['title']}' (GID: {ticket['gid']}).\n"
-                f"Create a feature branch, write the code, commit, and open a PR."
-            ),
-            expected_output="JSON with keys: branch (str), pr_number (str)",
-            agent=agent,
+        return _plan_update(state, _DRY_PLAN)
+
+    call, plan = _plan_start(state)
+    result = await _akickoff(call) if call is not None else None
+
+    return _plan_update(state, result, plan)
+
+
+# ── Coder node (runs per ticket) ──────────────────────────────────────────────
+
+_DRY_CODE = '{"branch": "feature/ticket-mock-1", "pr_number": "123"}'
+
+
+def _set_status(state: TicketTask, ticket: Ticket, status: str) -> None:
+    """Update the ticket and queue the change for Asana and the run's Slack message."""
+    ticket["status"] = status
+    queue_status(ticket["gid"], status)
+    queue_ticket_status(state["run_id"], ticket["gid"], ticket["title"], status)
+
+
+def _escalate(state: TicketTask, ticket: Ticket) -> dict | None:
+    """Stop retrying a ticket once it has exhausted its retry budget."""
+    if ticket["retries"] < settings.max_ticket_retries:
+        return None
+    _set_status(state, ticket, "escalated")
+    get_run_logger(state["run_id"]).log("ticket_escalated", "Coder", {"gid": ticket["gid"]})
+    return {"failed_tickets": [ticket]}
+
+
+def _previous_failure(ticket: Ticket) -> str:
+    """What went wrong last time, for a retried ticket; empty on the first attempt."""
+    if not ticket["retries"]:
+        return ""
+    lines = [
+        "",
+        f"This is attempt {ticket['retries'] + 1}. "
+        f"The previous attempt failed: {failure_reason(ticket)}.",
+    ]
+    if ticket["branch"]:
+        lines.append(
+            f"Fix it on the existing branch '{ticket['branch']}' and PR #{ticket['pr_number']}."
         )
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = str(crew.kickoff())
+    failures = (ticket.get("test_result") or {}).get("failures") or []
+    lines += [f"- {f['id']}: {(f.get('message') or '')[:300]}" for f in failures[:5]]
+    return "\n".join(lines)
+
+
+def _code_call(ticket: Ticket) -> CrewCall:
+    def build(description: str) -> Crew:
+        return _crew(
+            _lazy("make_coder")(ticket["gid"]),
+            description,
+            "JSON with keys: branch (str), pr_number (str)",
+        )
+
+    return CrewCall(
+        node="code",
+        role="coder",
+        prompt=assemble("coder", [
+            Part("task", "Create a feature branch, write the code, commit, and open a PR.\n"),
+            Part("ticket", f"Implement ticket '{ticket['title']}' (GID: {ticket['gid']})."),
+            Part("previous_failure", _previous_failure(ticket), truncate),
+        ]),
+        build=build,
+        accept=_is_dict,
+    )
+
+
+def _code_update(state: TicketTask, ticket: Ticket, result: object) -> dict:
+    logger = get_run_logger(state["run_id"])
 
     data = parse_json_result(result)
     if data and isinstance(data, dict):
         ticket["branch"] = data.get("branch", f"feature/ticket-{ticket['gid']}")
         ticket["pr_number"] = data.get("pr_number", "0")
-        ticket["status"] = "in_progress"
+        _set_status(state, ticket, "in_progress")
     else:
         ticket["retries"] += 1
-        ticket["status"] = "pending"
+        _set_status(state, ticket, "pending")
         logger.log("code_parse_error", "Coder", {"gid": ticket["gid"], "raw": str(result)[:200]})
         return {"failed_tickets": [ticket]}
 
@@ -113,71 +325,187 @@ def code_node(state: PipelineState, ticket: Ticket) -> dict:
     return {"completed_tickets": [ticket]}
 
 
+def code_node(state: TicketTask, ticket: Ticket) -> dict:
+    escalated = _escalate(state, ticket)
+    if escalated:
+        return escalated
+
+    try:
+        result = _DRY_CODE if settings.dry_run else _kickoff(_code_call(ticket))
+    finally:
+        release_worktree(ticket["gid"])
+
+    return _code_update(state, ticket, result)
+
+
+async def acode_node(state: TicketTask, ticket: Ticket) -> dict:
+    escalated = _escalate(state, ticket)
+    if escalated:
+        return escalated
+
+    try:
+        result = _DRY_CODE if settings.dry_run else await _akickoff(_code_call(ticket))
+    finally:
+        await asyncio.to_thread(release_worktree, ticket["gid"])
+
+    return _code_update(state, ticket, result)
+
+
 # ── Tester node ───────────────────────────────────────────────────────────────
 
-def test_node(state: PipelineState, ticket: Ticket) -> dict:
-    logger = get_run_logger(state["run_id"])
+_DRY_TEST = '{"total": 5, "passed": 5, "failed": 0, "coverage": 100.0}'
 
-    if settings.dry_run:
-        result = '{"total": 5, "passed": 5, "failed": 0, "coverage": 100.0}'
-    else:
-        agent = make_tester()
-        task = Task(
-            description=(
-                f"Run the test suite for branch '{ticket['branch']}' in the repo at "
-                f"'{settings.github_repo}'. Return a structured test result."
-            ),
-            expected_output="JSON matching TestResult schema",
-            agent=agent,
-        )
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = str(crew.kickoff())
 
-    data = parse_json_result(result)
+def _test_crew(description: str) -> Crew:
+    return _crew(_lazy("make_tester")(), description, "JSON matching TestResult schema")
+
+
+def _tests_passed(result: str) -> bool:
+    data = parse_json_result(result, TEST_RESULT)
+    return isinstance(data, dict) and data.get("failed", 1) == 0
+
+
+def _test_call(ticket: Ticket) -> CrewCall:
+    return CrewCall(
+        node="test",
+        role="tester",
+        prompt=assemble("tester", [
+            Part("task", "Run the test suite and return a structured test result.\n"),
+            Part("branch", f"Repo: '{settings.github_repo}'. Branch: '{ticket['branch']}'."),
+        ]),
+        build=_test_crew,
+        # A retry pushes new commits to the same branch, so each attempt gets its own entry.
+        context={
+            "branch": ticket["branch"],
+            "pr_number": ticket.get("pr_number"),
+            "attempt": ticket["retries"],
+        },
+        accept=_tests_passed,
+    )
+
+
+def _test_update(state: TicketTask, ticket: Ticket, result: object) -> dict:
+    logger = get_run_logger(state["run_id"])
+
+    comparison = take_comparison(ticket["branch"]) if ticket.get("branch") else None
+    data = parse_json_result(result, TEST_RESULT)
     if data and isinstance(data, dict):
+        if comparison is not None:  # the tool's own, not whatever the agent copied
+            data["baseline"] = comparison
         ticket["test_result"] = data
         passed = data.get("failed", 1) == 0
     else:
         ticket["test_result"] = {"error": str(result)[:200]}
         passed = False
 
-    ticket["status"] = "tested" if passed else "test_failed"
+    _set_status(state, ticket, "tested" if passed else "test_failed")
+    if not passed:
+        ticket["retries"] += 1
     logger.log("test_complete", "Tester", {"gid": ticket["gid"], "passed": passed})
-    return {"completed_tickets": [ticket] if passed else [], "failed_tickets": [] if passed else [ticket]}
+    return {
+        "completed_tickets": [ticket] if passed else [],
+        "failed_tickets": [] if passed else [ticket],
+    }
+
+
+def _test_output(ticket: Ticket) -> str:
+    return _DRY_TEST if settings.dry_run else _kickoff(_test_call(ticket))
+
+
+async def _atest_output(ticket: Ticket) -> str:
+    return _DRY_TEST if settings.dry_run else await _akickoff(_test_call(ticket))
+
+
+def test_node(state: TicketTask, ticket: Ticket) -> dict:
+    return _test_update(state, ticket, _test_output(ticket))
+
+
+async def atest_node(state: TicketTask, ticket: Ticket) -> dict:
+    return _test_update(state, ticket, await _atest_output(ticket))
 
 
 # ── Reviewer node ─────────────────────────────────────────────────────────────
 
-def review_node(state: PipelineState, ticket: Ticket) -> dict:
-    logger = get_run_logger(state["run_id"])
+_DRY_REVIEW = '{"approved": true, "reason": "Looks good!"}'
+
+
+def _review_crew(description: str) -> Crew:
+    return _crew(
+        _lazy("make_reviewer")(), description, 'JSON: {"approved": bool, "reason": "..."}'
+    )
+
+
+def _review_approved(result: str) -> bool:
+    data = parse_json_result(result, REVIEW_VERDICT)
+    return isinstance(data, dict) and data.get("approved") is True
+
+
+def _test_part(test_result: dict | None, gate: GateResult) -> Part:
+    if test_result is None:  # speculative review: the tests are still running
+        return Part("test_result", "Tests are running separately; judge the diff only.")
+    return Part(
+        "test_result",
+        f"Test results: {json.dumps(compact_test_result(test_result, gate.stats))}.",
+        truncate,
+        original=f"Test results: {json.dumps(test_result)}.",
+    )
+
+
+def _review_call(ticket: Ticket, gate: GateResult) -> CrewCall:
+    return CrewCall(
+        node="review",
+        role="reviewer",
+        prompt=assemble("reviewer", [
+            Part("task", (
+                "Review the PR below. Diff size, coverage and ruff have been checked already "
+                "unless listed as skipped in the mechanical checks; check those, then judge "
+                "readability, design and test quality. Return JSON: {approved: bool, reason: str}\n"
+            )),
+            Part("pr", f"PR #{ticket['pr_number']} for branch '{ticket['branch']}'.\n"),
+            Part("checks", f"Mechanical checks: {json.dumps(gate.stats)}.\n"),
+            _test_part(ticket.get("test_result"), gate),
+        ]),
+        build=_review_crew,
+        context={
+            "branch": ticket["branch"],
+            "test_result": ticket.get("test_result"),
+            "attempt": ticket["retries"],
+        },
+        # Rejections are not cached: the coder may push a fix to the same branch.
+        accept=_review_approved,
+    )
+
+
+def _gate_result(state: TicketTask, ticket: Ticket) -> GateResult:
+    gate = pre_review(ticket["branch"], ticket.get("test_result"))
+    get_run_logger(state["run_id"]).log("review_gate", "Reviewer", {
+        "gid": ticket["gid"], "passed": gate.passed, "reasons": gate.reasons, **gate.stats,
+    })
+    return gate
 
-    if settings.dry_run:
-        result = '{"approved": true, "reason": "Looks good!"}'
-    else:
-        agent = make_reviewer()
-        task = Task(
-            description=(
-                f"Review PR #{ticket['pr_number']} for branch '{ticket['branch']}'. "
-                f"Test results: {json.dumps(ticket.get('test_result', {}))}. "
-                "Approve if: diff ≤ 400 lines, no coverage drop, ruff clean. "
-                "Return JSON: {approved: bool, reason: str}"
-            ),
-            expected_output='JSON: {"approved": bool, "reason": "..."}',
-            agent=agent,
-        )
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        result = str(crew.kickoff())
 
-    data = parse_json_result(result)
+def _rejection(gate: GateResult) -> str:
+    return json.dumps({"approved": False, "reason": "; ".join(gate.reasons)})
+
+
+def _review_update(state: TicketTask, ticket: Ticket, result: object) -> dict:
+    logger = get_run_logger(state["run_id"])
+
+    data = parse_json_result(result, REVIEW_VERDICT)
     if data and isinstance(data, dict):
         ticket["review_approved"] = data.get("approved", False)
         reason = data.get("reason", "")
     else:
         ticket["review_approved"] = False
         reason = "parse error"
+    ticket["review_reason"] = reason
 
-    ticket["status"] = "approved" if ticket["review_approved"] else "review_rejected"
-    logger.log("review_complete", "Reviewer", {"gid": ticket["gid"], "approved": ticket["review_approved"], "reason": reason})
+    _set_status(state, ticket, "approved" if ticket["review_approved"] else "review_rejected")
+    logger.log(
+        "review_complete",
+        "Reviewer",
+        {"gid": ticket["gid"], "approved": ticket["review_approved"], "reason": reason},
+    )
 
     if ticket["review_approved"]:
         return {"completed_tickets": [ticket]}
@@ -185,6 +513,196 @@ def review_node(state: PipelineState, ticket: Ticket) -> dict:
     return {"failed_tickets": [ticket]}
 
 
+def _review_output(state: TicketTask, ticket: Ticket) -> str:
+    if settings.dry_run:
+        return _DRY_REVIEW
+    check_cancelled()  # before the gate borrows a worktree
+    gate = _gate_result(state, ticket) if settings.review_gate else GateResult()
+    return _kickoff(_review_call(ticket, gate)) if gate.passed else _rejection(gate)
+
+
+async def _areview_output(state: TicketTask, ticket: Ticket) -> str:
+    if settings.dry_run:
+        return _DRY_REVIEW
+    if settings.review_gate:
+        gate = await asyncio.to_thread(_gate_result, state, ticket)
+    else:
+        gate = GateResult()
+    return await _akickoff(_review_call(ticket, gate)) if gate.passed else _rejection(gate)
+
+
+def review_node(state: TicketTask, ticket: Ticket) -> dict:
+    return _review_update(state, ticket, _review_output(state, ticket))
+
+
+async def areview_node(state: TicketTask, ticket: Ticket) -> dict:
+    return _review_update(state, ticket, await _areview_output(state, ticket))
+
+
+# ── Speculative test + review ─────────────────────────────────────────────────
+#
+# With ``speculative_review`` the diff review starts as soon as the coder has a
+# branch, next to the tests. Both stages only produce their agent's output; the
+# ticket is updated here once they are joined, so a cancelled stage never touches
+# it. The review's gate runs without a test result (diff size and ruff only), and
+# the coverage rule is applied at the join.
+
+def _speculation_cancelled(state: TicketTask, ticket: Ticket, stage: str) -> None:
+    get_run_logger(state["run_id"]).log("speculation_cancelled", "Pipeline", {
+        "gid": ticket["gid"], "cancelled": stage,
+    })
+
+
+def _join(state: TicketTask, ticket: Ticket, tested: str, reviewed: str) -> dict:
+    res = _test_update(state, ticket, tested)
+    if not res["completed_tickets"]:
+        return res
+    if settings.review_gate and not settings.dry_run and _review_approved(reviewed):
+        coverage = GateResult()
+        check_coverage(coverage, ticket["test_result"])
+        if not coverage.passed:
+            get_run_logger(state["run_id"]).log("review_gate", "Reviewer", {
+                "gid": ticket["gid"], "passed": False, "reasons": coverage.reasons,
+                **coverage.stats,
+            })
+            reviewed = _rejection(coverage)
+    return _review_update(state, ticket, reviewed)
+
+
+def _tracked(
+    run_id: str, node: str, gid: str, cancel: threading.Event, fn: Callable[..., str],
+    *args: object,
+) -> str:
+    with cancellable(cancel), track(run_id, node, gid):
+        return fn(*args)
+
+
+def speculative_test_review(state: TicketTask, ticket: Ticket) -> dict:
+    """Test and review a coded ticket at the same time, stopping at the first failure."""
+    run_id, gid = state["run_id"], ticket["gid"]
+    ticket["test_result"] = None
+    # A crew that is already running cannot be interrupted. Once ``cancel`` is set,
+    # the losing stage starts no further gate or crew (an agent slot it is granted
+    # goes straight back), and its result is neither cached nor used.
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"speculate-{gid}")
+    try:
+        test = executor.submit(_tracked, run_id, "test", gid, cancel, _test_output, ticket)
+        review = executor.submit(
+            _tracked, run_id, "review", gid, cancel, _review_output, state, ticket
+        )
+        done, _ = wait((test, review), return_when=FIRST_COMPLETED)
+        if test in done and not _tests_passed(test.result()):
+            if not review.done():
+                review.cancel()
+                _speculation_cancelled(state, ticket, "review")
+            return _test_update(state, ticket, test.result())
+        if test not in done and not _review_approved(review.result()):
+            test.cancel()
+            _speculation_cancelled(state, ticket, "test")
+            return _review_update(state, ticket, review.result())
+        return _join(state, ticket, test.result(), review.result())
+    finally:
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aspeculative_test_review(state: TicketTask, ticket: Ticket) -> dict:
+    """Async counterpart of ``speculative_test_review``; the losing stage is cancelled."""
+    run_id, gid = state["run_id"], ticket["gid"]
+    ticket["test_result"] = None
+
+    async def tracked(node: str, stage: Callable[[], Any]) -> str:
+        with track(run_id, node, gid):
+            return await stage()
+
+    test = asyncio.create_task(tracked("test", lambda: _atest_output(ticket)))
+    review = asyncio.create_task(tracked("review", lambda: _areview_output(state, ticket)))
+    try:
+        done, _ = await asyncio.wait((test, review), return_when=asyncio.FIRST_COMPLETED)
+        if test in done and not _tests_passed(test.result()):
+            if not review.done():
+                review.cancel()
+                _speculation_cancelled(state, ticket, "review")
+            return _test_update(state, ticket, test.result())
+        if test not in done and not _review_approved(review.result()):
+            test.cancel()
+            _speculation_cancelled(state, ticket, "test")
+            return _review_update(state, ticket, review.result())
+        return _join(state, ticket, await test, await review)
+    finally:
+        for task in (test, review):
+            task.cancel()
+
+
+# ── Retry node ────────────────────────────────────────────────────────────────
+
+# Statuses a ticket is re-dispatched from; every retry restarts at the coder.
+RETRYABLE = ("pending", "test_failed", "review_rejected")
+
+
+def retryable(ticket: Ticket) -> bool:
+    return ticket["status"] in RETRYABLE and ticket["retries"] < settings.max_ticket_retries
+
+
+def runnable(ticket: Ticket) -> bool:
+    """Still to run: never attempted, or failed with retries left."""
+    return retryable(ticket) or (ticket["status"] == "pending" and not ticket["retries"])
+
+
+def _blocked_by(final: list[Ticket]) -> list[Ticket]:
+    """Tickets still to run that depend, directly or not, on one that failed for good."""
+    failed = {t["gid"] for t in final if t["status"] != "approved" and not runnable(t)}
+    blocked: list[Ticket] = []
+    changed = True
+    while changed:
+        changed = False
+        for ticket in final:
+            if ticket["gid"] not in failed and failed & set(ticket.get("dependencies", [])):
+                failed.add(ticket["gid"])
+                blocked.append(ticket)
+                changed = True
+    return blocked
+
+
+def retry_node(state: PipelineState) -> dict:
+    """
+    Runs after every wave of ticket branches. Tickets that are out of retries
+    are escalated here, and the tickets waiting on them are blocked; the rest,
+    including dependents whose dependencies just passed, are dispatched by the
+    graph's router.
+    """
+    final = {t["gid"]: t for t in final_tickets(state)}
+    exhausted = []
+    for ticket in final.values():
+        if ticket["status"] in RETRYABLE and ticket["retries"] and not retryable(ticket):
+            ticket = dataclasses.replace(ticket)
+            _set_status(state, ticket, "escalated")
+            exhausted.append(ticket)
+    final.update((t["gid"], t) for t in exhausted)
+
+    logger = get_run_logger(state["run_id"])
+    blocked = []
+    for ticket in _blocked_by(list(final.values())):
+        ticket = dataclasses.replace(ticket)
+        _set_status(state, ticket, "blocked")
+        logger.log("ticket_blocked", "Scheduler", {"gid": ticket["gid"]})
+        blocked.append(ticket)
+
+    # Only retries count against max_graph_loops, not waves that start dependents.
+    retrying = [t["gid"] for t in final.values() if retryable(t) and t["retries"]]
+    logger.log("retry_wave", "Pipeline", {
+        "loop": state.get("loop_count", 0),
+        "retrying": retrying,
+        "escalated": [t["gid"] for t in exhausted],
+        "blocked": [t["gid"] for t in blocked],
+    })
+    return {
+        "failed_tickets": exhausted + blocked,
+        "loop_count": state.get("loop_count", 0) + bool(retrying),
+    }
+
+
 # ── Human gate node ───────────────────────────────────────────────────────────
 
 def human_gate_node(state: PipelineState) -> dict:
@@ -201,38 +719,87 @@ def human_gate_node(state: PipelineState) -> dict:
     # The graph will pause here. Resume by calling:
     #   graph.update_state(config, {"human_approved": True})
     #   graph.invoke(None, config)
+    # or from any process: python -m pipeline.graph.pipeline_graph --resume <run_id> --approve
+    if state.get("human_approved"):
+        return {"human_approved": True}
     print("\n⏸  HUMAN APPROVAL REQUIRED. Approve via Slack button or API. Graph is paused.\n")
     return {"human_approved": False}
 
 
 # ── Notifier node ─────────────────────────────────────────────────────────────
 
-def notify_node(state: PipelineState) -> dict:
+def _notify_crew(description: str) -> Crew:
+    return _crew(
+        _lazy("make_notifier")(), description, "Confirmation that Slack message was posted."
+    )
+
+
+def _notify_call(state: PipelineState) -> CrewCall:
+    # Final outcomes: a ticket that failed once and was then approved is completed.
+    final = final_tickets(state)
+    completed = [t for t in final if t["status"] == "approved"]
+    failed = [t for t in final if t["status"] != "approved"]
+    return CrewCall(
+        node="notify",
+        role="notifier",
+        prompt=assemble("notifier", [
+            Part("task", (
+                "Post a Slack summary of the run below. Use git blame to find code owners of "
+                "modified files and tag them. Keep the message under 10 lines.\n"
+            )),
+            Part("run", f"Channel: {settings.slack_channel}\nRun ID: {state['run_id']}\n"),
+            Part("tickets", (
+                f"Completed tickets: {[t['title'] for t in completed]}\n"
+                f"Failed tickets: {[t['title'] for t in failed]}"
+            ), truncate),
+        ]),
+        build=_notify_crew,
+    )
+
+
+def _notify_update(state: PipelineState) -> dict:
     logger = get_run_logger(state["run_id"])
+    use_cache = settings.cache_enabled and settings.is_live
+    cache_stats = get_response_cache().stats() if use_cache else {}
+    final = final_tickets(state)
+    approved = [t for t in final if t["status"] == "approved"]
+    logger.log("notify_complete", "Notifier", {
+        "completed": len(approved),
+        "failed": len(final) - len(approved),
+        "cache": cache_stats,
+    })
+    logger.log("metrics_summary", "Notifier", get_run_metrics(state["run_id"]).summary())
+    if settings.incremental_planning and not settings.dry_run:
+        PlanIndex(settings.plan_index_path).record(
+            state["spec_path"], {t["gid"]: t.to_dict() for t in approved}
+        )
+    if settings.metrics_export_path:
+        export_prometheus(state["run_id"], settings.metrics_export_path)
+    return {"slack_posted": True}
 
-    completed = state.get("completed_tickets", [])
-    failed = state.get("failed_tickets", [])
 
+def _post_summary(state: PipelineState) -> None:
+    """Template summary, posted in the run's Slack thread without an LLM call."""
+    summary = render_summary(state)
     if settings.dry_run:
-        print(f"[NOTIFY] Mock Slack message posted to {settings.slack_channel}")
+        print(f"[NOTIFY] Mock Slack message to {settings.slack_channel}:\n{summary}")
     else:
-        agent = make_notifier()
-        task = Task(
-            description=(
-                f"Post a Slack summary to {settings.slack_channel}.\n"
-                f"Run ID: {state['run_id']}\n"
-                f"Completed tickets: {[t['title'] for t in completed]}\n"
-                f"Failed tickets: {[t['title'] for t in failed]}\n"
-                "Use git blame to find code owners of modified files and tag them. "
-                "Keep the message under 10 lines."
-            ),
-            expected_output="Confirmation that Slack message was posted.",
-            agent=agent,
-        )
-        crew = Crew(agents=[agent], tasks=[task], verbose=False)
-        crew.kickoff()
+        queue_thread_reply(state["run_id"], summary)
 
-    logger.log("notify_complete", "Notifier", {
-        "completed": len(completed), "failed": len(failed)
-    })
-    return {"slack_posted": True}
+
+def notify_node(state: PipelineState) -> dict:
+    if settings.llm_notifier and not settings.dry_run:
+        _kickoff(_notify_call(state))
+    else:
+        _post_summary(state)
+
+    return _notify_update(state)
+
+
+async def anotify_node(state: PipelineState) -> dict:
+    if settings.llm_notifier and not settings.dry_run:
+        await _akickoff(_notify_call(state))
+    else:
+        _post_summary(state)
+
+    return _notify_update(state)
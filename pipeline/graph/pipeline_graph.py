@@ -2,28 +2,74 @@
 LangGraph pipeline orchestration.
 
 Graph topology:
-  plan → [parallel coder branches] → test → review → human_gate → notify
-
-Parallel coders: independent tickets run in fan-out; results collected via
-Annotated[list, operator.add] state fields.
+  plan → [parallel coder branches] → test → review → retry → human_gate → notify
+                     ↑__________________________________|
+
+Parallel coders: the tickets run in waves, one superstep each. A wave holds
+every ticket whose dependencies have been approved; a dependency-aware
+TicketScheduler orders its branches and caps how many run at once. Results are
+collected via gid-keyed reducers. The retry stage then sends the next wave: the
+failed tickets, after a jittered exponential backoff, and the dependents that
+can start now. Dependents only start once the superstep that approved their
+dependencies has been checkpointed, so a resumed run never redoes a ticket that
+finished. Planning is never repeated.
+
+Speculative review: with ``speculative_review`` a branch reviews the diff while
+its tests run, instead of after them (see ``nodes.speculative_test_review``).
+
+Worker mode: with ``ticket_executor=queue`` a branch puts its ticket on the job
+queue and waits for a ``pipeline worker`` process to run it (see pipeline.worker).
 """
 from __future__ import annotations
 
+import argparse
+import asyncio
+import dataclasses
+import random
+import time
 import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
 
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import END, StateGraph
-
+from pipeline.asana_client import flush_status_updates
 from pipeline.config import settings
 from pipeline.graph.nodes import (
+    acode_node,
+    anotify_node,
+    aplan_node,
+    areview_node,
+    aspeculative_test_review,
+    atest_node,
     code_node,
     human_gate_node,
     notify_node,
     plan_node,
+    retry_node,
     review_node,
+    runnable,
+    speculative_test_review,
     test_node,
 )
-from pipeline.graph.state import PipelineState
+from pipeline.graph.scheduler import (
+    TicketScheduler,
+    drop_scheduler,
+    get_scheduler,
+    register_scheduler,
+)
+from pipeline.graph.state import PipelineState, Ticket, TicketTask
+from pipeline.graph.summary import final_tickets
+from pipeline.jobqueue import Job, get_job_queue
+from pipeline.logger import drop_run_logger, flush_logs, get_run_logger
+from pipeline.metrics import current_span, drop_run_metrics, instrument, track
+from pipeline.slack_notifier import flush_slack_updates, queue_ticket_status
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+
+# langgraph and langchain_core are imported where the graph is built, so that
+# ``--help`` and ``--profile-startup`` do not pay for them.
 
 # ── Routing helpers ───────────────────────────────────────────────────────────
 
@@ -37,6 +83,8 @@ def _should_continue(state: PipelineState) -> str:
 
 
 def _after_human_gate(state: PipelineState) -> str:
+    from langgraph.graph import END
+
     if state.get("human_approved"):
         return "notify"
     return END  # Graph paused, waiting for external resume
@@ -44,56 +92,292 @@ def _after_human_gate(state: PipelineState) -> str:
 
 # ── Parallel coder fan-out ────────────────────────────────────────────────────
 
-def _fan_out_coders(state: PipelineState) -> list | str:
+def _next_wave(state: PipelineState) -> tuple[TicketScheduler, list[Ticket]]:
     """
-    Decide whether to fan out into parallel ticket processing branches or proceed to notify.
+    The scheduler over every ticket still to run, and the ones of them that can
+    run now because all of their dependencies have been approved.
+
+    Tickets waiting on a dependency stay in the scheduler so that the
+    critical-path priority of the wave accounts for the work behind it.
     """
+    final = final_tickets(state)
+    tickets = [t for t in final if runnable(t)]
+    done = {t["gid"] for t in final if t["status"] == "approved"}
+    failed = {t["gid"] for t in final} - done - {t["gid"] for t in tickets}
+    scheduler = TicketScheduler(tickets, settings.max_parallel_coders, done=done, failed=failed)
+    by_gid = {t["gid"]: t for t in tickets}
+    return scheduler, [by_gid[gid] for gid in scheduler.order if scheduler.ready(gid)]
+
+
+def _dispatch(state: PipelineState, scheduler: TicketScheduler, wave: list[Ticket]) -> list:
+    """Register the run's scheduler and send each ticket of the wave to its own branch."""
     from langgraph.types import Send
 
+    register_scheduler(state["run_id"], scheduler)
+    # One Send per ticket; the payload is the ticket alone, not a copy of the state.
+    return [Send("process_ticket", TicketTask(run_id=state["run_id"], ticket=t)) for t in wave]
+
+
+def _fan_out_coders(state: PipelineState) -> list | str:
+    """
+    Decide whether to fan out into parallel ticket processing branches or proceed to notify.
+
+    Every ticket without pending dependencies gets a branch, emitted in
+    topological order. The per-run TicketScheduler then gates the branches on
+    the ``max_parallel_coders`` slot budget, so a new ticket starts as soon as any
+    running one finishes instead of waiting for a whole batch.
+    """
     if state.get("loop_count", 0) > settings.max_graph_loops:
         return "notify"
 
-    pending = [t for t in state["tickets"] if t["status"] == "pending"]
-    if not pending:
+    scheduler, wave = _next_wave(state)
+    if not wave:
         return "notify"
-
-    # Limit parallelism
-    batch = pending[:settings.max_parallel_coders]
-
-    # Return Send objects for parallel execution
-    return [Send("process_ticket", {"state": state, "ticket": t}) for t in batch]
+    return _dispatch(state, scheduler, wave)
 
 
-def _process_ticket(inputs: dict) -> dict:
+def _fan_out_retries(state: PipelineState) -> list | str:
     """
-    Consolidated node for processing a single ticket: Code -> Test -> Review.
+    Send the next wave: the tickets that failed in the last one and the
+    dependents it unblocked. Otherwise move on to the human gate.
     """
-    state = inputs["state"]
-    ticket = inputs["ticket"]
+    if state.get("loop_count", 0) > settings.max_graph_loops:
+        return "human_gate"
+
+    scheduler, wave = _next_wave(state)
+    if not wave:
+        return "human_gate"
+    # Copies, so the failed attempt recorded in failed_tickets stays as it was.
+    return _dispatch(state, scheduler, [dataclasses.replace(t) for t in wave])
+
+
+def run_ticket(state: TicketTask, ticket: Ticket) -> dict:
+    """Code -> Test -> Review for a single ticket."""
+    run_id, gid = state["run_id"], ticket["gid"]
 
     # 1. Code
-    res = code_node(state, ticket)
+    with track(run_id, "code", gid):
+        res = code_node(state, ticket)
     if not res.get("completed_tickets"):
         return res
 
+    # 2+3. Test and review side by side
+    if settings.speculative_review:
+        return speculative_test_review(state, ticket)
+
     # 2. Test
-    res = test_node(state, ticket)
+    with track(run_id, "test", gid):
+        res = test_node(state, ticket)
     if not res.get("completed_tickets"):
         return res
 
     # 3. Review
-    return review_node(state, ticket)
+    with track(run_id, "review", gid):
+        return review_node(state, ticket)
+
+
+async def arun_ticket(state: TicketTask, ticket: Ticket) -> dict:
+    """Async Code -> Test -> Review for a single ticket."""
+    run_id, gid = state["run_id"], ticket["gid"]
+
+    with track(run_id, "code", gid):
+        res = await acode_node(state, ticket)
+    if not res.get("completed_tickets"):
+        return res
+
+    if settings.speculative_review:
+        return await aspeculative_test_review(state, ticket)
+
+    with track(run_id, "test", gid):
+        res = await atest_node(state, ticket)
+    if not res.get("completed_tickets"):
+        return res
+
+    with track(run_id, "review", gid):
+        return await areview_node(state, ticket)
+
+
+# ── Worker mode ───────────────────────────────────────────────────────────────
+
+def _job_id(task: TicketTask, ticket: Ticket) -> str:
+    """One job per attempt; a resumed run re-puts the same id and finds its result."""
+    return f"{task['run_id']}/{ticket['gid']}/{ticket['retries']}"
+
+
+def _submit(task: TicketTask, ticket: Ticket) -> str:
+    job_id = _job_id(task, ticket)
+    get_job_queue().put(job_id, task["run_id"], ticket["gid"], {
+        "run_id": task["run_id"], "ticket": ticket.to_dict(),
+    })
+    return job_id
+
+
+def _check(task: TicketTask, ticket: Ticket, job_id: str, claimed: bool) -> tuple[Job, bool]:
+    """Fetch the job; post progress the first time a worker is seen holding it."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise RuntimeError(f"Job {job_id} vanished from the queue")
+    if job.status == "leased" and not claimed:
+        # Workers do not post to Slack themselves: the run's message lives here.
+        queue_ticket_status(task["run_id"], ticket["gid"], ticket["title"], "in_progress")
+        claimed = True
+    return job, claimed
+
+
+def _job_result(task: TicketTask, ticket: Ticket, job: Job) -> dict:
+    if job.status == "failed" or job.result is None:
+        raise RuntimeError(f"Job {job.id} failed on worker {job.worker}: {job.error}")
+    res = {key: [Ticket.from_dict(t) for t in job.result.get(key, [])]
+           for key in ("completed_tickets", "failed_tickets")}
+    latest = (res["failed_tickets"] or res["completed_tickets"])[-1:]
+    for remote in latest:
+        for name, value in remote.to_dict().items():
+            ticket[name] = value
+    queue_ticket_status(task["run_id"], ticket["gid"], ticket["title"], ticket["status"])
+    get_run_logger(task["run_id"]).log("job_complete", "Pipeline", {
+        "gid": ticket["gid"], "job": job.id, "worker": job.worker, "attempts": job.attempts,
+    })
+    return res
+
+
+def _run_remote(task: TicketTask, ticket: Ticket) -> dict:
+    job_id = _submit(task, ticket)
+    job, claimed = _check(task, ticket, job_id, claimed=False)
+    while not job.finished:
+        time.sleep(settings.job_poll_seconds)
+        job, claimed = _check(task, ticket, job_id, claimed)
+    return _job_result(task, ticket, job)
+
+
+async def _arun_remote(task: TicketTask, ticket: Ticket) -> dict:
+    job_id = _submit(task, ticket)
+    job, claimed = _check(task, ticket, job_id, claimed=False)
+    while not job.finished:
+        await asyncio.sleep(settings.job_poll_seconds)
+        job, claimed = _check(task, ticket, job_id, claimed)
+    return _job_result(task, ticket, job)
+
+
+def _execute(task: TicketTask, ticket: Ticket) -> dict:
+    if settings.ticket_executor == "queue":
+        return _run_remote(task, ticket)
+    return run_ticket(task, ticket)
+
+
+async def _aexecute(task: TicketTask, ticket: Ticket) -> dict:
+    if settings.ticket_executor == "queue":
+        return await _arun_remote(task, ticket)
+    return await arun_ticket(task, ticket)
+
+
+@contextmanager
+def _queue_wait() -> Iterator[None]:
+    """Attribute time spent waiting on the scheduler to the ticket's span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span = current_span()
+        if span is not None:
+            span.queue_wait += time.perf_counter() - start
+
+
+def _backoff(ticket: Ticket) -> float:
+    """Full-jitter exponential backoff for a retried ticket; 0 on its first attempt."""
+    if not ticket["retries"] or ticket["status"] == "blocked":
+        return 0.0
+    exponential = settings.retry_backoff_base * 2 ** (ticket["retries"] - 1)
+    cap = min(settings.retry_backoff_max, exponential)
+    return random.uniform(0, cap)  # noqa: S311 - jitter, not crypto
+
+
+def _record_retries(ticket: Ticket) -> None:
+    span = current_span()
+    if span is not None:
+        span.retries = ticket.get("retries", 0)
+
+
+def _blocked(state: TicketTask, ticket: Ticket) -> dict:
+    ticket["status"] = "blocked"
+    queue_ticket_status(state["run_id"], ticket["gid"], ticket["title"], "blocked")
+    logger = get_run_logger(state["run_id"])
+    logger.log("ticket_blocked", "Scheduler", {"gid": ticket["gid"]})
+    return {"failed_tickets": [ticket]}
+
+
+def _process_ticket(task: TicketTask) -> dict:
+    """
+    Consolidated node for processing a single ticket: Code -> Test -> Review.
+    Waits for the run's scheduler to release the ticket before starting.
+    """
+    state, ticket = task, task["ticket"]
+
+    scheduler = get_scheduler(state["run_id"])
+    if scheduler is None:
+        return _execute(state, ticket)
+
+    with _queue_wait():
+        if delay := _backoff(ticket):
+            time.sleep(delay)
+        acquired = scheduler.acquire(ticket["gid"])
+    if not acquired:
+        return _blocked(state, ticket)
+
+    res: dict = {}
+    try:
+        res = _execute(state, ticket)
+    finally:
+        scheduler.release(ticket["gid"], success=bool(res.get("completed_tickets")))
+        _record_retries(ticket)
+    return res
+
+
+async def _aprocess_ticket(task: TicketTask) -> dict:
+    """Async counterpart of ``_process_ticket`` used by ``graph.astream``."""
+    state, ticket = task, task["ticket"]
+
+    scheduler = get_scheduler(state["run_id"])
+    if scheduler is None:
+        return await _aexecute(state, ticket)
+
+    with _queue_wait():
+        if delay := _backoff(ticket):
+            await asyncio.sleep(delay)
+        acquired = await scheduler.aacquire(ticket["gid"])
+    if not acquired:
+        return _blocked(state, ticket)
+
+    res: dict = {}
+    try:
+        res = await _aexecute(state, ticket)
+    finally:
+        scheduler.release(ticket["gid"], success=bool(res.get("completed_tickets")))
+        _record_retries(ticket)
+    return res
 
 
 # ── Build graph ───────────────────────────────────────────────────────────────
 
-def build_graph():
+def _node(name: str, func: Callable, afunc: Callable) -> RunnableLambda:
+    from langchain_core.runnables import RunnableLambda
+
+    return RunnableLambda(instrument(name, func), afunc=instrument(name, afunc), name=name)
+
+
+def build_graph(checkpointer: BaseCheckpointSaver | None = None):
+    from langgraph.graph import END, StateGraph
+
+    from pipeline.graph.checkpoint import get_checkpointer
+
     builder = StateGraph(PipelineState)
 
-    builder.add_node("plan", plan_node)
-    builder.add_node("process_ticket", _process_ticket)
-    builder.add_node("human_gate", human_gate_node)
-    builder.add_node("notify", notify_node)
+    # Each node carries a sync and an async implementation; graph.stream uses the
+    # former, graph.astream the latter. Every node is wrapped for metrics.
+    builder.add_node("plan", _node("plan", plan_node, aplan_node))
+    builder.add_node("process_ticket", _node("process_ticket", _process_ticket, _aprocess_ticket))
+    builder.add_node("retry", instrument("retry", retry_node))
+    builder.add_node("human_gate", instrument("human_gate", human_gate_node))
+    builder.add_node("notify", _node("notify", notify_node, anotify_node))
 
     builder.set_entry_point("plan")
 
@@ -103,8 +387,14 @@ def build_graph():
         "notify": "notify",
     })
 
-    # After each branch, go to human_gate
-    builder.add_edge("process_ticket", "human_gate")
+    # Once every branch of a wave has finished, re-send the failed tickets or
+    # go on to human_gate. The retry node is the join point: a conditional edge
+    # on process_ticket itself would fire once per branch.
+    builder.add_edge("process_ticket", "retry")
+    builder.add_conditional_edges("retry", _fan_out_retries, {
+        "process_ticket": "process_ticket",
+        "human_gate": "human_gate",
+    })
 
     builder.add_conditional_edges("human_gate", _after_human_gate, {
         "notify": "notify",
@@ -114,9 +404,8 @@ def build_graph():
     builder.add_edge("notify", END)
 
     # Interrupt before merge (human gate)
-    checkpointer = MemorySaver()
     graph = builder.compile(
-        checkpointer=checkpointer,
+        checkpointer=checkpointer or get_checkpointer(),
         interrupt_before=["human_gate"] if not settings.dry_run else [],
     )
     return graph
@@ -124,9 +413,8 @@ def build_graph():
 
 # ── Entrypoint ────────────────────────────────────────────────────────────────
 
-def run_pipeline(spec_path: str = "SPEC.md") -> None:
-    run_id = str(uuid.uuid4())[:8]
-    initial_state: PipelineState = {
+def _initial_state(spec_path: str, run_id: str) -> PipelineState:
+    return {
         "spec_path": spec_path,
         "run_id": run_id,
         "tickets": [],
@@ -137,20 +425,142 @@ def run_pipeline(spec_path: str = "SPEC.md") -> None:
         "loop_count": 0,
     }
 
-    graph = build_graph()
+
+def _restore_scheduler(graph, config: dict) -> None:
+    """
+    Rebuild the run's TicketScheduler from its last checkpoint.
+
+    Branches that already wrote a result are not re-executed by LangGraph on
+    resume; the scheduler only needs to gate the ones that had not finished.
+    """
+    snapshot = graph.get_state(config)
+    if "process_ticket" not in snapshot.next:
+        return
+
+    values = snapshot.values
+    _, wave = _next_wave(values)
+    done: set[str] = set()
+    failed: set[str] = set()
+    for task in snapshot.tasks:
+        if task.name == "process_ticket" and task.result:
+            done |= {t["gid"] for t in task.result.get("completed_tickets", [])}
+            failed |= {t["gid"] for t in task.result.get("failed_tickets", [])}
+
+    unfinished = [t for t in wave if t["gid"] not in done | failed]
+    run_id = values["run_id"]
+    register_scheduler(run_id, TicketScheduler(unfinished, settings.max_parallel_coders))
+    get_run_logger(run_id).log("run_resumed", "Pipeline", {
+        "done": len(done), "failed": len(failed), "remaining": len(unfinished),
+    })
+
+
+def start_run(
+    graph, spec_path: str, resume: str | None, approve: bool
+) -> tuple[str, dict, dict | None]:
+    """Return (run_id, config, graph input) for a fresh or resumed run."""
+    run_id = resume or str(uuid.uuid4())[:8]
     config = {"configurable": {"thread_id": run_id}}
+    if not resume:
+        return run_id, config, _initial_state(spec_path, run_id)
+
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        raise SystemExit(f"No checkpoint found for run {run_id} in {settings.checkpoint_path}")
+    if approve and "human_gate" in snapshot.next:
+        graph.update_state(config, {"human_approved": True})
+    _restore_scheduler(graph, config)
+    return run_id, config, None
+
+
+def _report(graph, config: dict, run_id: str) -> None:
+    if graph.get_state(config).next:
+        print(f"\n⏸  Pipeline run {run_id} paused. Continue with --resume {run_id} [--approve].\n")
+    else:
+        print(f"\n✅ Pipeline run {run_id} complete.\n")
+
 
-    print(f"\n🚀 Pipeline run {run_id} starting...\n")
-    for step in graph.stream(initial_state, config=config, stream_mode="updates"):
-        node, update = next(iter(step.items()))
-        print(f"  ✓ {node}")
+def drop_run(run_id: str) -> None:
+    """Forget the in-process state of a run that has stopped: scheduler, metrics and logger."""
+    drop_scheduler(run_id)
+    drop_run_metrics(run_id)
+    drop_run_logger(run_id)
 
-    print(f"\n✅ Pipeline run {run_id} complete.\n")
+
+def flush_checkpoints(graph) -> None:
+    """Commit the graph's pending checkpoints and send the queued Asana, Slack and log updates."""
+    from pipeline.graph.checkpoint import flush_checkpointer
+
+    flush_checkpointer(graph.checkpointer)
+    flush_status_updates()
+    flush_slack_updates()
+    flush_logs()
+
+
+def finish_run(graph, run_id: str) -> None:
+    drop_run(run_id)
+    flush_checkpoints(graph)
+
+
+def run_pipeline(
+    spec_path: str = "SPEC.md", resume: str | None = None, approve: bool = False
+) -> None:
+    graph = build_graph()
+    run_id, config, inputs = start_run(graph, spec_path, resume, approve)
+
+    verb = "resuming" if resume else "starting"
+    print(f"\n🚀 Pipeline run {run_id} {verb}...\n")
+    try:
+        for step in graph.stream(inputs, config=config, stream_mode="updates"):
+            node, _ = next(iter(step.items()))
+            print(f"  ✓ {node}")
+    finally:
+        finish_run(graph, run_id)
+
+    _report(graph, config, run_id)
+
+
+async def arun_pipeline(
+    spec_path: str = "SPEC.md", resume: str | None = None, approve: bool = False
+) -> None:
+    """Async entrypoint: ticket branches wait on LLM/tool I/O without holding threads."""
+    graph = build_graph()
+    run_id, config, inputs = start_run(graph, spec_path, resume, approve)
+
+    verb = "resuming" if resume else "starting"
+    print(f"\n🚀 Pipeline run {run_id} {verb} (async)...\n")
+    try:
+        async for step in graph.astream(inputs, config=config, stream_mode="updates"):
+            node, _ = next(iter(step.items()))
+            print(f"  ✓ {node}")
+    finally:
+        finish_run(graph, run_id)
+
+    _report(graph, config, run_id)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--spec", default="SPEC.md")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run nodes asynchronously via graph.astream.")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Continue a run from its last checkpoint.")
+    parser.add_argument("--approve", action="store_true",
+                        help="With --resume: approve a run paused at the human gate.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import time of a cold start, then exit.")
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.profile_startup:
+        from pipeline.startup import report
+        print(report())
+    elif args.use_async:
+        asyncio.run(arun_pipeline(args.spec, args.resume, args.approve))
+    else:
+        run_pipeline(args.spec, args.resume, args.approve)
 
 
 if __name__ == "__main__":
-    import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("--spec", default="SPEC.md")
-    args = parser.parse_args()
-    run_pipeline(args.spec)
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,271 @@
+"""
+Dependency-aware ticket scheduler.
+
+Builds a DAG from the planner's ``dependencies`` and hands out execution slots
+to ``process_ticket`` branches. A ticket becomes ready once all of its
+dependencies have finished successfully; among ready tickets, the one with the
+longest remaining critical path (weighted by ``complexity``) starts first.
+A slot is handed to the next ready ticket as soon as a running one finishes.
+The graph only sends the tickets that are ready when a wave starts; their
+dependents wait for the next wave, after the superstep has been checkpointed.
+
+Branches compete only with branches that are actually waiting: LangGraph runs
+the sync branches on a bounded thread pool, so the top-priority ready ticket
+may not have a thread yet, and waiting for it would stall every branch.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import threading
+from collections.abc import Iterable
+
+from pipeline.graph.state import Ticket
+
+COMPLEXITY_WEIGHTS: dict[str, int] = {"XS": 1, "S": 1, "M": 2, "L": 3, "XL": 5}
+DEFAULT_WEIGHT = 2
+
+
+def complexity_weight(complexity: str | None) -> int:
+    return COMPLEXITY_WEIGHTS.get((complexity or "").upper(), DEFAULT_WEIGHT)
+
+
+class TicketScheduler:
+    """Thread-safe ready queue over a ticket dependency graph."""
+
+    def __init__(
+        self,
+        tickets: Iterable[Ticket],
+        max_parallel: int,
+        done: Iterable[str] = (),
+        failed: Iterable[str] = (),
+    ) -> None:
+        self.max_parallel = max(1, max_parallel)
+        self._cond = threading.Condition()
+        self._tickets: dict[str, Ticket] = {t["gid"]: t for t in tickets}
+        self._done: set[str] = set(done)
+        self._failed: set[str] = set(failed)
+        self._running: set[str] = set()
+        self._async_waiters: list[asyncio.Future] = []
+
+        # Unknown dependency GIDs (created in an earlier run, or hallucinated by the
+        # planner) are treated as satisfied rather than blocking the ticket forever.
+        known = self._tickets.keys() | self._done | self._failed
+        self._deps: dict[str, set[str]] = {
+            gid: {d for d in t.get("dependencies", []) if d in known and d != gid}
+            for gid, t in self._tickets.items()
+        }
+        self._dependents: dict[str, set[str]] = {gid: set() for gid in self._tickets}
+        for gid, deps in self._deps.items():
+            for dep in deps:
+                if dep in self._dependents:
+                    self._dependents[dep].add(gid)
+
+        self.order = self._topological_order()
+        self._position = {gid: i for i, gid in enumerate(self.order)}
+        self.priority = self._critical_path()
+
+        self._ready: list[tuple[int, int, str]] = []
+        self._queued: set[str] = set()
+        # Ready tickets whose branch is blocked in acquire/aacquire (lazily pruned).
+        self._waiting: set[str] = set()
+        self._contending: list[tuple[int, int, str]] = []
+        with self._cond:
+            for gid in self.order:
+                if self._is_blocked(gid):
+                    self._fail(gid)
+                else:
+                    self._maybe_ready(gid)
+
+    # ── Graph analysis ────────────────────────────────────────────────────────
+
+    def _topological_order(self) -> list[str]:
+        """Kahn's algorithm; ties keep the planner's original ordering."""
+        position = {gid: i for i, gid in enumerate(self._tickets)}
+        indegree = {gid: len(self._deps[gid] & self._tickets.keys()) for gid in self._tickets}
+        heap = [(position[gid], gid) for gid, n in indegree.items() if n == 0]
+        heapq.heapify(heap)
+        order: list[str] = []
+        while heap:
+            _, gid = heapq.heappop(heap)
+            order.append(gid)
+            for child in self._dependents[gid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(heap, (position[child], child))
+
+        if len(order) != len(self._tickets):
+            cyclic = sorted(set(self._tickets) - set(order))
+            raise ValueError(f"Dependency cycle among tickets: {', '.join(cyclic)}")
+        return order
+
+    def _critical_path(self) -> dict[str, int]:
+        """Longest weighted path from each ticket to the end of the DAG."""
+        priority: dict[str, int] = {}
+        for gid in reversed(self.order):
+            tail = max((priority[c] for c in self._dependents[gid]), default=0)
+            priority[gid] = complexity_weight(self._tickets[gid].get("complexity")) + tail
+        return priority
+
+    # ── Ready queue ───────────────────────────────────────────────────────────
+
+    def _maybe_ready(self, gid: str) -> None:
+        if gid in self._queued or gid in self._done or gid in self._failed:
+            return
+        if self._deps[gid] <= self._done:
+            self._queued.add(gid)
+            heapq.heappush(self._ready, self._entry(gid))
+            if gid in self._waiting:
+                heapq.heappush(self._contending, self._entry(gid))
+
+    def _entry(self, gid: str) -> tuple[int, int, str]:
+        return (-self.priority[gid], self._position[gid], gid)
+
+    def _wait(self, gid: str) -> None:
+        self._waiting.add(gid)
+        if gid in self._queued:
+            heapq.heappush(self._contending, self._entry(gid))
+
+    def _stop_waiting(self, gid: str) -> None:
+        self._waiting.discard(gid)
+        self._wake()  # another waiter may now be the best contender
+
+    def _best_waiting(self) -> str | None:
+        while self._contending:
+            gid = self._contending[0][2]
+            if gid in self._waiting and gid in self._queued and gid not in self._running:
+                return gid
+            heapq.heappop(self._contending)
+        return None
+
+    def ready(self, gid: str) -> bool:
+        """True once every dependency of ``gid`` has finished successfully."""
+        with self._cond:
+            return gid not in self._failed and self._deps[gid] <= self._done
+
+    def _is_blocked(self, gid: str) -> bool:
+        return bool(self._deps[gid] & self._failed)
+
+    def _can_start(self, gid: str, waiting_only: bool) -> bool:
+        if len(self._running) >= self.max_parallel:
+            return False
+        if waiting_only:
+            return self._best_waiting() == gid
+        return bool(self._ready) and self._ready[0][2] == gid
+
+    def try_start(self, gid: str) -> bool | None:
+        """
+        Non-blocking claim of a slot for ``gid``, ranked against every ready ticket.
+        Returns True when started, False when a dependency failed, None to keep waiting.
+        """
+        with self._cond:
+            return self._try_start(gid)
+
+    def _try_start(self, gid: str, waiting_only: bool = False) -> bool | None:
+        if self._is_blocked(gid):
+            self._fail(gid)
+            return False
+        if not self._can_start(gid, waiting_only):
+            return None
+        self._ready.remove(self._entry(gid))
+        heapq.heapify(self._ready)
+        self._running.add(gid)
+        return True
+
+    def acquire(self, gid: str, timeout: float | None = None) -> bool:
+        """
+        Block until ``gid`` is the highest-priority ready ticket among the waiting
+        branches and a slot is free.
+        Returns False if the ticket can never run because a dependency failed.
+        """
+        with self._cond:
+            self._wait(gid)
+            try:
+                started = self._cond.wait_for(
+                    lambda: self._try_start(gid, waiting_only=True) is not None, timeout
+                )
+            finally:
+                self._stop_waiting(gid)
+            return bool(started) and gid in self._running
+
+    async def aacquire(self, gid: str) -> bool:
+        """Async variant of ``acquire``; waits without holding a worker thread."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            self._wait(gid)
+        try:
+            while True:
+                with self._cond:
+                    started = self._try_start(gid, waiting_only=True)
+                    if started is not None:
+                        return started
+                    waiter = loop.create_future()
+                    self._async_waiters.append(waiter)
+                await waiter
+        finally:
+            with self._cond:
+                self._stop_waiting(gid)
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+
+    def release(self, gid: str, success: bool) -> None:
+        """Free the slot held by ``gid`` and promote any newly-ready dependents."""
+        with self._cond:
+            self._running.discard(gid)
+            if success:
+                self._done.add(gid)
+                for child in self._dependents.get(gid, ()):
+                    self._maybe_ready(child)
+            else:
+                self._fail(gid)
+            self._wake()
+
+    def _fail(self, gid: str) -> None:
+        """Mark ``gid`` failed and cascade to everything downstream of it."""
+        stack = [gid]
+        while stack:
+            current = stack.pop()
+            if current in self._failed:
+                continue
+            self._failed.add(current)
+            self._queued.discard(current)
+            stack.extend(self._dependents.get(current, ()))
+        self._ready = [entry for entry in self._ready if entry[2] not in self._failed]
+        heapq.heapify(self._ready)
+        self._wake()
+
+    @property
+    def running(self) -> int:
+        with self._cond:
+            return len(self._running)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# ── Per-run registry ──────────────────────────────────────────────────────────
+
+_schedulers: dict[str, TicketScheduler] = {}
+_registry_lock = threading.Lock()
+
+
+def register_scheduler(run_id: str, scheduler: TicketScheduler) -> TicketScheduler:
+    with _registry_lock:
+        _schedulers[run_id] = scheduler
+    return scheduler
+
+
+def get_scheduler(run_id: str) -> TicketScheduler | None:
+    with _registry_lock:
+        return _schedulers.get(run_id)
+
+
+def drop_scheduler(run_id: str) -> None:
+    with _registry_lock:
+        _schedulers.pop(run_id, None)
@@ -1,25 +1,103 @@
-import operator
-from typing import Annotated, TypedDict
+import dataclasses
+import json
+from dataclasses import dataclass, field
+from typing import Annotated, Any, NotRequired
 
+# typing_extensions' TypedDict so pydantic can validate these on Python 3.11.
+from typing_extensions import TypedDict
+
+
+@dataclass(slots=True)
+class Ticket:
+    """
+    One ticket. Slotted to keep thousands of them small, and indexable like the
+    dicts the planner and tests produce, so ``ticket["status"]`` works on both.
+    """
 
-class Ticket(TypedDict):
     gid: str
     title: str
-    dependencies: list[str]
-    complexity: str
-    branch: str | None
-    pr_number: str | None
-    test_result: dict | None
-    review_approved: bool | None
-    retries: int
-    status: str  # pending, in_progress, tested, test_failed, approved, review_rejected, escalated
+    dependencies: list[str] = field(default_factory=list)
+    complexity: str = "M"
+    branch: str | None = None
+    pr_number: str | None = None
+    test_result: dict | None = None
+    review_approved: bool | None = None
+    review_reason: str = ""
+    retries: int = 0
+    # pending, in_progress, tested, test_failed, approved, review_rejected, escalated, blocked
+    status: str = "pending"
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401 - fields differ in type
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: object) -> None:
+        if key not in _TICKET_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _TICKET_FIELDS
+
+    def get(self, key: str, default: object = None) -> Any:  # noqa: ANN401 - as __getitem__
+        return getattr(self, key, default) if key in _TICKET_FIELDS else default
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in _TICKET_FIELDS}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Ticket":
+        return cls(**{k: v for k, v in data.items() if k in _TICKET_FIELDS})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Ticket":
+        return cls.from_dict(json.loads(raw))
+
+
+_TICKET_FIELDS = tuple(f.name for f in dataclasses.fields(Ticket))
+
+
+def merge_by_gid(left: list[Ticket], right: list[Ticket]) -> list[Ticket]:
+    """Channel reducer: a ticket's newer entry replaces its older one, keeping its position."""
+    merged = {t["gid"]: t for t in left}
+    merged.update((t["gid"], t) for t in right)
+    return list(merged.values())
+
+class BaselineComparison(TypedDict, total=False):
+    """The changed files' coverage against the base commit's full-suite run."""
+    sha: str
+    coverage: float | None
+    failed: int | None
+    file_coverage_delta: dict[str, float]
+    coverage_dropped: bool
+
+class TestResult(TypedDict):
+    total: int
+    passed: int
+    failed: int
+    coverage: NotRequired[float]
+    baseline: NotRequired[BaselineComparison]
+
+class ReviewVerdict(TypedDict):
+    approved: bool
+    reason: NotRequired[str]
 
 class PipelineState(TypedDict):
     spec_path: str
     run_id: str
     tickets: list[Ticket]
-    completed_tickets: Annotated[list[Ticket], operator.add]
-    failed_tickets: Annotated[list[Ticket], operator.add]
+    completed_tickets: Annotated[list[Ticket], merge_by_gid]
+    failed_tickets: Annotated[list[Ticket], merge_by_gid]
     human_approved: bool
     slack_posted: bool
     loop_count: int
+
+class TicketTask(TypedDict):
+    """Payload of one ``process_ticket`` branch: just the ticket, not the run's whole state."""
+    run_id: str
+    ticket: Ticket
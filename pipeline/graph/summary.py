@@ -0,0 +1,78 @@
+"""
+End-of-run summary rendered from graph state.
+
+Everything the summary needs is already in the state: final ticket statuses,
+test coverage and review reasons. Rendering it with a template takes no LLM
+call. The Notifier agent, which also tags code owners, is only used when
+``settings.llm_notifier`` is set.
+"""
+from __future__ import annotations
+
+from pipeline.graph.state import PipelineState, Ticket
+
+BAR_WIDTH = 20
+
+
+def final_tickets(state: PipelineState) -> list[Ticket]:
+    """
+    One entry per ticket with its final outcome.
+
+    A ticket can be reported several times as it is retried; any approval
+    wins, otherwise the last failure stands.
+    """
+    final: dict[str, Ticket] = {t["gid"]: t for t in state.get("tickets", [])}
+    for ticket in state.get("failed_tickets", []):
+        final[ticket["gid"]] = ticket
+    for ticket in state.get("completed_tickets", []):
+        if ticket["status"] == "approved":
+            final[ticket["gid"]] = ticket
+    return list(final.values())
+
+
+def progress_bar(done: int, total: int, width: int = BAR_WIDTH) -> str:
+    filled = round(width * done / total) if total else 0
+    return "█" * filled + "░" * (width - filled)
+
+
+def failure_reason(ticket: Ticket) -> str:
+    """One line on why a ticket did not get approved."""
+    status = ticket["status"]
+    result = ticket.get("test_result") or {}
+    if status == "test_failed":
+        if "error" in result:
+            return f"tests did not run: {result['error'][:80]}"
+        failures = result.get("failures") or []
+        first = f", first: {failures[0]['id']}" if failures else ""
+        return f"{result.get('failed', '?')} test(s) failed{first}"
+    if status == "review_rejected":
+        return f"review rejected: {ticket.get('review_reason') or 'no reason given'}"
+    if status == "blocked":
+        return "blocked by a failed dependency"
+    if status == "pending" and ticket["retries"]:
+        return "the coder's reply had no usable JSON result"
+    if status == "escalated":
+        return f"escalated after {ticket['retries']} retries"
+    return status
+
+
+def render_summary(state: PipelineState) -> str:
+    tickets = final_tickets(state)
+    approved = [t for t in tickets if t["status"] == "approved"]
+    failed = [t for t in tickets if t["status"] != "approved"]
+    coverages = [
+        t["test_result"]["coverage"]
+        for t in approved
+        if t.get("test_result") and t["test_result"].get("coverage") is not None
+    ]
+
+    bar = progress_bar(len(approved), len(tickets))
+    lines = [
+        f"*Pipeline run {state['run_id']}*",
+        f"`{bar}` {len(approved)}/{len(tickets)} tickets approved",
+    ]
+    if coverages:
+        lines.append(f"Average coverage: {sum(coverages) / len(coverages):.1f}%")
+    if failed:
+        lines.append(f"Failed ({len(failed)}):")
+        lines += [f"• {t['title']}: {failure_reason(t)}" for t in failed]
+    return "\n".join(lines)
@@ -0,0 +1,215 @@
+"""
+Ticket job queue shared by the orchestrator and ``pipeline worker`` processes.
+
+With ``ticket_executor=queue`` each ``process_ticket`` branch puts its ticket
+on the queue and waits for the result instead of running code → test → review
+itself. Workers claim jobs under a lease and renew it with heartbeats while
+they run. A lease that runs out, because the worker crashed or lost its
+host, makes the job claimable again; after ``max_attempts`` expired leases the
+job fails instead of crashing workers forever.
+
+The default store is one SQLite file. It uses a rollback journal rather than
+WAL: WAL needs shared memory, so workers on other hosts could not open a queue
+kept on a network share. ``job_queue_backend`` selects the store, so others
+can be added next to ``SqliteJobQueue``.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+from pipeline.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    gid TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs (run_id, status);
+"""
+
+# queued → leased → done | failed; an expired lease is claimable as if queued.
+FINISHED = ("done", "failed")
+
+
+@dataclass
+class Job:
+    id: str
+    run_id: str
+    gid: str
+    payload: dict[str, Any]
+    status: str
+    worker: str | None = None
+    lease_expires: float | None = None
+    attempts: int = 0
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> Job:
+        return cls(
+            id=row["id"], run_id=row["run_id"], gid=row["gid"],
+            payload=json.loads(row["payload"]), status=row["status"], worker=row["worker"],
+            lease_expires=row["lease_expires"], attempts=row["attempts"],
+            result=json.loads(row["result"]) if row["result"] else None, error=row["error"],
+        )
+
+
+class JobQueue(Protocol):
+    def put(self, job_id: str, run_id: str, gid: str, payload: dict[str, Any]) -> None: ...
+    def get(self, job_id: str) -> Job | None: ...
+    def claim(self, worker: str) -> Job | None: ...
+    def heartbeat(self, job_id: str, worker: str) -> bool: ...
+    def complete(self, job_id: str, worker: str, result: dict[str, Any]) -> bool: ...
+    def fail(self, job_id: str, worker: str, error: str) -> bool: ...
+    def release(self, job_id: str, worker: str) -> bool: ...
+    def counts(self) -> dict[str, int]: ...
+    def close(self) -> None: ...
+
+
+class SqliteJobQueue:
+    def __init__(self, path: str | Path, lease_seconds: float, max_attempts: int) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def put(self, job_id: str, run_id: str, gid: str, payload: dict[str, Any]) -> None:
+        """
+        Queue a job. Putting an existing id again (a resumed run) keeps a
+        job that is queued, leased or done; a failed one is queued afresh.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, run_id, gid, payload, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = 'queued', worker = NULL, "
+                "lease_expires = NULL, attempts = 0, error = NULL, "
+                "updated_at = excluded.updated_at "
+                "WHERE jobs.status = 'failed'",
+                (job_id, run_id, gid, json.dumps(payload), now, now),
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def claim(self, worker: str) -> Job | None:
+        """Lease a queued job, or one whose lease has expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted(now)
+                # Runs holding the fewest live leases go first, so one big run
+                # sharing the workers cannot starve a small one.
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY (SELECT COUNT(*) FROM jobs AS held WHERE held.run_id = jobs.run_id "
+                    "AND held.status = 'leased' AND held.lease_expires >= ?), created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (worker, now + self.lease_seconds, now, row["id"]),
+                    )
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE id = ?", (row["id"],)
+                    ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job.from_row(row) if row is not None else None
+
+    def _fail_exhausted(self, now: float) -> None:
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', updated_at = ?, "
+            "error = 'lease expired ' || attempts || ' time(s), last held by ' || worker "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        )
+
+    def _update_owned(self, job_id: str, worker: str, sql: str, *params: object) -> bool:
+        """Apply ``sql`` to a job this worker still holds; False if the lease was lost."""
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET {sql}, updated_at = ? "  # noqa: S608 - fixed fragments only
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (*params, time.time(), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        return self._update_owned(
+            job_id, worker, "lease_expires = ?", time.time() + self.lease_seconds
+        )
+
+    def complete(self, job_id: str, worker: str, result: dict[str, Any]) -> bool:
+        return self._update_owned(job_id, worker, "status = 'done', result = ?", json.dumps(result))
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._update_owned(job_id, worker, "status = 'failed', error = ?", error)
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Hand a job back unfinished, e.g. on shutdown, without waiting for the lease."""
+        return self._update_owned(
+            job_id, worker, "status = 'queued', worker = NULL, lease_expires = NULL, "
+            "attempts = attempts - 1",
+        )
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            if settings.job_queue_backend != "sqlite":
+                raise ValueError(f"Unknown job_queue_backend: {settings.job_queue_backend!r}")
+            _queue = SqliteJobQueue(
+                settings.job_queue_path, settings.job_lease_seconds, settings.job_max_attempts
+            )
+        return _queue
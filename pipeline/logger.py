@@ -1,15 +1,127 @@
+"""
+Structured JSONL run logs.
+
+``RunLogger.log`` only enqueues; a single background writer thread per process
+drains the queue and appends batches to the daily file, flushing once
+``LOG_BATCH_SIZE`` events are pending or ``LOG_FLUSH_INTERVAL`` seconds have
+passed. Pending events are always written at interpreter exit.
+"""
+import atexit
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+LOG_DIR = Path("logs")
+LOG_BATCH_SIZE = 256
+LOG_FLUSH_INTERVAL = 0.5
+
+
+class _LogWriter(threading.Thread):
+    """Background thread that batches queued log lines into file appends."""
+
+    def __init__(
+        self, batch_size: int = LOG_BATCH_SIZE, interval: float = LOG_FLUSH_INTERVAL
+    ) -> None:
+        super().__init__(name="run-log-writer", daemon=True)
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: queue.Queue[tuple[Path, str] | threading.Event | None] = queue.Queue()
+        self._created: set[Path] = set()
+
+    def submit(self, path: Path, line: str) -> None:
+        self._queue.put((path, line))
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until everything queued before this call is on disk."""
+        if not self.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def stop(self) -> None:
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+    def run(self) -> None:
+        pending: dict[Path, list[str]] = {}
+        count = 0
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, tuple) and item:
+                path, line = item
+                pending.setdefault(path, []).append(line)
+                count += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+                if count < self.batch_size and time.monotonic() < deadline:
+                    continue
+
+            self._write(pending)
+            pending, count, deadline = {}, 0, None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _write(self, pending: dict[Path, list[str]]) -> None:
+        for path, lines in pending.items():
+            if path.parent not in self._created:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._created.add(path.parent)
+            with path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+
+_writer: _LogWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _LogWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _LogWriter()
+            _writer.start()
+        return _writer
+
+
+def flush_logs(timeout: float | None = None) -> None:
+    """Wait until every event logged so far has been written."""
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def shutdown_logs() -> None:
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+atexit.register(shutdown_logs)
+
 
 class RunLogger:
-    def __init__(self, run_id: str):
+    def __init__(self, run_id: str) -> None:
         self.run_id = run_id
-        self.log_dir = Path("logs")
-        self.log_dir.mkdir(exist_ok=True)
-        self.log_file = self.log_dir / f"run_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        self.log_dir = LOG_DIR
+
+    @property
+    def log_file(self) -> Path:
+        return self.log_dir / f"run_{datetime.now().strftime('%Y%m%d')}.jsonl"
 
     def log(self, event: str, actor: str, data: dict[str, Any]):
         log_entry = {
@@ -19,8 +131,25 @@ class RunLogger:
             "actor": actor,
             "data": data
         }
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        _get_writer().submit(self.log_file, json.dumps(log_entry) + "\n")
+
+    def flush(self) -> None:
+        flush_logs()
+
+
+_loggers: dict[str, RunLogger] = {}
+_loggers_lock = threading.Lock()
+
 
 def get_run_logger(run_id: str) -> RunLogger:
-    return RunLogger(run_id)
+    logger = _loggers.get(run_id)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.setdefault(run_id, RunLogger(run_id))
+    return logger
+
+
+def drop_run_logger(run_id: str) -> None:
+    """Forget a stopped run's logger; events it already queued are still written."""
+    with _loggers_lock:
+        _loggers.pop(run_id, None)
@@ -0,0 +1,318 @@
+"""
+Per-run latency, token and cost instrumentation.
+
+Graph nodes, per-ticket steps and tool calls are timed through ``track`` /
+``instrument``; the active span lives in a ContextVar so LLM usage reported by
+``record_llm`` and tool timings recorded inside a crew are attributed to the
+node (and ticket) that triggered them. ``RunMetrics.summary`` aggregates the
+samples into percentiles, per node and per ticket; ``to_prometheus`` renders
+them in the Prometheus text exposition format.
+
+Cost is derived from the token counts and the ``model_prices`` table, with
+cache reads billed at their own rate. Usage of a model missing from the table
+adds no cost.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pipeline.config import settings
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+@dataclass
+class Span:
+    run_id: str
+    node: str
+    gid: str | None = None
+    wall: float = 0.0
+    queue_wait: float = 0.0
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    prompt_tokens_saved: int = 0
+    cost_usd: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    run_id: str
+    spans: list[Span] = field(default_factory=list)
+    tools: dict[str, list[float]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_span(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def add_tool(self, tool: str, seconds: float) -> None:
+        with self._lock:
+            self.tools.setdefault(tool, []).append(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+            tools = {name: list(v) for name, v in self.tools.items()}
+
+        nodes: dict[str, dict[str, Any]] = {}
+        for node in sorted({s.node for s in spans}):
+            group = [s for s in spans if s.node == node]
+            nodes[node] = {
+                "count": len(group),
+                **_percentiles([s.wall for s in group]),
+                "queue_wait_p95": percentile([s.queue_wait for s in group], 95),
+                "llm_calls": sum(s.llm_calls for s in group),
+                "input_tokens": sum(s.input_tokens for s in group),
+                "output_tokens": sum(s.output_tokens for s in group),
+                "cache_read_tokens": sum(s.cache_read_tokens for s in group),
+                "cache_hits": sum(s.cache_hits for s in group),
+                "retries": sum(s.retries for s in group),
+                "prompt_tokens_saved": sum(s.prompt_tokens_saved for s in group),
+                "cost_usd": round(sum(s.cost_usd for s in group), 6),
+            }
+
+        # Per-ticket spans nest (process_ticket wraps code, test, review), so a
+        # ticket's wall time is taken from its outermost span only.
+        tickets: dict[str, dict[str, Any]] = {}
+        for s in spans:
+            if s.gid is None:
+                continue
+            entry = tickets.setdefault(s.gid, {
+                "wall": 0.0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0,
+                "retries": 0, "cost_usd": 0.0,
+            })
+            if s.node == "process_ticket":
+                entry["wall"] += s.wall
+            entry["llm_calls"] += s.llm_calls
+            entry["input_tokens"] += s.input_tokens
+            entry["output_tokens"] += s.output_tokens
+            entry["retries"] = max(entry["retries"], s.retries)  # a ticket's count, not a delta
+            entry["cost_usd"] += s.cost_usd
+        for entry in tickets.values():
+            entry["cost_usd"] = round(entry["cost_usd"], 6)
+
+        return {
+            "run_id": self.run_id,
+            "input_tokens": sum(s.input_tokens for s in spans),
+            # Input tokens the provider served from its prompt cache (billed at a discount).
+            "cache_read_tokens": sum(s.cache_read_tokens for s in spans),
+            "prompt_tokens_saved": sum(s.prompt_tokens_saved for s in spans),
+            "cost_usd": round(sum(s.cost_usd for s in spans), 6),
+            "nodes": nodes,
+            "tickets": tickets,
+            "tools": {name: {"count": len(v), **_percentiles(v)} for name, v in tools.items()},
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the run's samples in Prometheus text exposition format."""
+        with self._lock:
+            spans = list(self.spans)
+            tools = {name: list(v) for name, v in self.tools.items()}
+
+        lines: list[str] = []
+        by_node: dict[str, list[Span]] = {}
+        for s in spans:
+            by_node.setdefault(s.node, []).append(s)
+
+        lines += ["# HELP pipeline_node_seconds Wall time per node execution.",
+                  "# TYPE pipeline_node_seconds histogram"]
+        for node, group in sorted(by_node.items()):
+            labels = {"run_id": self.run_id, "node": node}
+            lines += _histogram("pipeline_node_seconds", labels, [s.wall for s in group])
+
+        lines += ["# HELP pipeline_queue_wait_seconds Time a ticket waited for a scheduler slot.",
+                  "# TYPE pipeline_queue_wait_seconds histogram"]
+        waits = [s.queue_wait for s in spans if s.node == "process_ticket"]
+        lines += _histogram("pipeline_queue_wait_seconds", {"run_id": self.run_id}, waits)
+
+        counters = {
+            "pipeline_llm_requests_total": ("LLM round trips.", "llm_calls"),
+            "pipeline_llm_input_tokens_total": ("LLM input tokens.", "input_tokens"),
+            "pipeline_llm_output_tokens_total": ("LLM output tokens.", "output_tokens"),
+            "pipeline_llm_cache_read_tokens_total": (
+                "Input tokens served from the provider prompt cache.", "cache_read_tokens"),
+            "pipeline_ticket_retries_total": ("Ticket retries observed.", "retries"),
+            "pipeline_prompt_tokens_saved_total": (
+                "Estimated input tokens removed by prompt compaction.", "prompt_tokens_saved"),
+            "pipeline_llm_cost_usd_total": (
+                "LLM cost in USD, from model_prices.", "cost_usd"),
+        }
+        for metric, (help_text, attr) in counters.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for node, group in sorted(by_node.items()):
+                total = sum(getattr(s, attr) for s in group)
+                lines.append(f'{metric}{{run_id="{self.run_id}",node="{node}"}} {total}')
+
+        lines += ["# HELP pipeline_tool_seconds Wall time per tool call.",
+                  "# TYPE pipeline_tool_seconds histogram"]
+        for name, values in sorted(tools.items()):
+            labels = {"run_id": self.run_id, "tool": name}
+            lines += _histogram("pipeline_tool_seconds", labels, values)
+        return "\n".join(lines) + "\n"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values, default=0.0),
+        "total": sum(values),
+    }
+
+
+def _histogram(metric: str, labels: dict[str, str], values: list[float]) -> list[str]:
+    label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    lines = []
+    for bound in LATENCY_BUCKETS:
+        count = sum(1 for v in values if v <= bound)
+        lines.append(f'{metric}_bucket{{{label_str},le="{bound}"}} {count}')
+    lines.append(f'{metric}_bucket{{{label_str},le="+Inf"}} {len(values)}')
+    lines.append(f"{metric}_sum{{{label_str}}} {sum(values)}")
+    lines.append(f"{metric}_count{{{label_str}}} {len(values)}")
+    return lines
+
+
+# ── Registry and active span ──────────────────────────────────────────────────
+
+_runs: dict[str, RunMetrics] = {}
+_runs_lock = threading.Lock()
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "pipeline_span", default=None
+)
+
+
+def get_run_metrics(run_id: str) -> RunMetrics:
+    with _runs_lock:
+        metrics = _runs.get(run_id)
+        if metrics is None:
+            metrics = _runs[run_id] = RunMetrics(run_id)
+        return metrics
+
+
+def drop_run_metrics(run_id: str) -> None:
+    with _runs_lock:
+        _runs.pop(run_id, None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def track(run_id: str, node: str, gid: str | None = None) -> Iterator[Span]:
+    """Time a block and record it as one span of ``run_id``."""
+    span = Span(run_id=run_id, node=node, gid=gid)
+    token = _current.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span.wall = time.perf_counter() - start
+        _current.reset(token)
+        get_run_metrics(run_id).add_span(span)
+
+
+def llm_cost(
+    model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0
+) -> float:
+    """USD for one model's usage; ``input_tokens`` includes the cache reads. 0.0 if unpriced."""
+    price = settings.model_prices.get(model)
+    if not price:
+        return 0.0
+    input_price, output_price = price[0], price[1]
+    cache_price = price[2] if len(price) > 2 else input_price
+    uncached = max(0, input_tokens - cache_read_tokens)
+    return (
+        uncached * input_price + cache_read_tokens * cache_price + output_tokens * output_price
+    ) / 1_000_000
+
+
+def record_llm(usage: object, model: str | None = None) -> None:
+    """Attribute one LLM call's usage to the active span, priced for ``model``."""
+    span = _current.get()
+    if span is None or usage is None:
+        return
+    input_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    output_tokens = getattr(usage, "completion_tokens", 0) or 0
+    cache_read_tokens = getattr(usage, "cached_prompt_tokens", 0) or 0
+    span.llm_calls += getattr(usage, "successful_requests", 0) or 0
+    span.input_tokens += input_tokens
+    span.output_tokens += output_tokens
+    span.cache_read_tokens += cache_read_tokens
+    if model is not None:
+        span.cost_usd += llm_cost(model, input_tokens, output_tokens, cache_read_tokens)
+
+
+def record_prompt_saved(tokens: int) -> None:
+    """Tokens prompt compaction kept out of an LLM call made by the active span."""
+    span = _current.get()
+    if span is not None:
+        span.prompt_tokens_saved += tokens
+
+
+def record_cache_hit() -> None:
+    span = _current.get()
+    if span is not None:
+        span.cache_hits += 1
+
+
+def _target_of(args: tuple) -> tuple[str, str | None]:
+    """(run_id, gid) for a node called with a PipelineState or a TicketTask."""
+    payload = args[0] if args and isinstance(args[0], dict) else {}
+    ticket = payload.get("ticket") or {}
+    return payload.get("run_id", "unknown"), ticket.get("gid")
+
+
+def instrument(node: str, fn: Callable) -> Callable:
+    """Wrap a graph node (sync or async) so each invocation is recorded as a span."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: object, **kwargs: object) -> object:
+            run_id, gid = _target_of(args)
+            with track(run_id, node, gid):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: object, **kwargs: object) -> object:
+        run_id, gid = _target_of(args)
+        with track(run_id, node, gid):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def record_tool(tool: str, seconds: float) -> None:
+    span = _current.get()
+    if span is not None:
+        get_run_metrics(span.run_id).add_tool(tool, seconds)
+
+
+def export_prometheus(run_id: str, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(get_run_metrics(run_id).to_prometheus(), encoding="utf-8")
+    return path
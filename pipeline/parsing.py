@@ -0,0 +1,199 @@
+"""
+JSON extraction from agent output.
+
+Agents wrap their JSON in prose, Markdown fences and tool transcripts.
+``JsonStream`` walks the text once: at each ``{`` or ``[`` the C JSON scanner
+decodes the balanced value in place, and a valid value is skipped as a whole,
+so nothing is scanned twice and several blocks never merge into one span. It
+keeps its state between ``feed`` calls, so it can be fed streamed tokens and
+report a value as soon as it closes.
+``parse_json_result`` is the one-shot entry point used by the graph nodes.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+
+from pipeline.graph.state import ReviewVerdict, TestResult
+
+# A decoded JSON value: dict, list, str, int, float, bool or None.
+Json = Any
+
+# Schemas the nodes validate against; any type pydantic understands works.
+TICKET_LIST = list[dict]
+TEST_RESULT = TestResult
+REVIEW_VERDICT = ReviewVerdict
+
+_DECODER = json.JSONDecoder()
+_OPENERS = "{[`"
+_PARTIAL_LITERALS = ("true", "false", "null", "-")
+# What may follow an opener (after whitespace) in real JSON; rules out prose
+# like "[attempt 2]" without paying for a JSONDecodeError.
+_VALID_AFTER = {"{": '"}', "[": '"{[]-0123456789tfn'}
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Values are first decoded from a window of this many characters: a failed
+# decode costs O(window) (JSONDecodeError counts lines up to the error) rather
+# than O(len(text)), which keeps heavily truncated output linear.
+_WINDOW = 8192
+
+
+@functools.lru_cache(maxsize=32)
+def _adapter(schema: object) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def matches(value: Json, schema: object = None) -> bool:
+    """True if ``value`` validates against ``schema`` (always true without one)."""
+    if schema is None:
+        return True
+    try:
+        _adapter(schema).validate_python(value)
+    except ValidationError:
+        return False
+    return True
+
+
+def _incomplete(exc: json.JSONDecodeError) -> bool:
+    """True if decoding failed only because the input stopped early."""
+    rest = exc.doc[exc.pos : exc.pos + 6]
+    return (
+        exc.pos >= len(exc.doc)
+        or exc.msg.startswith("Unterminated string")
+        or (
+            exc.pos + len(rest) == len(exc.doc)
+            and any(literal.startswith(rest) for literal in _PARTIAL_LITERALS)
+        )
+    )
+
+
+def _decode(buf: str, i: int) -> tuple[Json, int]:
+    window = buf[i : i + _WINDOW]
+    try:
+        value, end = _DECODER.raw_decode(window)
+    except json.JSONDecodeError as exc:
+        if i + len(window) == len(buf) or not _incomplete(exc):
+            raise
+        return _DECODER.raw_decode(buf, i)  # larger than the window
+    return value, i + end
+
+
+class JsonStream:
+    """Incremental, single-pass extractor of JSON values embedded in text."""
+
+    def __init__(self, schema: object = None) -> None:
+        self.schema = schema
+        self.values: list[tuple[Json, bool]] = []  # (value, came from a ``` fence)
+        self._buf = ""  # unconsumed text
+        self._fenced = False
+        self._waiting = False  # _buf starts with a value that has not closed yet
+
+    def feed(self, chunk: str) -> list[Json]:
+        """Consume ``chunk``; return the values completed by it."""
+        self._buf += chunk
+        if self._waiting and "}" not in chunk and "]" not in chunk:
+            return []  # an open value can only complete on a closing bracket
+        return self._scan(final=False)
+
+    def finish(self) -> list[Json]:
+        """Signal end of input; an unterminated value is rescanned for inner values."""
+        return self._scan(final=True)
+
+    def best(self) -> Json:
+        """The last fenced value if there is one, otherwise the last value found."""
+        fenced = [value for value, in_fence in self.values if in_fence]
+        if fenced:
+            return fenced[-1]
+        return self.values[-1][0] if self.values else None
+
+    def _scan(self, final: bool) -> list[Json]:
+        buf, pos = self._buf, 0
+        before = len(self.values)
+        # Next index of each opener at or after ``pos`` (-1: none left); pos only
+        # moves forward, so each find is re-run only once it has been passed.
+        ahead = {ch: buf.find(ch) for ch in _OPENERS}
+        self._waiting = False
+        while True:
+            i = _next_opener(buf, pos, ahead)
+            if i < 0:
+                pos = len(buf)
+                break
+            step = self._fence if buf[i] == "`" else self._value
+            pos, stop = step(buf, i, final)
+            if stop:
+                break
+
+        self._buf = buf[pos:]
+        return [value for value, _ in self.values[before:]]
+
+    # Each step handles the opener at ``i`` and returns (next position, stop
+    # scanning until more input arrives).
+
+    def _fence(self, buf: str, i: int, final: bool) -> tuple[int, bool]:
+        j = i
+        while j < len(buf) and buf[j] == "`":
+            j += 1
+        if j == len(buf) and not final:
+            return i, True  # the run of backticks may continue in the next chunk
+        if j - i >= 3:
+            self._fenced = not self._fenced
+        return j, False
+
+    def _value(self, buf: str, i: int, final: bool) -> tuple[int, bool]:
+        after = _WHITESPACE.match(buf, i + 1).end()
+        if after == len(buf) and not final:
+            self._waiting = True
+            return i, True
+        if after == len(buf) or buf[after] not in _VALID_AFTER[buf[i]]:
+            return i + 1, False
+
+        # The C scanner balances brackets and strings for the whole value.
+        try:
+            value, end = _decode(buf, i)
+        except json.JSONDecodeError as exc:
+            if not final and _incomplete(exc):
+                self._waiting = True
+                return i, True
+            return i + 1, False  # not JSON; anything nested inside is still found
+        if matches(value, self.schema):
+            self.values.append((value, self._fenced))
+        return end, False  # valid JSON that fails the schema is skipped whole
+
+
+def _next_opener(buf: str, pos: int, ahead: dict[str, int]) -> int:
+    """The first opener at or after ``pos``, or -1; refreshes ``ahead`` as it goes."""
+    for ch, at in ahead.items():
+        if 0 <= at < pos:
+            ahead[ch] = buf.find(ch, pos)
+    return min((at for at in ahead.values() if at >= 0), default=-1)
+
+
+def first_json(chunks: Iterable[str], schema: object = None) -> Json:
+    """Return the first matching value from streamed ``chunks``, stopping as soon as it closes."""
+    stream = JsonStream(schema)
+    for chunk in chunks:
+        found = stream.feed(chunk)
+        if found:
+            return found[0]
+    found = stream.finish()
+    return found[0] if found else None
+
+
+def parse_json_result(result: object, schema: object = None) -> Json:
+    """Extract JSON from agent output that may contain Markdown, preamble or several blocks."""
+    raw = str(result)
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+    else:
+        if matches(value, schema):
+            return value
+    stream = JsonStream(schema)
+    stream.feed(raw)
+    stream.finish()
+    return stream.best()
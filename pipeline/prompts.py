@@ -0,0 +1,135 @@
+"""
+Task descriptions assembled under per-role token budgets.
+
+A prompt is a list of ``Part`` s. Parts with a ``shrink`` function may be
+cut down when the whole prompt is over the role's ``prompt_token_budgets``
+entry; the others (instructions, ids) are always sent as they are. The
+room left over is split between the shrinkable parts so that small parts
+keep all of their text and the large ones share what is left. Tokens are
+estimated from the text length, since the budget only needs to be roughly
+right.
+
+Test reports are always compacted before they go into a prompt. Only the
+counts, coverage and the failing tests are kept, and anything the review
+gate already reports is dropped. ``Prompt.saved`` is the number of tokens
+removed, and the nodes record it in the run's metrics.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pipeline.config import settings
+from pipeline.graph.incremental import split_sections
+
+CHARS_PER_TOKEN = 4
+
+# Whole-repo detail that the tester stores for baselines; no agent needs it.
+_BULKY_KEYS = ("file_coverage", "timings")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class Part:
+    name: str
+    text: str
+    # (text, token allowance) -> shorter text; None means the part is never cut.
+    shrink: Callable[[str, int], str] | None = None
+    # The uncompacted text, when ``text`` is already a compacted form of it.
+    original: str | None = None
+
+
+@dataclass
+class Prompt:
+    text: str
+    tokens: int
+    saved: int = 0
+
+
+def fair_shares(sizes: list[int], total: int) -> list[int]:
+    """Split ``total`` so small items get all they need and large ones share the rest."""
+    shares = [0] * len(sizes)
+    remaining = max(0, total)
+    order = sorted(range(len(sizes)), key=sizes.__getitem__)
+    for n, i in enumerate(order):
+        shares[i] = min(sizes[i], remaining // (len(sizes) - n))
+        remaining -= shares[i]
+    return shares
+
+
+def assemble(role: str, parts: list[Part], budget: int | None = None) -> Prompt:
+    """Join ``parts``, shrinking the shrinkable ones if the role's budget is exceeded."""
+    if budget is None:
+        budget = settings.prompt_token_budgets.get(role, 0)
+    texts = [p.text for p in parts]
+    if budget and estimate_tokens("".join(texts)) > budget:
+        flexible = [i for i, p in enumerate(parts) if p.shrink is not None]
+        fixed = sum(estimate_tokens(p.text) for p in parts if p.shrink is None)
+        sizes = [estimate_tokens(parts[i].text) for i in flexible]
+        for i, share in zip(flexible, fair_shares(sizes, budget - fixed), strict=True):
+            if estimate_tokens(parts[i].text) > share:
+                texts[i] = parts[i].shrink(parts[i].text, share)
+
+    text = "".join(texts)
+    tokens = estimate_tokens(text)
+    original = estimate_tokens("".join(p.text if p.original is None else p.original for p in parts))
+    return Prompt(text, tokens, max(0, original - tokens))
+
+
+# ── Shrinkers ─────────────────────────────────────────────────────────────────
+
+def truncate(text: str, tokens: int) -> str:
+    """Keep the head and the tail of ``text`` within about ``tokens``."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    keep = max(0, tokens * CHARS_PER_TOKEN - 40)  # room for the marker
+    head = keep * 2 // 3
+    tail = keep - head
+    end = len(text) - tail
+    omitted = estimate_tokens(text[head:end])
+    return f"{text[:head]}\n[… {omitted} tokens omitted …]\n{text[end:]}"
+
+
+def shrink_spec(text: str, tokens: int) -> str:
+    """Trim every Markdown section of a spec, so each heading and its opening lines survive."""
+    sections = split_sections(text)
+    if len(sections) <= 1:
+        return truncate(text, tokens)
+    sizes = [estimate_tokens(s.text) for s in sections]
+    return "\n\n".join(
+        truncate(s.text.strip("\n"), share)
+        for s, share in zip(sections, fair_shares(sizes, tokens), strict=True)
+    )
+
+
+# ── Test reports ──────────────────────────────────────────────────────────────
+
+def compact_test_result(
+    result: dict[str, Any] | None, known: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """
+    The parts of a test report a prompt needs: counts, coverage and at most
+    ``prompt_max_failures`` failing tests. ``known`` holds the review gate's
+    stats; what they already report is left out.
+    """
+    if not result:
+        return {}
+    compact = {k: v for k, v in result.items() if k not in _BULKY_KEYS}
+    failures = compact.pop("failures", None) or []
+    if failures:
+        limit = settings.prompt_max_failures
+        compact["failures"] = [
+            {"id": f.get("id"), "message": (f.get("message") or "")[:300]}
+            for f in failures[:limit]
+        ]
+        if len(failures) > limit:
+            compact["failures_omitted"] = len(failures) - limit
+    baseline = compact.get("baseline")
+    if isinstance(baseline, dict) and known and "coverage_delta" in known:
+        compact["baseline"] = {k: v for k, v in baseline.items() if k != "file_coverage_delta"}
+    return compact
@@ -0,0 +1,127 @@
+"""
+Mechanical pre-review checks.
+
+The reviewer's hard rules, namely diff size, no coverage drop and a clean
+ruff run, are checked without an LLM: the diff comes from git, the coverage
+delta from the baseline store's runs of the branch head and its merge-base
+(or the tester's comparison, when the store has none), and ruff runs on the
+changed Python files in a borrowed worktree. A ticket that breaks a rule is rejected
+straight away; only tickets that pass go to the Reviewer agent, which then
+judges the change qualitatively.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from pipeline.baselines import get_baseline_store
+from pipeline.config import settings
+from pipeline.git_backend import GitError, Worktree, get_git_backend
+from pipeline.tester_backend import stored_comparison
+
+
+@dataclass
+class GateResult:
+    passed: bool = True
+    reasons: list[str] = field(default_factory=list)
+    stats: dict[str, Any] = field(default_factory=dict)
+
+    def reject(self, reason: str) -> None:
+        self.passed = False
+        self.reasons.append(reason)
+
+
+def diff_lines(worktree: Worktree, base: str) -> int:
+    """Lines added plus removed on HEAD since it forked from ``base`` (binary files count 0)."""
+    fork = worktree.git("merge-base", base, "HEAD").strip()
+    total = 0
+    for line in worktree.git("diff", "--numstat", fork, "HEAD").splitlines():
+        added, removed, _ = line.split("\t", 2)
+        if added != "-":
+            total += int(added) + int(removed)
+    return total
+
+
+def ruff_errors(worktree: Worktree, paths: list[str]) -> list[dict[str, Any]] | None:
+    """Ruff diagnostics for ``paths`` using the repo's own config; None if ruff is missing."""
+    files = [p for p in paths if p.endswith(".py") and (worktree.path / p).exists()]
+    if not files:
+        return []
+    if importlib.util.find_spec("ruff") is None:
+        return None
+    proc = subprocess.run(  # noqa: S603 - this interpreter's ruff on files from git
+        [sys.executable, "-m", "ruff", "check", "--force-exclude", "--output-format=json", *files],
+        cwd=worktree.path,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    try:
+        return json.loads(proc.stdout or "[]")
+    except json.JSONDecodeError:
+        return None
+
+
+def stored_baseline(worktree: Worktree, base: str, changed: list[str]) -> dict[str, Any] | None:
+    """The baseline comparison for the worktree's HEAD, from the tester's stored runs."""
+    head = worktree.git("rev-parse", "HEAD").strip()
+    fork = worktree.git("merge-base", base, "HEAD").strip()
+    return stored_comparison(get_baseline_store(), settings.github_repo, head, fork, changed)
+
+
+def check_coverage(result: GateResult, test_result: dict[str, Any]) -> None:
+    """Reject ``result`` if the tester's baseline comparison shows a per-file coverage drop."""
+    baseline = test_result.get("baseline")
+    if not baseline:
+        return
+    dropped = {p: d for p, d in baseline.get("file_coverage_delta", {}).items() if d < 0}
+    result.stats["coverage_delta"] = baseline.get("file_coverage_delta", {})
+    if dropped:
+        files = ", ".join(f"{p} ({d:+.1f}%)" for p, d in sorted(dropped.items()))
+        result.reject(f"coverage dropped: {files}")
+
+
+def pre_review(branch: str, test_result: dict[str, Any] | None) -> GateResult:
+    """
+    Apply the hard review rules to ``branch``.
+
+    Checks that cannot be run (git or ruff unavailable) are skipped and left
+    to the Reviewer agent; they never reject a ticket on their own.
+    """
+    started = time.perf_counter()
+    result = GateResult()
+
+    try:
+        backend = get_git_backend()  # the first call clones or fetches the mirror
+        with backend.borrowed(branch) as worktree:
+            base = backend.mirror.base_ref
+            lines = diff_lines(worktree, base)
+            changed = worktree.changed_files(base)
+            errors = ruff_errors(worktree, changed)
+            baseline = stored_baseline(worktree, base, changed)
+    except GitError as e:
+        check_coverage(result, test_result or {})
+        result.stats["skipped"] = f"git: {e}"
+    else:
+        check_coverage(result, {"baseline": baseline} if baseline else test_result or {})
+        result.stats["diff_lines"] = lines
+        if lines > settings.review_max_diff_lines:
+            result.reject(f"diff is {lines} lines (limit {settings.review_max_diff_lines})")
+        if errors is None:
+            result.stats["skipped"] = "ruff unavailable"
+        else:
+            result.stats["ruff_errors"] = len(errors)
+            if errors:
+                first = errors[0]
+                path = os.path.relpath(first["filename"], worktree.path)
+                where = f"{path}:{first['location']['row']}"
+                result.reject(f"ruff: {len(errors)} error(s), first {first['code']} at {where}")
+
+    result.stats["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
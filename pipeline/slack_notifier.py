@@ -0,0 +1,244 @@
+"""
+Slack client and per-run progress message.
+
+Each run gets a single Slack message listing its tickets and their statuses.
+Graph nodes queue status changes with ``queue_ticket_status``. A background
+``SlackNotifier`` thread coalesces them per run and edits the message in place
+at most once every ``slack_debounce_seconds``; the first flush posts it. Other
+messages for the run, such as the final summary, are posted as replies in that
+message's thread. Calls go through a token bucket, and slack_sdk retries
+``ratelimited`` responses after their ``Retry-After``, so nodes never block on
+Slack. Calls that still fail are recorded in the run's log.
+"""
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_handlers import (
+    ConnectionErrorRetryHandler,
+    RateLimitErrorRetryHandler,
+)
+
+from pipeline.config import settings
+from pipeline.logger import get_run_logger
+from pipeline.ratelimit import TokenBucket
+
+STATUS_ICONS = {
+    "pending": "⏳",
+    "in_progress": "🔨",
+    "tested": "🧪",
+    "test_failed": "❌",
+    "approved": "✅",
+    "review_rejected": "🚫",
+    "escalated": "🆘",
+    "blocked": "⛔",
+}
+
+
+class SlackClient:
+    def __init__(
+        self,
+        token: str,
+        base_url: str = "https://slack.com/api/",
+        requests_per_minute: float = 50,
+        max_retries: int = 5,
+        timeout: int = 30,
+    ) -> None:
+        burst = max(1.0, requests_per_minute / 10)
+        self.bucket = TokenBucket(requests_per_minute / 60, capacity=burst)
+        self.web = WebClient(
+            token=token,
+            base_url=base_url.rstrip("/") + "/",
+            timeout=timeout,
+            retry_handlers=[
+                ConnectionErrorRetryHandler(max_retry_count=max_retries),
+                RateLimitErrorRetryHandler(max_retry_count=max_retries),
+            ],
+        )
+
+    def post(self, channel: str, text: str, thread_ts: str | None = None) -> tuple[str, str]:
+        """Post a message; returns (channel id, ts), which ``update`` needs."""
+        self.bucket.acquire()
+        response = self.web.chat_postMessage(channel=channel, text=text, thread_ts=thread_ts)
+        return response["channel"], response["ts"]
+
+    def update(self, channel_id: str, ts: str, text: str) -> None:
+        self.bucket.acquire()
+        self.web.chat_update(channel=channel_id, ts=ts, text=text)
+
+
+_client: SlackClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_slack_client() -> SlackClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SlackClient(
+                settings.slack_bot_token,
+                base_url=settings.slack_base_url,
+                requests_per_minute=settings.slack_requests_per_minute,
+                max_retries=settings.slack_max_retries,
+            )
+        return _client
+
+
+def slack_enabled() -> bool:
+    return settings.is_live and bool(settings.slack_bot_token)
+
+
+# ── Progress messages ─────────────────────────────────────────────────────────
+
+@dataclass
+class RunMessage:
+    run_id: str
+    tickets: dict[str, tuple[str, str]] = field(default_factory=dict)  # gid -> (title, status)
+    channel_id: str = ""
+    ts: str = ""
+    dirty: bool = False
+
+    def render(self) -> str:
+        approved = sum(status == "approved" for _, status in self.tickets.values())
+        lines = [f"*Pipeline run {self.run_id}*: {approved}/{len(self.tickets)} tickets approved"]
+        for title, status in self.tickets.values():
+            lines.append(f"{STATUS_ICONS.get(status, '•')} {title} ({status})")
+        return "\n".join(lines)
+
+
+class SlackNotifier(threading.Thread):
+    """Keeps one message per run up to date, debounced, and posts replies in its thread."""
+
+    def __init__(self, client: SlackClient, channel: str, interval: float = 5.0) -> None:
+        super().__init__(name="slack-notifier", daemon=True)
+        self.client = client
+        self.channel = channel
+        self.interval = interval
+        self.runs: dict[str, RunMessage] = {}
+        self._queue: queue.Queue[tuple | threading.Event | None] = queue.Queue()
+
+    def submit(self, run_id: str, gid: str, title: str, status: str) -> None:
+        self._queue.put(("status", run_id, gid, title, status))
+
+    def reply(self, run_id: str, text: str) -> None:
+        self._queue.put(("reply", run_id, text))
+
+    def flush(self, timeout: float | None = None) -> None:
+        if not self.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def stop(self) -> None:
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+    def _run_message(self, run_id: str) -> RunMessage:
+        return self.runs.setdefault(run_id, RunMessage(run_id))
+
+    def _send(self, message: RunMessage) -> None:
+        text = message.render()
+        try:
+            if message.ts:
+                self.client.update(message.channel_id, message.ts, text)
+            else:
+                message.channel_id, message.ts = self.client.post(self.channel, text)
+        except (SlackApiError, OSError) as e:
+            get_run_logger(message.run_id).log(
+                "slack_update_failed", "Slack", {"error": str(e)}
+            )
+        message.dirty = False
+
+    def _send_dirty(self) -> None:
+        for message in self.runs.values():
+            if message.dirty:
+                self._send(message)
+
+    def _post_reply(self, run_id: str, text: str) -> None:
+        message = self._run_message(run_id)
+        if message.tickets and not message.ts:
+            self._send(message)  # the thread needs a parent
+        try:
+            self.client.post(self.channel, text, thread_ts=message.ts or None)
+        except (SlackApiError, OSError) as e:
+            get_run_logger(run_id).log("slack_reply_failed", "Slack", {"error": str(e)})
+
+    def run(self) -> None:
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, tuple) and item and item[0] == "status":
+                _, run_id, gid, title, status = item
+                message = self._run_message(run_id)
+                if message.tickets.get(gid) != (title, status):
+                    message.tickets[gid] = (title, status)
+                    message.dirty = True
+                    if deadline is None:
+                        deadline = time.monotonic() + self.interval
+                if deadline is None or time.monotonic() < deadline:
+                    continue
+
+            self._send_dirty()
+            deadline = None
+            if isinstance(item, tuple) and item and item[0] == "reply":
+                self._post_reply(item[1], item[2])
+            elif isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+
+_notifier: SlackNotifier | None = None
+_notifier_lock = threading.Lock()
+
+
+def _get_notifier() -> SlackNotifier:
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None or not _notifier.is_alive():
+            _notifier = SlackNotifier(
+                get_slack_client(), settings.slack_channel, settings.slack_debounce_seconds
+            )
+            _notifier.start()
+        return _notifier
+
+
+def queue_ticket_status(run_id: str, gid: str, title: str, status: str) -> None:
+    """Show a ticket's new status in the run's Slack message; a no-op without a Slack token."""
+    if slack_enabled() and settings.slack_progress:
+        _get_notifier().submit(run_id, gid, title, status)
+
+
+def queue_thread_reply(run_id: str, text: str) -> None:
+    """Post ``text`` in the thread of the run's Slack message (top-level if it has none)."""
+    if slack_enabled():
+        _get_notifier().reply(run_id, text)
+
+
+def flush_slack_updates(timeout: float | None = None) -> None:
+    if _notifier is not None:
+        _notifier.flush(timeout)
+
+
+def shutdown_slack_notifier() -> None:
+    global _notifier
+    with _notifier_lock:
+        notifier, _notifier = _notifier, None
+    if notifier is not None:
+        notifier.stop()
+
+
+atexit.register(shutdown_slack_notifier)
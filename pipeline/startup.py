@@ -0,0 +1,100 @@
+"""
+Import-time profile of the pipeline entry point.
+
+Runs ``python -X importtime`` in a fresh interpreter, so the numbers are those
+of a cold start, and splits the per-module timings by import statement: what
+``python -m pipeline.graph.pipeline_graph`` pays before it does anything, and
+what is deferred until the first live crew runs (crewai, the Anthropic SDK and
+the agent factories).
+
+    python -m pipeline.graph.pipeline_graph --profile-startup
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+ENTRY_MODULE = "pipeline.graph.pipeline_graph"
+DEFERRED_MODULES = ("crewai", "pipeline.agents.base", *(
+    f"pipeline.agents.{name}" for name in ("coder", "notifier", "planner", "reviewer", "tester")
+))
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        parts = self.module.split(".")
+        # Our own modules are worth telling apart; third-party ones are not.
+        return ".".join(parts[:2]) if parts[0] == "pipeline" else parts[0]
+
+
+def parse_importtime(stderr: str) -> list[list[ImportTiming]]:
+    """
+    Group ``-X importtime`` lines by top-level import.
+
+    A module's line follows those of everything it imported, so each depth-0
+    line closes a group.
+    """
+    groups: list[list[ImportTiming]] = []
+    current: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        current.append(ImportTiming(module, int(self_us), int(cumulative_us), depth))
+        if depth == 0:
+            groups.append(current)
+            current = []
+    return groups
+
+
+def profile_imports(*modules: str) -> list[list[ImportTiming]]:
+    """Import ``modules`` in order in a fresh interpreter; one timing group per module."""
+    code = "".join(f"import {m}\n" for m in modules)
+    proc = subprocess.run(  # noqa: S603 - this interpreter, our own module names
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    groups = parse_importtime(proc.stderr)
+    # A module that was already imported as a dependency adds no line of its own.
+    by_root = {g[-1].module: g for g in groups}
+    return [by_root.get(m, []) for m in modules]
+
+
+def by_package(timings: list[ImportTiming]) -> dict[str, int]:
+    """Self time in microseconds per top-level package, largest first."""
+    totals: dict[str, int] = defaultdict(int)
+    for t in timings:
+        totals[t.package] += t.self_us
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def _section(title: str, timings: list[ImportTiming], top: int) -> list[str]:
+    total = sum(t.self_us for t in timings)
+    lines = [f"{title}: {total / 1e6:.2f} s, {len(timings)} modules", "  by package (self ms):"]
+    packages = list(by_package(timings).items())[:top]
+    lines += [f"    {pkg:<56} {us / 1000:>9.1f}" for pkg, us in packages]
+    lines.append("  slowest modules (self ms):")
+    slowest = sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]
+    lines += [f"    {t.module[:56]:<56} {t.self_us / 1000:>9.1f}" for t in slowest]
+    return lines
+
+
+def report(top: int = 10) -> str:
+    groups = profile_imports(ENTRY_MODULE, *DEFERRED_MODULES)
+    deferred = [t for g in groups[1:] for t in g]
+    return "\n".join([
+        *_section(f"Startup (import {ENTRY_MODULE})", groups[0], top),
+        "",
+        *_section("Deferred until the first live crew", deferred, top),
+    ])
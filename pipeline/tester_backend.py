@@ -0,0 +1,337 @@
+"""
+Incremental, sharded pytest runs for the tester.
+
+A ``TestMap`` records which tests executed each source file, using coverage's
+per-test contexts (``--cov-context=test``). For a branch, only the tests that
+cover a changed file, plus any changed test modules, are selected. Changes to
+conftest or packaging files, or a missing map, fall back to the full suite.
+Selected tests are split by module across parallel pytest processes, and the
+per-shard coverage data is combined into one report.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pipeline.baselines import BaselineStore
+from pipeline.config import settings
+
+
+class TestMap:
+    """Source file → ids of the tests that executed it, persisted as JSON."""
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.files: dict[str, set[str]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.files = {f: set(tests) for f, tests in data.get("files", {}).items()}
+
+    def __bool__(self) -> bool:
+        return bool(self.files)
+
+    def tests_for(self, paths: list[str]) -> set[str]:
+        return set().union(*(self.files.get(p, set()) for p in paths))
+
+    def update(self, contexts: dict[str, set[str]], ran: set[str], full: bool) -> None:
+        """Fold in a run's per-file contexts; tests that ran replace their old entries."""
+        if full:
+            self.files = {}
+        else:
+            for tests in self.files.values():
+                tests -= ran
+        for path, tests in contexts.items():
+            self.files.setdefault(path, set()).update(tests)
+        self.files = {p: t for p, t in self.files.items() if t}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"files": {f: sorted(t) for f, t in sorted(self.files.items())}}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+_map_lock = threading.Lock()
+
+
+@dataclass
+class ShardResult:
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    failures: list[dict[str, str]] = field(default_factory=list)
+    data_file: Path | None = None
+
+
+def _pytest(
+    cwd: Path, *args: str, env: dict[str, str] | None = None
+) -> subprocess.CompletedProcess:
+    return subprocess.run(  # noqa: S603 - runs this interpreter's pytest
+        [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        timeout=settings.test_timeout,
+        check=False,
+    )
+
+
+def collect(cwd: Path) -> list[str]:
+    """Node ids of every test pytest would run under ``settings.test_paths``."""
+    proc = _pytest(cwd, "--collect-only", "-q", *settings.test_paths)
+    return [line.strip() for line in proc.stdout.splitlines() if "::" in line]
+
+
+def needs_full_run(changed: list[str]) -> bool:
+    return any(
+        fnmatch.fnmatch(Path(path).name, pattern)
+        for path in changed
+        for pattern in settings.test_full_run_patterns
+    )
+
+
+def select(
+    changed: list[str] | None, collected: list[str], test_map: TestMap
+) -> tuple[list[str], str]:
+    """(test ids to run, selection mode) where mode is ``full`` or ``incremental``."""
+    if changed is None or not test_map or needs_full_run(changed):
+        return collected, "full"
+    changed_set = set(changed)
+    wanted = test_map.tests_for(changed)
+    known = test_map.tests_for(list(test_map.files))
+    selected = [
+        t for t in collected
+        if t in wanted or t.split("::", 1)[0] in changed_set
+        # Tests the map has never seen (new or renamed) always run.
+        or t not in known
+    ]
+    return selected, "incremental"
+
+
+def shard(test_ids: list[str], shards: int) -> list[list[str]]:
+    """Split by module (keeps module fixtures together), largest modules first."""
+    modules: dict[str, list[str]] = {}
+    for t in test_ids:
+        modules.setdefault(t.split("::", 1)[0], []).append(t)
+    buckets: list[list[str]] = [[] for _ in range(max(1, min(shards, len(modules))))]
+    for tests in sorted(modules.values(), key=len, reverse=True):
+        min(buckets, key=len).extend(tests)
+    return [b for b in buckets if b]
+
+
+def _run_shard(cwd: Path, out: Path, index: int, test_ids: list[str]) -> ShardResult:
+    report = out / f"junit-{index}.xml"
+    data_file = out / f".coverage.shard{index}"
+    args_file = out / f"args-{index}.txt"
+    args_file.write_text("\n".join(test_ids), encoding="utf-8")
+    start = time.perf_counter()
+    _pytest(
+        cwd, "-q", f"--junitxml={report}", f"--cov={settings.test_cov_source}",
+        "--cov-context=test", "--cov-report=", f"@{args_file}",
+        env={"COVERAGE_FILE": str(data_file)},
+    )
+    result = ShardResult(seconds=time.perf_counter() - start, data_file=data_file)
+    if not report.exists():
+        result.failed = result.total = len(test_ids)
+        result.failures = [{"id": "<shard>", "message": "pytest did not produce a report"}]
+        return result
+    for case in ET.parse(report).getroot().iter("testcase"):  # noqa: S314 - our own report
+        result.total += 1
+        test_id = f"{case.get('classname')}::{case.get('name')}"
+        problem = case.find("failure")
+        if problem is None:
+            problem = case.find("error")
+        if problem is not None:
+            result.failed += 1
+            result.failures.append({"id": test_id, "message": (problem.get("message") or "")[:500]})
+        elif case.find("skipped") is not None:
+            result.skipped += 1
+        else:
+            result.passed += 1
+    return result
+
+
+def _coverage(cwd: Path, out: Path, data_files: list[Path]) -> dict[str, Any]:
+    combined = out / ".coverage"
+    existing = [str(f) for f in data_files if f.exists()]
+    if not existing:
+        return {}
+    coverage = [sys.executable, "-m", "coverage"]
+    subprocess.run(  # noqa: S603
+        [*coverage, "combine", "--keep", "-q", f"--data-file={combined}", *existing],
+        cwd=cwd, capture_output=True, check=False,
+    )
+    report = out / "coverage.json"
+    subprocess.run(  # noqa: S603
+        [*coverage, "json", "-q", "--show-contexts", f"--data-file={combined}", "-o", str(report)],
+        cwd=cwd, capture_output=True, check=False,
+    )
+    if not report.exists():
+        return {}
+    return json.loads(report.read_text(encoding="utf-8"))
+
+
+def _contexts(report: dict[str, Any]) -> dict[str, set[str]]:
+    """Per-file test ids from coverage's ``--show-contexts`` JSON."""
+    files: dict[str, set[str]] = {}
+    for path, data in report.get("files", {}).items():
+        tests = {
+            ctx.split("|", 1)[0]
+            for contexts in data.get("contexts", {}).values()
+            for ctx in contexts
+            if ctx
+        }
+        if tests:
+            files[path] = tests
+    return files
+
+
+def _percent(report: dict[str, Any], paths: list[str] | None = None) -> float | None:
+    files = report.get("files", {})
+    if paths is not None:
+        files = {p: d for p, d in files.items() if p in paths}
+    statements = sum(d["summary"]["num_statements"] for d in files.values())
+    covered = sum(d["summary"]["covered_lines"] for d in files.values())
+    return round(100.0 * covered / statements, 2) if statements else None
+
+
+def run_suite(
+    cwd: str | Path,
+    changed: list[str] | None,
+    test_map: TestMap,
+    store: BaselineStore | None = None,
+    repo: str = "",
+    sha: str = "",
+) -> dict[str, Any]:
+    """
+    Run the tests affected by ``changed`` (all tests if None) in ``cwd``.
+
+    ``coverage`` is the whole-suite percentage for a full run; for an
+    incremental run it covers only the changed source files, since the
+    subset of tests says nothing about the rest of the code. With a ``store``
+    and the checkout's ``sha``, a selection already run on that commit is
+    answered from the store.
+    """
+    cwd = Path(cwd)
+    started = time.perf_counter()
+    collected = collect(cwd)
+    selected, mode = select(changed, collected, test_map)
+    selected_at = time.perf_counter()
+
+    selection = BaselineStore.selection_hash([mode, *selected])
+    if store is not None and sha:
+        stored = store.get(repo, sha, selection)
+        if stored is not None:
+            stored["cached"] = True
+            stored["timings"] = {"select": round(selected_at - started, 3), "shards": [],
+                                 "wall": round(time.perf_counter() - started, 3)}
+            return stored
+
+    result: dict[str, Any] = {
+        "total": 0, "passed": 0, "failed": 0, "skipped": 0,
+        "selection": mode, "selected": len(selected), "collected": len(collected),
+        "failures": [],
+    }
+    shards = shard(selected, settings.test_shards or os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory(prefix="pipeline-tests-") as tmp:
+        out = Path(tmp)
+        with ThreadPoolExecutor(max_workers=max(1, len(shards))) as pool:
+            shard_results = list(pool.map(lambda a: _run_shard(cwd, out, *a), enumerate(shards)))
+        for r in shard_results:
+            for key in ("total", "passed", "failed", "skipped"):
+                result[key] += getattr(r, key)
+            result["failures"] += r.failures
+        report = _coverage(cwd, out, [r.data_file for r in shard_results if r.data_file])
+
+    coverage = _percent(report, None if mode == "full" else changed)
+    if coverage is not None:
+        result["coverage"] = coverage
+    result["coverage_scope"] = "full" if mode == "full" else "changed"
+    result["file_coverage"] = {
+        p: d["summary"]["percent_covered"] for p, d in report.get("files", {}).items()
+    }
+
+    if report:
+        with _map_lock:
+            test_map.update(_contexts(report), set(selected), full=mode == "full")
+            test_map.save()
+
+    result["timings"] = {
+        "select": round(selected_at - started, 3),
+        "shards": [round(r.seconds, 3) for r in shard_results],
+        "wall": round(time.perf_counter() - started, 3),
+    }
+    if store is not None and sha:
+        store.put(repo, sha, selection, mode, result)
+    return result
+
+
+def compare_to_baseline(
+    result: dict[str, Any], baseline: dict[str, Any], changed: list[str]
+) -> dict[str, Any]:
+    """Coverage of the changed files against the base commit's full-suite run."""
+    before = baseline.get("file_coverage", {})
+    after = result.get("file_coverage", {})
+    delta = {p: round(after[p] - before[p], 2) for p in changed if p in before and p in after}
+    return {
+        "coverage": baseline.get("coverage"),
+        "failed": baseline.get("failed"),
+        "file_coverage_delta": delta,
+        "coverage_dropped": any(d < 0 for d in delta.values()),
+    }
+
+
+def stored_comparison(
+    store: BaselineStore, repo: str, head: str, base: str, changed: list[str]
+) -> dict[str, Any] | None:
+    """The stored runs of ``head`` and ``base`` compared; None if either was never run."""
+    result = store.latest(repo, head)
+    baseline = store.baseline(repo, base) if result is not None else None
+    if baseline is None:
+        return None
+    return {"sha": base, **compare_to_baseline(result, baseline, changed)}
+
+
+# Comparisons RunTestsTool made, by branch, until the test node takes them. The
+# agent only reports the TestResult fields, so the comparison is handed over here.
+_comparisons: dict[str, dict[str, Any]] = {}
+_comparisons_lock = threading.Lock()
+
+
+def record_comparison(branch: str, comparison: dict[str, Any]) -> None:
+    with _comparisons_lock:
+        _comparisons[branch] = comparison
+
+
+def take_comparison(branch: str) -> dict[str, Any] | None:
+    """The comparison from ``branch``'s latest test run, if not taken yet."""
+    with _comparisons_lock:
+        return _comparisons.pop(branch, None)
+
+
+_test_map: TestMap | None = None
+
+
+def get_test_map() -> TestMap:
+    global _test_map
+    with _map_lock:
+        if _test_map is None:
+            _test_map = TestMap(settings.test_map_path)
+        return _test_map
@@ -1,29 +1,55 @@
-from crewai.tools import BaseTool
+import json
 
+from pipeline.asana_client import AsanaError, asana_enabled, get_asana_client, queue_status
+from pipeline.tools.base import PipelineTool
 
-class CreateTicketTool(BaseTool):
+
+class CreateTicketsTool(PipelineTool):
+    name: str = "create_asana_tickets"
+    description: str = (
+        "Creates many Asana tickets at once. `tickets` is a list of objects with keys: key (a "
+        "temporary id), title, description, dependencies (keys of other tickets in the list or "
+        "existing GIDs). Returns a JSON object mapping each key to its new Asana GID."
+    )
+
+    def _run(self, tickets: list[dict]) -> str:
+        keys = [str(t.get("key") or t["title"]) for t in tickets]
+        if not asana_enabled():
+            return json.dumps({k: f"mock-gid-{i}" for i, k in enumerate(keys)})
+
+        client = get_asana_client()
+        try:
+            gids = client.create_tasks(
+                [{"name": t["title"], "notes": t.get("description", "")} for t in tickets]
+            )
+            by_key = dict(zip(keys, gids, strict=True))
+            client.add_dependencies({
+                gid: [by_key.get(str(d), str(d)) for d in t.get("dependencies") or []]
+                for gid, t in zip(gids, tickets, strict=True)
+            })
+        except AsanaError as e:
+            return f"Error: {e}"
+        return json.dumps(by_key)
+
+class CreateTicketTool(PipelineTool):
     name: str = "create_asana_ticket"
-    description: str = "Creates a new ticket in Asana."
+    description: str = "Creates a new ticket in Asana. Prefer create_asana_tickets for several."
 
     def _run(self, title: str, description: str, dependencies: list = None) -> str:
-        """
-        TODO: Implement real Asana API integration using `asana` python package.
-        Requirements:
-        - Authenticate with ASANA_ACCESS_TOKEN
-        - Create task in ASANA_PROJECT_GID
-        - Establish dependency links if provided
-        """
-        # Mock implementation for dry-runs
-        return f"mock-gid-{title[:5]}"
-
-class UpdateTicketTool(BaseTool):
+        if not asana_enabled():
+            return f"mock-gid-{title[:5]}"
+        client = get_asana_client()
+        try:
+            (gid,) = client.create_tasks([{"name": title, "notes": description}])
+            client.add_dependencies({gid: [str(d) for d in dependencies or []]})
+        except AsanaError as e:
+            return f"Error: {e}"
+        return gid
+
+class UpdateTicketTool(PipelineTool):
     name: str = "update_asana_ticket"
     description: str = "Updates an existing ticket in Asana."
 
     def _run(self, gid: str, status: str) -> str:
-        """
-        TODO: Implement real Asana status updates.
-        Map internal status (tested, approved) to Asana sections or custom fields.
-        """
-        # Mock implementation for dry-runs
+        queue_status(gid, status)
         return f"Ticket {gid} updated to {status}"
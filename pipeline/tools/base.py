@@ -0,0 +1,29 @@
+import functools
+import time
+
+from crewai.tools import BaseTool
+
+from pipeline.metrics import record_tool
+
+
+class PipelineTool(BaseTool):
+    """BaseTool whose ``_run`` is timed and attributed to the active metrics span."""
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("_run")
+        if run is not None and not getattr(run, "__instrumented__", False):
+            cls._run = _timed(run)
+
+
+def _timed(run):
+    @functools.wraps(run)
+    def wrapper(self, *args: object, **kwargs: object) -> object:
+        start = time.perf_counter()
+        try:
+            return run(self, *args, **kwargs)
+        finally:
+            record_tool(self.name, time.perf_counter() - start)
+
+    wrapper.__instrumented__ = True
+    return wrapper
@@ -1,30 +1,73 @@
-from crewai.tools import BaseTool
+import httpx
 
+from pipeline.config import settings
+from pipeline.git_backend import GitError, get_git_backend
+from pipeline.tools.base import PipelineTool
 
-class CreateBranchTool(BaseTool):
+
+class CreateBranchTool(PipelineTool):
     name: str = "create_git_branch"
-    description: str = "Creates a new git branch."
+    description: str = "Creates (or switches to) a git branch in this ticket's working copy."
+    ticket_id: str = ""
+
     def _run(self, branch_name: str) -> str:
-        """TODO: Implement using `git` CLI or `GitPython`."""
+        try:
+            get_git_backend().checkout(self.ticket_id, branch_name)
+        except GitError as e:
+            return f"Error: {e}"
         return f"Branch {branch_name} created."
 
-class CommitFileTool(BaseTool):
+class CommitFileTool(PipelineTool):
     name: str = "commit_git_file"
-    description: str = "Commits a file to the current branch."
-    def _run(self, file_path: str, message: str) -> str:
-        """TODO: Implement `git add` and `git commit`."""
+    description: str = (
+        "Writes `content` to `file_path` (if given) and commits it to the current branch. "
+        "Commits may be grouped; everything is committed before the PR is opened."
+    )
+    ticket_id: str = ""
+
+    def _run(self, file_path: str, message: str, content: str | None = None) -> str:
+        try:
+            get_git_backend().worktree(self.ticket_id).commit_file(file_path, message, content)
+        except GitError as e:
+            return f"Error: {e}"
         return f"File {file_path} committed."
 
-class OpenPRTool(BaseTool):
+class OpenPRTool(PipelineTool):
     name: str = "open_github_pr"
-    description: str = "Opens a pull request on GitHub."
+    description: str = "Pushes the branch and opens a pull request on GitHub."
+    ticket_id: str = ""
+
     def _run(self, title: str, head_branch: str) -> str:
-        """TODO: Implement using `PyGithub` or GitHub CLI (`gh pr create`)."""
-        return "PR #123 opened."
+        try:
+            get_git_backend().worktree(self.ticket_id).push()
+        except GitError as e:
+            return f"Error: {e}"
+        if not settings.github_token:
+            return f"Branch {head_branch} pushed; no GITHUB_TOKEN, so no PR was opened."
+        response = httpx.post(
+            f"https://api.github.com/repos/{settings.github_repo}/pulls",
+            headers={
+                "Authorization": f"Bearer {settings.github_token}",
+                "Accept": "application/vnd.github+json",
+            },
+            json={"title": title, "head": head_branch, "base": settings.git_base_branch},
+            timeout=30,
+        )
+        if response.status_code >= 400:
+            return f"Error: GitHub returned {response.status_code}: {response.text[:200]}"
+        return f"PR #{response.json()['number']} opened."
 
-class GitBlameTool(BaseTool):
+class GitBlameTool(PipelineTool):
     name: str = "git_blame"
-    description: str = "Runs git blame to find code owners."
-    def _run(self, file_path: str) -> str:
-        """TODO: Implement real git blame parsing to identify authors."""
-        return "owner@example.com"
+    description: str = (
+        "Runs git blame on a file (at `ref`, default the base branch) and returns the "
+        "code owners by number of lines."
+    )
+
+    def _run(self, file_path: str, ref: str = "") -> str:
+        try:
+            authors = get_git_backend().blame(file_path, ref or None)
+        except GitError as e:
+            return f"Error: {e}"
+        owners = ", ".join(f"{email} ({lines} lines)" for email, lines in authors.items())
+        return owners or "unknown"
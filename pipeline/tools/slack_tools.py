@@ -1,16 +1,28 @@
-from crewai.tools import BaseTool
+from slack_sdk.errors import SlackApiError
 
+from pipeline.slack_notifier import get_slack_client, slack_enabled
+from pipeline.tools.base import PipelineTool
 
-class SlackNotifyTool(BaseTool):
+
+def _post(channel: str, text: str) -> str:
+    if not slack_enabled():
+        return f"Message posted to {channel}"  # mock for dry runs
+    try:
+        get_slack_client().post(channel, text)
+    except (SlackApiError, OSError) as e:
+        return f"Error: {e}"
+    return f"Message posted to {channel}"
+
+
+class SlackNotifyTool(PipelineTool):
     name: str = "slack_notify"
     description: str = "Posts a message to Slack."
 
     def _run(self, channel: str, message: str) -> str:
-        """
-        TODO: Implement real Slack API integration.
-        Requirements:
-        - Use `slack_sdk.WebClient(token=SLACK_BOT_TOKEN)`
-        - Call `client.chat_postMessage(channel=channel, text=message)`
-        """
-        # Mock implementation for dry-runs
-        return f"Message posted to {channel}"
+        return _post(channel, message)
+
+class PostSlackMessageTool(PipelineTool):
+    name: str = "post_slack_message"
+    description: str = "Posts a message to Slack."
+    def _run(self, channel: str, text: str) -> str:
+        return _post(channel, text)
@@ -1,23 +1,43 @@
-from crewai.tools import BaseTool
+import json
 
+from pipeline.baselines import get_baseline_store
+from pipeline.config import settings
+from pipeline.git_backend import GitError, get_git_backend
+from pipeline.tester_backend import (
+    compare_to_baseline,
+    get_test_map,
+    record_comparison,
+    run_suite,
+)
+from pipeline.tools.base import PipelineTool
 
-class RunTestsTool(BaseTool):
+
+class RunTestsTool(PipelineTool):
     name: str = "run_pytest"
-    description: str = "Runs the pytest suite and returns JSON result."
+    description: str = (
+        "Runs the tests affected by a branch's changes (in parallel shards, with coverage) "
+        "and returns a JSON result, including a coverage comparison with the base branch."
+    )
 
     def _run(self, branch: str) -> str:
-        """
-        TODO: Implement real test execution.
-        Requirements:
-        - Check out the targeted branch
-        - Run `pytest --cov=project tests/ --json-report`
-        - Parse and return the structured JSON report
-        """
-        # Mock implementation for dry-runs
-        return '{"total": 10, "passed": 10, "failed": 0, "coverage": 95.0}'
+        backend = get_git_backend()
+        store = get_baseline_store()
+        repo = settings.github_repo
+        try:
+            with backend.borrowed(branch) as worktree:
+                head = worktree.git("rev-parse", "HEAD").strip()
+                base = worktree.git("merge-base", backend.mirror.base_ref, "HEAD").strip()
+                changed = worktree.changed_files(backend.mirror.base_ref)
+                result = run_suite(worktree.path, changed, get_test_map(), store, repo, head)
 
-class PostSlackMessageTool(BaseTool):
-    name: str = "post_slack_message"
-    description: str = "Posts a message to Slack."
-    def _run(self, channel: str, text: str) -> str:
-        return "Message posted."
+                baseline = store.baseline(repo, base)
+                if baseline is None and settings.test_baseline_on_miss:
+                    # Once per base commit; later branches off it reuse the stored run.
+                    worktree.checkout_detached(base)
+                    baseline = run_suite(worktree.path, None, get_test_map(), store, repo, base)
+        except GitError as e:
+            return json.dumps({"error": str(e)})
+        if baseline is not None:
+            result["baseline"] = {"sha": base, **compare_to_baseline(result, baseline, changed)}
+            record_comparison(branch, result["baseline"])
+        return json.dumps(result)
@@ -0,0 +1,223 @@
+"""
+``pipeline worker``: run ticket branches handed out through the job queue.
+
+Start any number of these, on this host or on others that share
+``job_queue_path`` and the repo checkout, and run the pipeline with
+``TICKET_EXECUTOR=queue``. Each worker claims one job at a time per slot,
+renews its lease every ``job_heartbeat_seconds`` while code → test → review
+runs, and stores the branch result for the orchestrator to pick up. On
+SIGINT/SIGTERM a worker stops claiming and finishes the jobs it holds; a
+second signal hands them back to the queue straight away.
+
+    pipeline worker [--processes N] [--concurrency N] [--max-jobs N] [--idle-exit SECONDS]
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+from typing import Any
+
+from pipeline.config import settings
+from pipeline.jobqueue import Job, JobQueue, get_job_queue
+from pipeline.logger import drop_run_logger, flush_logs, get_run_logger
+
+
+class Heartbeat(threading.Thread):
+    """Renews a job's lease until stopped; ``lost`` is set if another worker took it."""
+
+    def __init__(self, queue: JobQueue, job: Job, worker: str, interval: float) -> None:
+        super().__init__(name=f"heartbeat-{job.id}", daemon=True)
+        self.queue = queue
+        self.job = job
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            if not self.queue.heartbeat(self.job.id, self.worker):
+                self.lost = True
+                return
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: JobQueue,
+        name: str | None = None,
+        concurrency: int = 1,
+        max_jobs: int | None = None,
+        idle_exit: float | None = None,
+    ) -> None:
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.max_jobs = max_jobs
+        self.idle_exit = idle_exit
+        self.processed = 0
+        self._started = 0
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._held: set[str] = set()
+
+    def run(self) -> int:
+        """Work until stopped, out of ``max_jobs`` or idle; returns the jobs processed."""
+        slots = [
+            threading.Thread(target=self._loop, args=(f"{self.name}/{i}",), daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+        try:
+            for slot in slots:
+                while slot.is_alive():
+                    slot.join(0.2)
+        finally:
+            self.stopping.set()
+            self._release_held()
+            flush_logs()
+        return self.processed
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    def _reserve(self) -> bool:
+        """Count a job against ``max_jobs`` before claiming it."""
+        with self._lock:
+            if self.max_jobs is not None and self._started >= self.max_jobs:
+                return False
+            self._started += 1
+            return True
+
+    def _unreserve(self) -> None:
+        with self._lock:
+            self._started -= 1
+
+    def _loop(self, slot: str) -> None:
+        idle_since = time.monotonic()
+        while not self.stopping.is_set() and self._reserve():
+            job = self.queue.claim(slot)
+            if job is None:
+                self._unreserve()
+                if self.idle_exit is not None and time.monotonic() - idle_since > self.idle_exit:
+                    return
+                self.stopping.wait(settings.job_poll_seconds)
+                continue
+            self.execute(job)
+            idle_since = time.monotonic()
+
+    def execute(self, job: Job) -> None:
+        """Run one claimed job under a heartbeat and record its outcome."""
+        worker = job.worker or self.name
+        with self._lock:
+            self._held.add(job.id)
+        logger = get_run_logger(job.run_id)
+        logger.log("job_claimed", "Worker", {
+            "job": job.id, "worker": worker, "attempt": job.attempts,
+        })
+        heartbeat = Heartbeat(self.queue, job, worker, settings.job_heartbeat_seconds)
+        heartbeat.start()
+        try:
+            result = run_job(job)
+        except Exception as e:  # reported to the orchestrator, which re-raises
+            heartbeat.stop()
+            self.queue.fail(job.id, worker, f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+            logger.log("job_failed", "Worker", {"job": job.id, "worker": worker, "error": str(e)})
+        else:
+            heartbeat.stop()
+            if heartbeat.lost or not self.queue.complete(job.id, worker, result):
+                # The lease ran out mid-job and another worker has it now.
+                logger.log("job_lease_lost", "Worker", {"job": job.id, "worker": worker})
+            else:
+                logger.log("job_done", "Worker", {"job": job.id, "worker": worker})
+        finally:
+            with self._lock:
+                self._held.discard(job.id)
+                self.processed += 1
+            # A worker serves many runs over its lifetime; keep only the active ones.
+            drop_run_logger(job.run_id)
+
+    def _release_held(self) -> None:
+        with self._lock:
+            held = list(self._held)
+        for job_id in held:
+            job = self.queue.get(job_id)
+            if job is not None and job.worker:
+                self.queue.release(job_id, job.worker)
+
+
+def run_job(job: Job) -> dict[str, Any]:
+    """Code → test → review for the job's ticket; the result as JSON-safe ticket dicts."""
+    from pipeline.graph.pipeline_graph import run_ticket
+    from pipeline.graph.state import Ticket, TicketTask
+
+    ticket = Ticket.from_dict(job.payload["ticket"])
+    res = run_ticket(TicketTask(run_id=job.payload["run_id"], ticket=ticket), ticket)
+    return {
+        key: [t.to_dict() for t in res.get(key, [])]
+        for key in ("completed_tickets", "failed_tickets")
+    }
+
+
+def _serve(concurrency: int, max_jobs: int | None, idle_exit: float | None) -> int:
+    # The orchestrator owns the run's Slack message; workers would each start their own.
+    settings.slack_progress = False
+    worker = Worker(
+        get_job_queue(), concurrency=concurrency, max_jobs=max_jobs, idle_exit=idle_exit
+    )
+
+    def on_signal(*_: object) -> None:
+        if worker.stopping.is_set():
+            raise KeyboardInterrupt  # second signal: give the held jobs back now
+        worker.stop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, on_signal)
+    print(f"Worker {worker.name} polling {settings.job_queue_path} ({concurrency} slot(s))")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        print(f"Worker {worker.name} handed its unfinished jobs back")
+    print(f"Worker {worker.name} stopped after {worker.processed} job(s)")
+    return worker.processed
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes to start on this host")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="jobs each process runs at once")
+    parser.add_argument("--max-jobs", type=int, help="exit after this many jobs per process")
+    parser.add_argument("--idle-exit", type=float, metavar="SECONDS",
+                        help="exit after this long without a job")
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.processes <= 1:
+        _serve(args.concurrency, args.max_jobs, args.idle_exit)
+        return
+    context = multiprocessing.get_context("spawn")
+    procs = [
+        context.Process(target=_serve, args=(args.concurrency, args.max_jobs, args.idle_exit))
+        for _ in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        # Each child got the SIGINT too and is handing its jobs back.
+        for proc in procs:
+            proc.join()
@@ -0,0 +1,32 @@
+import pytest
+
+from pipeline.config import settings
+from pipeline.git_backend import GitBackend, GitMirror, WorktreePool, run_git
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """A local bare repo with one commit on main; stands in for GitHub."""
+    origin = tmp_path / "origin.git"
+    seed = tmp_path / "seed"
+    run_git("init", "--quiet", "--bare", "--initial-branch=main", str(origin))
+    run_git("clone", "--quiet", str(origin), str(seed))
+    (seed / "app.py").write_text("print('hi')\n", encoding="utf-8")
+    for args in (
+        ("config", "user.email", "alice@example.com"),
+        ("config", "user.name", "Alice"),
+        ("checkout", "--quiet", "-b", "main"),
+        ("add", "app.py"),
+        ("commit", "--quiet", "-m", "init"),
+        ("push", "--quiet", "origin", "main"),
+    ):
+        run_git(*args, cwd=seed)
+    return origin
+
+
+@pytest.fixture
+def backend(origin, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "git_commit_batch_size", 2)
+    mirror = GitMirror(tmp_path / "mirror.git", str(origin))
+    mirror.ensure()
+    return GitBackend(mirror, WorktreePool(mirror, tmp_path / "worktrees", size=2))
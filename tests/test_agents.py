@@ -0,0 +1,35 @@
+from pipeline.agents import base, coder
+from pipeline.config import settings
+
+
+class RecordingAgent:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def _system_prompt(agent):
+    """What CrewAI renders into the system message: role, goal, backstory, tool schemas."""
+    kw = agent.kwargs
+    tools = [(t.name, t.description, t.args_schema.model_json_schema()) for t in kw["tools"]]
+    return kw["role"], kw["goal"], kw["backstory"], tools
+
+
+def test_coder_prompt_prefix_is_the_same_for_every_ticket(monkeypatch):
+    monkeypatch.setattr(coder, "Agent", RecordingAgent)
+    monkeypatch.setattr(coder, "get_llm", lambda _: None)
+    first, second = coder.make_coder("T1"), coder.make_coder("T2")
+
+    assert _system_prompt(first) == _system_prompt(second)
+    assert "T1" not in repr(_system_prompt(first))
+    assert [t.ticket_id for t in second.kwargs["tools"]] == ["T2"] * 3
+
+
+def test_stable_backstory_appends_repo_conventions(tmp_path, monkeypatch):
+    conventions = tmp_path / "CONTRIBUTING.md"
+    conventions.write_text("Use type hints.\n")
+    monkeypatch.setattr(settings, "repo_conventions_path", str(conventions))
+    assert base.stable_backstory("You review code.") == (
+        "You review code.\n\nConventions of the repository you work on:\nUse type hints."
+    )
+    monkeypatch.setattr(settings, "repo_conventions_path", "")
+    assert base.stable_backstory("You review code.") == "You review code."
@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from pipeline import ratelimit
+from pipeline.asana_client import AsanaClient, AsanaError, StatusUpdater, TokenBucket
+
+
+class FakeAsana(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.peers.add(self.client_address)
+        server.requests.append(self.path)
+        if server.fail_next:
+            status = server.fail_next.pop(0)
+            self._reply(status, {"errors": [{"message": "slow down"}]}, {"Retry-After": "0"})
+            return
+
+        results = []
+        for action in body["data"]["actions"]:
+            path, data = action["relative_path"], action["data"]
+            server.actions.append((action["method"], path, data))
+            if path == "/tasks":
+                server.next_gid += 1
+                gid = str(server.next_gid)
+                results.append({"status_code": 201, "body": {"data": {"gid": gid}}})
+            else:
+                results.append({"status_code": 200, "body": {"data": {}}})
+        self._reply(200, {"data": results})
+
+    def _reply(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def asana():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAsana)
+    server.peers, server.requests, server.actions = set(), [], []
+    server.fail_next, server.next_gid = [], 100
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = AsanaClient("token", f"http://127.0.0.1:{server.server_address[1]}",
+                         requests_per_minute=6000, backoff=0.01)
+    yield server, client
+    client.close()
+    server.shutdown()
+
+
+def test_bulk_create_and_link_in_batches_of_ten(asana):
+    server, client = asana
+    gids = client.create_tasks([{"name": f"T{i}"} for i in range(25)])
+    client.add_dependencies({gids[i]: [gids[i - 1]] for i in range(1, 25)})
+
+    assert gids == [str(101 + i) for i in range(25)]
+    assert len(server.requests) == 3 + 3  # 25 creates and 24 links, ten actions per request
+    assert ("post", "/tasks/102/addDependencies", {"dependencies": ["101"]}) in server.actions
+    assert len(server.peers) == 1  # one keep-alive session
+
+
+def test_retries_rate_limits(asana):
+    server, client = asana
+    server.fail_next = [429, 429]
+    assert client.create_tasks([{"name": "T"}]) == ["101"]
+    assert len(server.requests) == 3
+
+
+def test_server_errors_do_not_repeat_a_post(asana):
+    # The batch may have created the tasks before the 503; sending it again would duplicate them.
+    server, client = asana
+    server.fail_next = [503]
+    with pytest.raises(AsanaError, match="503"):
+        client.create_tasks([{"name": "T"}])
+    assert len(server.requests) == 1
+
+
+def test_server_errors_are_retried_for_idempotent_methods():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.method)
+        status = 503 if len(attempts) < 3 else 200
+        return httpx.Response(status, json={"data": {"gid": "1"}})
+
+    client = AsanaClient("token", "https://asana.test", requests_per_minute=6000, backoff=0.01)
+    client.http = httpx.Client(
+        base_url="https://asana.test", transport=httpx.MockTransport(handler)
+    )
+    assert client.request("PUT", "/tasks/1", {"completed": True}) == {"gid": "1"}
+    assert attempts == ["PUT", "PUT", "PUT"]
+    client.close()
+
+
+def test_status_updates_are_coalesced(asana):
+    server, client = asana
+    updater = StatusUpdater(client, interval=60)
+    updater.start()
+    updater.submit("1", "tested")
+    updater.submit("1", "approved")
+    updater.submit("2", "test_failed")
+    updater.flush()
+    updater.stop()
+
+    assert len(server.requests) == 1
+    puts = {path: data for method, path, data in server.actions if method == "put"}
+    assert puts == {"/tasks/1": {"completed": True}, "/tasks/2": {"completed": False}}
+
+
+def test_token_bucket_paces_bursts():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_batches_are_charged_per_action(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+
+    def handler(request):
+        actions = json.loads(request.content)["data"]["actions"]
+        return httpx.Response(200, json={"data": [{"status_code": 200}] * len(actions)})
+
+    # One request per second on average, bursting to a full batch of ten.
+    client = AsanaClient("token", "https://asana.test", requests_per_minute=60)
+    client.http = httpx.Client(
+        base_url="https://asana.test", transport=httpx.MockTransport(handler)
+    )
+    client.batch([{"method": "get", "relative_path": f"/tasks/{i}"} for i in range(25)])
+    client.close()
+
+    # 25 actions in three requests: ten from the burst, fifteen paid for at one a second.
+    assert clock.now == pytest.approx(15.0)
+
+
+def test_failed_status_updates_are_logged(caplog):
+    def handler(_):
+        return httpx.Response(400, json={"errors": [{"message": "bad"}]})
+
+    client = AsanaClient("token", "https://asana.test", requests_per_minute=6000)
+    client.http = httpx.Client(
+        base_url="https://asana.test", transport=httpx.MockTransport(handler)
+    )
+    updater = StatusUpdater(client, interval=60)
+    updater.start()
+    updater.submit("1", "approved")
+    with caplog.at_level("WARNING", logger="pipeline.asana_client"):
+        updater.flush()
+    updater.stop()
+    client.close()
+
+    assert "Asana status update failed" in caplog.text
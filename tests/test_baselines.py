@@ -0,0 +1,55 @@
+import pytest
+
+from pipeline.baselines import BaselineStore, main
+from pipeline.tester_backend import compare_to_baseline
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BaselineStore(tmp_path / "baselines.sqlite", max_entries=2, max_bytes=0)
+    yield store
+    store.close()
+
+
+def test_get_and_baseline_lookup(store):
+    sel = BaselineStore.selection_hash(["full", "t::a"])
+    assert store.get("r", "abc", sel) is None
+    store.put("r", "abc", sel, "full", {"total": 1, "failed": 0, "coverage": 90.0})
+    store.put("r", "abc", "partial", "incremental", {"total": 1, "failed": 0})
+
+    assert store.get("r", "abc", sel)["coverage"] == 90.0
+    assert store.baseline("r", "abc")["coverage"] == 90.0
+    assert store.baseline("r", "other") is None
+    assert store.stats() == {"hits": 2, "misses": 2}
+
+
+def test_lru_and_size_eviction(store):
+    store.put("r", "a", "s", "full", {"n": 1})
+    store.put("r", "b", "s", "full", {"n": 2})
+    store.get("r", "a", "s")  # a is now most recently used
+    store.put("r", "c", "s", "full", {"n": 3})
+    assert store.get("r", "b", "s") is None
+    assert store.get("r", "a", "s") == {"n": 1}
+
+    assert store.prune(max_bytes=len('{"n": 1}')) == 1
+    assert len(store) == 1
+
+
+def test_compare_to_baseline_flags_drops_in_changed_files():
+    baseline = {"coverage": 80.0, "failed": 0, "file_coverage": {"a.py": 90.0, "b.py": 50.0}}
+    result = {"file_coverage": {"a.py": 85.0, "b.py": 10.0}}
+    comparison = compare_to_baseline(result, baseline, ["a.py"])
+    assert comparison["file_coverage_delta"] == {"a.py": -5.0}
+    assert comparison["coverage_dropped"] is True
+
+
+def test_cli_list_and_prune(tmp_path, capsys):
+    path = tmp_path / "cli.sqlite"
+    store = BaselineStore(path, max_entries=10, max_bytes=0)
+    store.put("org/repo", "deadbeef", "s", "full", {"total": 4, "passed": 4, "coverage": 77.0})
+    store.close()
+
+    main(["--path", str(path), "list"])
+    assert "deadbeef" in capsys.readouterr().out
+    main(["--path", str(path), "prune", "--max-entries", "0"])
+    assert "Pruned 1" in capsys.readouterr().out
@@ -0,0 +1,20 @@
+from pipeline.batch import run_batch
+from pipeline.config import settings
+from pipeline.graph import scheduler
+
+
+def test_batch_runs_every_spec_under_its_own_run(tmp_path, monkeypatch):
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.md").write_text(f"# Spec {name}\n")
+    for name, value in {
+        "dry_run": True, "checkpoint_backend": "memory", "metrics_export_path": "",
+        "slack_progress": False,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    runs = run_batch(str(tmp_path / "*.md"), max_runs=2)
+
+    assert [r.spec for r in runs] == [str(tmp_path / "a.md"), str(tmp_path / "b.md")]
+    assert [r.status for r in runs] == ["complete", "complete"]
+    assert len({r.run_id for r in runs}) == 2
+    assert not scheduler._schedulers
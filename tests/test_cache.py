@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import pipeline.cache
+import pipeline.graph.nodes as nodes
+from pipeline.cache import ResponseCache
+from pipeline.config import settings
+from pipeline.graph.nodes import plan_node
+from pipeline.graph.state import Ticket
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds=60, max_entries=2)
+    monkeypatch.setattr(pipeline.cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+def test_key_is_content_addressed():
+    key = ResponseCache.key("coder", "m", "prompt", {"branch": "b"})
+    assert key == ResponseCache.key("coder", "m", "prompt", {"branch": "b"})
+    assert key != ResponseCache.key("coder", "m", "prompt", {"branch": "c"})
+    assert key != ResponseCache.key("tester", "m", "prompt", {"branch": "b"})
+
+
+def test_hits_misses_and_lru_eviction(cache):
+    assert cache.get("a") is None
+    cache.put("a", "coder", "A")
+    cache.put("b", "coder", "B")
+    assert cache.get("a") == "A"  # a is now most recently used
+    cache.put("c", "coder", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_ttl_expiry(cache):
+    cache.ttl_seconds = -1
+    cache.put("a", "coder", "A")
+    assert cache.get("a") is None
+
+
+@pytest.mark.usefixtures("cache")
+def test_plan_node_reuses_cached_response(tmp_path, monkeypatch):
+    spec = tmp_path / "SPEC.md"
+    spec.write_text("Build a thing", encoding="utf-8")
+    state = {"spec_path": str(spec), "run_id": "cache-test", "loop_count": 0}
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(settings, "cache_enabled", True)
+
+    pool = MagicMock()
+    pool.kickoff.return_value = '[{"gid": "1", "title": "A"}]'
+    with patch("pipeline.graph.nodes.get_agent_pool", return_value=pool), \
+            patch("pipeline.graph.nodes._plan_crew"):
+        first = plan_node(state)
+        second = plan_node(state)
+        monkeypatch.setattr(settings, "cache_bypass_nodes", ["plan"])
+        plan_node(state)
+
+    assert pool.kickoff.call_count == 2
+    assert first["tickets"] == second["tickets"]
+
+
+@pytest.mark.usefixtures("cache")
+def test_retried_ticket_is_tested_again(monkeypatch):
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    ticket = Ticket(
+        gid="1", title="A", dependencies=[], complexity="S", branch="feature/a",
+        pr_number="7", test_result=None, review_approved=None, retries=0, status="in_progress",
+    )
+    state = {"run_id": "cache-test", "ticket": ticket}
+
+    pool = MagicMock()
+    pool.kickoff.return_value = '{"total": 1, "passed": 1, "failed": 0, "coverage": 90.0}'
+    with patch("pipeline.graph.nodes.get_agent_pool", return_value=pool), \
+            patch("pipeline.graph.nodes._test_crew"):
+        nodes.test_node(state, ticket)
+        nodes.test_node(state, ticket)  # same attempt: served from the cache
+        ticket["retries"] = 1  # review rejected; the coder pushed a fix to the branch
+        nodes.test_node(state, ticket)
+
+    assert pool.kickoff.call_count == 2
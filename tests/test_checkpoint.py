@@ -0,0 +1,100 @@
+import json
+from collections import Counter
+
+import pytest
+
+import pipeline.graph.nodes as nodes
+import pipeline.graph.pipeline_graph as pg
+from pipeline.config import settings
+from pipeline.graph.checkpoint import BatchedSqliteSaver
+
+PLAN = (
+    '[{"gid": "a", "title": "A", "dependencies": [], "complexity": "S"},'
+    ' {"gid": "b", "title": "B", "dependencies": ["a"], "complexity": "S"},'
+    ' {"gid": "c", "title": "C", "dependencies": ["b"], "complexity": "S"}]'
+)
+
+
+def test_resume_skips_finished_tickets(tmp_path, monkeypatch):
+    spec = tmp_path / "SPEC.md"
+    spec.write_text("spec", encoding="utf-8")
+    monkeypatch.setattr(settings, "dry_run", True)
+    monkeypatch.setattr(settings, "checkpoint_path", str(tmp_path / "ckpt.sqlite"))
+    monkeypatch.setattr(nodes, "_DRY_PLAN", PLAN)
+
+    calls: Counter = Counter()
+    crash = {"c": True}
+    real_code_node = pg.code_node
+
+    def flaky_code_node(state, ticket):
+        calls[ticket["gid"]] += 1
+        if crash.pop(ticket["gid"], False):
+            raise RuntimeError("worker died")
+        return real_code_node(state, ticket)
+
+    monkeypatch.setattr(pg, "code_node", flaky_code_node)
+
+    saver = BatchedSqliteSaver.from_path(settings.checkpoint_path)
+    graph = pg.build_graph(saver)
+    config = {"configurable": {"thread_id": "resume-test"}}
+    with pytest.raises(RuntimeError, match="worker died"):
+        for _ in graph.stream(pg._initial_state(str(spec), "resume-test"), config=config):
+            pass
+    saver.close()
+
+    # A fresh process: new saver on the same file, no in-memory scheduler.
+    pg.drop_scheduler("resume-test")
+    saver = BatchedSqliteSaver.from_path(settings.checkpoint_path)
+    graph = pg.build_graph(saver)
+    pg._restore_scheduler(graph, config)
+    for _ in graph.stream(None, config=config):
+        pass
+
+    final = graph.get_state(config)
+    assert calls == {"a": 1, "b": 1, "c": 2}
+    assert final.values["slack_posted"] is True
+    assert {t["gid"] for t in final.values["completed_tickets"]} >= {"a", "b", "c"}
+    saver.close()
+
+
+class RecordingSaver(BatchedSqliteSaver):
+    """Logs each superstep checkpoint, branch write and SQLite COMMIT."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.events: list[str] = []
+        self.conn.set_trace_callback(
+            lambda sql: self.events.append("commit") if sql.strip().upper() == "COMMIT" else None
+        )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.events.append("put")
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.events.append("write")
+        super().put_writes(config, writes, task_id, task_path)
+
+
+def test_one_commit_per_superstep(tmp_path, monkeypatch):
+    spec = tmp_path / "SPEC.md"
+    spec.write_text("spec", encoding="utf-8")
+    monkeypatch.setattr(settings, "dry_run", True)
+    monkeypatch.setattr(nodes, "_DRY_PLAN", json.dumps([
+        {"gid": gid, "title": gid.upper(), "dependencies": deps, "complexity": "S"}
+        for gid, deps in [("a", []), ("b", []), ("c", []), ("d", []), ("e", ["a", "b"])]
+    ]))
+
+    saver = RecordingSaver.from_path(tmp_path / "ckpt.sqlite")
+    graph = pg.build_graph(saver)
+    config = {"configurable": {"thread_id": "commit-test"}}
+    for _ in graph.stream(pg._initial_state(str(spec), "commit-test"), config=config):
+        pass
+    pg.drop_scheduler("commit-test")
+
+    # One commit per superstep checkpoint, however many branch writes it carries:
+    # the four branches of the first wave and e in the next do not add any.
+    assert saver.events.count("commit") == saver.events.count("put")
+    assert saver.events.count("write") > saver.events.count("put")
+    assert {t["gid"] for t in graph.get_state(config).values["completed_tickets"]} == set("abcde")
+    saver.close()
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from pipeline.graph.concurrency import AgentPool, KickoffCancelledError, cancellable
+from pipeline.graph.scheduler import TicketScheduler
+
+
+class FakeCrew:
+    in_flight = 0
+    peak = 0
+
+    def kickoff(self):
+        return "sync"
+
+    async def kickoff_async(self):
+        FakeCrew.in_flight += 1
+        FakeCrew.peak = max(FakeCrew.peak, FakeCrew.in_flight)
+        await asyncio.sleep(0.01)
+        FakeCrew.in_flight -= 1
+        return "async"
+
+
+def test_agent_pool_bounds_in_flight_crews():
+    pool = AgentPool(max_in_flight=3)
+
+    async def main():
+        return await asyncio.gather(*(pool.akickoff(FakeCrew()) for _ in range(12)))
+
+    results = asyncio.run(main())
+    assert results == ["async"] * 12
+    assert FakeCrew.peak == 3
+    assert pool.kickoff(FakeCrew()) == "sync"
+
+
+def test_cancelled_caller_does_not_start_its_crew():
+    pool = AgentPool(max_in_flight=1)
+    cancel = threading.Event()
+    cancel.set()
+    with cancellable(cancel), pytest.raises(KickoffCancelledError):
+        pool.kickoff(FakeCrew())
+    assert pool.held() == {}
+
+
+def test_scheduler_aacquire_respects_dependencies():
+    tickets = [
+        {"gid": "a", "dependencies": [], "complexity": "S"},
+        {"gid": "b", "dependencies": ["a"], "complexity": "S"},
+    ]
+    scheduler = TicketScheduler(tickets, max_parallel=2)
+    order: list[str] = []
+
+    async def branch(gid):
+        assert await scheduler.aacquire(gid)
+        order.append(gid)
+        await asyncio.sleep(0.01)
+        scheduler.release(gid, success=True)
+
+    async def main():
+        await asyncio.gather(branch("b"), branch("a"))
+
+    asyncio.run(main())
+    assert order == ["a", "b"]
+
+
+def test_agent_pool_shares_slots_fairly_between_runs():
+    pool = AgentPool(max_in_flight=1)
+    order: list[str] = []
+
+    class Crew:
+        def __init__(self, run):
+            self.run = run
+
+        async def kickoff_async(self):
+            order.append(self.run)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        # The big run queues all of its crews before the small run arrives.
+        big = [asyncio.create_task(pool.akickoff(Crew("big"), "big")) for _ in range(4)]
+        await asyncio.sleep(0)
+        small = [asyncio.create_task(pool.akickoff(Crew("small"), "small")) for _ in range(2)]
+        await asyncio.gather(*big, *small)
+
+    asyncio.run(main())
+    assert order[:5] == ["big", "small", "big", "small", "big"]
+    assert pool.held() == {}
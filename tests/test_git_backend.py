@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline.git_backend import GitError, run_git
+
+
+def _log(origin, branch):
+    return run_git("log", "--format=%s", branch, cwd=origin).splitlines()
+
+
+def test_parallel_tickets_get_separate_worktrees_and_push(backend, origin):
+    def work(n):
+        worktree = backend.checkout(f"t{n}", f"feature/t{n}")
+        for i in range(3):
+            worktree.commit_file(f"f{i}.py", f"add f{i}", content=f"x = {n}\n")
+        worktree.push()
+        path = worktree.path
+        backend.release(f"t{n}")
+        return path
+
+    with ThreadPoolExecutor(2) as pool:
+        paths = list(pool.map(work, [1, 2]))
+
+    assert len(set(paths)) == 2
+    # Three files in batches of two: one grouped commit, then the rest flushed on push.
+    assert _log(origin, "feature/t1") == ["add f2", "add f0 (+1 more)", "init"]
+    assert run_git("show", "feature/t2:f0.py", cwd=origin) == "x = 2\n"
+
+
+def test_released_worktree_is_recycled_clean(backend):
+    worktree = backend.checkout("t1", "feature/a")
+    (worktree.path / "scratch.txt").write_text("junk", encoding="utf-8")
+    backend.release("t1")
+
+    again = backend.checkout("t2", "feature/b")
+    assert again.path == worktree.path
+    assert not (again.path / "scratch.txt").exists()
+    assert run_git("branch", "--show-current", cwd=again.path).strip() == "feature/b"
+
+
+def test_blame_is_cached_per_file_and_commit(backend, monkeypatch):
+    assert backend.blame("app.py") == {"alice@example.com": 1}
+
+    calls = []
+    real_git = backend.mirror.git
+    monkeypatch.setattr(backend.mirror, "git", lambda *a: calls.append(a[0]) or real_git(*a))
+    assert backend.blame("app.py") == {"alice@example.com": 1}
+    assert "blame" not in calls
+    assert backend.blame_hits == 1
+
+
+def test_pool_blocks_until_a_worktree_is_released(backend):
+    backend.checkout("t1", "feature/a")
+    backend.checkout("t2", "feature/b")
+    with pytest.raises(GitError, match="timed out"):
+        backend.pool.acquire(timeout=0.1)
+    backend.release("t1")
+    assert backend.pool.acquire(timeout=1) is not None
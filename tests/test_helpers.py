@@ -1,6 +1,7 @@
 import json
 
 from pipeline.graph.nodes import parse_json_result
+from pipeline.parsing import REVIEW_VERDICT, TEST_RESULT, JsonStream, first_json
 
 
 def test_parse_json_result_strict():
@@ -19,3 +20,40 @@ def test_parse_json_result_preamble():
 
 def test_parse_json_result_invalid():
     assert parse_json_result("not a json") is None
+
+def test_parse_json_result_prefers_fenced_block_over_transcript_json():
+    text = (
+        'Action Input: {"branch": "scratch"}\n'
+        'Observation: done\n'
+        'Final answer:\n```json\n{"branch": "feature/x", "pr_number": "7"}\n```\n'
+        "Closing remark {not json}."
+    )
+    assert parse_json_result(text) == {"branch": "feature/x", "pr_number": "7"}
+
+def test_parse_json_result_ignores_brackets_in_strings_and_prose():
+    text = 'Note [see docs] then {"reason": "uses } and ] inside", "approved": true}'
+    assert parse_json_result(text) == {"reason": "uses } and ] inside", "approved": True}
+
+def test_parse_json_result_schema_picks_matching_block():
+    text = '{"total": 3, "passed": 3, "failed": 0} and later {"approved": false}'
+    assert parse_json_result(text, TEST_RESULT) == {"total": 3, "passed": 3, "failed": 0}
+    assert parse_json_result(text, REVIEW_VERDICT) == {"approved": False}
+    assert parse_json_result('{"approved": "maybe?"}', REVIEW_VERDICT) is None
+
+def test_json_stream_reports_value_as_soon_as_it_closes():
+    stream = JsonStream()
+    assert stream.feed('Thinking... ``') == []
+    assert stream.feed('`json\n{"a": [1, "x\\') == []
+    assert stream.feed('"y"]}') == [{"a": [1, 'x"y']}]
+    assert stream.best() == {"a": [1, 'x"y']}
+
+def test_first_json_stops_consuming_chunks():
+    consumed = []
+
+    def chunks():
+        for chunk in ['pre {"ok"', ": 1}", " trailing", " more"]:
+            consumed.append(chunk)
+            yield chunk
+
+    assert first_json(chunks()) == {"ok": 1}
+    assert consumed == ['pre {"ok"', ": 1}"]
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock, patch
+
+from pipeline.config import settings
+from pipeline.graph.incremental import IncrementalPlan, PlanIndex, split_sections
+from pipeline.graph.nodes import plan_node
+
+SPEC = """# App
+
+## Auth
+Login with email.
+
+```python
+# not a heading
+```
+
+## Billing
+Stripe checkout.
+"""
+
+
+def test_split_sections_uses_heading_paths_and_ignores_code_fences():
+    keys = [s.key for s in split_sections(SPEC)]
+    assert keys == ["App", "App > Auth", "App > Billing"]
+
+
+def test_only_edited_sections_are_changed():
+    first = split_sections(SPEC)
+    previous = {s.key: {"fingerprint": s.fingerprint, "tickets": [{"gid": s.key}]} for s in first}
+    plan = IncrementalPlan(split_sections(SPEC.replace("Stripe", "Paddle")), previous)
+
+    assert [s.key for s in plan.changed] == ["App > Billing"]
+    assert [t["gid"] for t in plan.kept_tickets()] == ["App", "App > Auth"]
+
+
+def test_plan_node_replans_only_changed_sections(tmp_path, monkeypatch):
+    spec = tmp_path / "SPEC.md"
+    spec.write_text(SPEC, encoding="utf-8")
+    state = {"spec_path": str(spec), "run_id": "incr-test", "loop_count": 0}
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    monkeypatch.setattr(settings, "incremental_planning", True)
+    monkeypatch.setattr(settings, "plan_index_path", str(tmp_path / "index.json"))
+
+    pool = MagicMock()
+    pool.kickoff.side_effect = [
+        '[{"gid": "1", "title": "Auth", "section": "App > Auth"},'
+        ' {"gid": "2", "title": "Billing", "section": "App > Billing"}]',
+        '[{"gid": "3", "title": "Paddle", "section": "App > Billing"}]',
+    ]
+    crew = MagicMock()
+    with patch("pipeline.graph.nodes.get_agent_pool", return_value=pool), \
+            patch("pipeline.graph.nodes._plan_crew", crew):
+        first = plan_node(state)
+        unchanged = plan_node(state)
+        spec.write_text(SPEC.replace("Stripe", "Paddle"), encoding="utf-8")
+        edited = plan_node(state)
+
+    assert pool.kickoff.call_count == 2
+    assert [t["gid"] for t in first["tickets"]] == ["1", "2"]
+    assert unchanged["tickets"] == first["tickets"]
+    assert [t["gid"] for t in edited["tickets"]] == ["1", "3"]
+    prompt = crew.call_args.args[0]
+    assert "Paddle" in prompt
+    assert "Login with email" not in prompt
+
+
+def test_approved_tickets_are_kept_with_their_outcome(tmp_path, monkeypatch):
+    spec = tmp_path / "SPEC.md"
+    spec.write_text(SPEC, encoding="utf-8")
+    state = {"spec_path": str(spec), "run_id": "outcome-test", "loop_count": 0}
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    monkeypatch.setattr(settings, "incremental_planning", True)
+    monkeypatch.setattr(settings, "plan_index_path", str(tmp_path / "index.json"))
+
+    pool = MagicMock()
+    pool.kickoff.return_value = (
+        '[{"gid": "1", "title": "Auth", "section": "App > Auth"},'
+        ' {"gid": "2", "title": "Billing", "section": "App > Billing"}]'
+    )
+    with patch("pipeline.graph.nodes.get_agent_pool", return_value=pool), \
+            patch("pipeline.graph.nodes._plan_crew", MagicMock()):
+        first = plan_node(state)
+
+    auth = first["tickets"][0]
+    auth.status, auth.branch, auth.retries = "approved", "feature/1", 1
+    index = PlanIndex(settings.plan_index_path)
+    index.record(str(spec), {"1": auth.to_dict()})
+
+    reads = []
+    real_read = PlanIndex._read
+    monkeypatch.setattr(PlanIndex, "_read", lambda self: reads.append(1) or real_read(self))
+    again = plan_node(state)
+
+    assert pool.kickoff.call_count == 1
+    assert len(reads) == 1  # the index is loaded once and not written back
+    kept = {t["gid"]: t for t in again["tickets"]}
+    assert (kept["1"]["status"], kept["1"]["branch"], kept["1"]["retries"]) == (
+        "approved", "feature/1", 1,
+    )
+    assert kept["2"]["status"] == "pending"
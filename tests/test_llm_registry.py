@@ -0,0 +1,124 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+import pytest
+from crewai.llms.providers.anthropic.completion import AnthropicCompletion
+
+from pipeline.agents.base import CREWAI_HOOKS, LLMRegistry
+from pipeline.metrics import drop_run_metrics, get_run_metrics, track
+
+
+class StubAnthropic(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: ClassVar[set] = set()
+    requests: ClassVar[list] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubAnthropic.peers.add(self.client_address)
+        StubAnthropic.requests.append(body)
+        payload = json.dumps({
+            "id": "msg_1", "type": "message", "role": "assistant", "model": body["model"],
+            "content": [{"type": "text", "text": "ok"}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 3, "output_tokens": 1},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAnthropic)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_roles_share_one_keepalive_connection(stub_url):
+    registry = LLMRegistry(api_key="test", base_url=stub_url, pool_size=4)
+    coder = registry.get("coder")
+    reviewer = registry.get("reviewer", model="claude-test-small", max_tokens=64)
+
+    assert registry.get("coder") is coder
+    for llm in (coder, reviewer, coder):
+        assert llm.call("hi") == "ok"
+
+    assert len(StubAnthropic.peers) == 1
+    assert StubAnthropic.requests[1]["model"] == "claude-test-small"
+    assert StubAnthropic.requests[1]["max_tokens"] == 64
+    assert StubAnthropic.requests[0]["temperature"] == 0.2
+    registry.close()
+
+
+def test_crewai_agent_uses_the_pooled_llm(stub_url):
+    from crewai import Agent, Crew, Task
+
+    registry = LLMRegistry(api_key="test", base_url=stub_url, pool_size=2)
+    llm = registry.get("coder")
+    agent = Agent(role="Coder", goal="Write code", backstory="A coder.", llm=llm)
+    task = Task(description="Say ok.", expected_output="ok", agent=agent)
+
+    assert agent.llm is llm
+    assert str(Crew(agents=[agent], tasks=[task]).kickoff()) == "ok"
+    assert StubAnthropic.requests[-1]["model"] == llm.model
+    registry.close()
+
+
+def test_crews_sharing_an_llm_each_record_only_their_own_tokens(stub_url):
+    from crewai import Agent, Crew, Task
+
+    registry = LLMRegistry(api_key="test", base_url=stub_url, pool_size=2)
+    llm = registry.get("coder")
+
+    def kickoff(gid):
+        agent = Agent(role="Coder", goal="Write code", backstory="A coder.", llm=llm)
+        task = Task(description="Say ok.", expected_output="ok", agent=agent)
+        with track("usage-run", "code", gid):
+            Crew(agents=[agent], tasks=[task]).kickoff()
+
+    kickoff("T1")
+    kickoff("T2")
+    threads = [threading.Thread(target=kickoff, args=(gid,)) for gid in ("T3", "T4")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tickets = get_run_metrics("usage-run").summary()["tickets"]
+    for gid in ("T1", "T2", "T3", "T4"):
+        assert tickets[gid]["llm_calls"] == 1
+        assert tickets[gid]["input_tokens"] == 3
+        assert tickets[gid]["output_tokens"] == 1
+    assert llm.get_token_usage_summary().prompt_tokens == 12
+    drop_run_metrics("usage-run")
+    registry.close()
+
+
+def test_unknown_override_is_rejected():
+    with pytest.raises(ValueError, match="top_k"):
+        LLMRegistry(api_key="test").get("coder", top_k=5)
+
+
+def test_overrides_are_part_of_the_cache_key():
+    registry = LLMRegistry(api_key="test")
+    small = registry.get("coder", model="claude-test-small")
+    assert registry.get("coder", model="claude-test-large").model == "claude-test-large"
+    assert registry.get("coder", model="claude-test-small") is small
+    assert registry.get("coder") is not small
+    registry.close()
+
+
+@pytest.mark.parametrize("hook", CREWAI_HOOKS)
+def test_crewai_still_has_the_overridden_hooks(hook):
+    # PooledAnthropicLLM relies on these private methods; a CrewAI upgrade may drop them.
+    assert callable(getattr(AnthropicCompletion, hook, None))
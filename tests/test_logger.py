@@ -0,0 +1,38 @@
+import json
+import threading
+
+from pipeline import logger as run_log
+from pipeline.logger import flush_logs, get_run_logger
+
+
+def test_logger_is_cached_per_run():
+    assert get_run_logger("run-a") is get_run_logger("run-a")
+    assert get_run_logger("run-a") is not get_run_logger("run-b")
+
+
+def test_concurrent_events_are_written_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_log, "LOG_DIR", tmp_path)
+    logger = run_log.RunLogger("concurrent")
+
+    def emit(n):
+        for i in range(200):
+            logger.log("tick", f"worker-{n}", {"i": i, "pad": "x" * 500})
+
+    threads = [threading.Thread(target=emit, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    flush_logs()
+
+    lines = logger.log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1600
+    assert all(json.loads(line)["event"] == "tick" for line in lines)
+
+
+def test_dropped_run_loggers_are_evicted():
+    logger = get_run_logger("run-dropped")
+    run_log.drop_run_logger("run-dropped")
+    assert "run-dropped" not in run_log._loggers
+    assert get_run_logger("run-dropped") is not logger
+    run_log.drop_run_logger("run-dropped")
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from pipeline.config import settings
+from pipeline.metrics import (
+    drop_run_metrics,
+    get_run_metrics,
+    instrument,
+    percentile,
+    record_llm,
+    track,
+)
+from pipeline.tools.git_tools import GitBlameTool
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 95) == 0.0
+
+
+def test_spans_collect_tokens_and_tool_calls():
+    usage = SimpleNamespace(successful_requests=2, prompt_tokens=120, completion_tokens=30,
+                            cached_prompt_tokens=100)
+    with track("metrics-run", "code", "T1"):
+        record_llm(usage)
+        GitBlameTool().run(file_path="pipeline/config.py")
+
+    summary = get_run_metrics("metrics-run").summary()
+    assert summary["nodes"]["code"]["llm_calls"] == 2
+    assert summary["nodes"]["code"]["input_tokens"] == 120
+    assert summary["nodes"]["code"]["cache_read_tokens"] == 100
+    assert summary["tools"]["git_blame"]["count"] == 1
+    drop_run_metrics("metrics-run")
+
+
+def test_instrumented_node_exports_prometheus():
+    node = instrument("plan", lambda _: {"ok": True})
+    node({"run_id": "prom-run"})
+    node({"run_id": "prom-run"})
+
+    text = get_run_metrics("prom-run").to_prometheus()
+    assert 'pipeline_node_seconds_count{run_id="prom-run",node="plan"} 2' in text
+    assert "# TYPE pipeline_llm_requests_total counter" in text
+    drop_run_metrics("prom-run")
+
+
+def test_ticket_cost_is_priced_from_token_usage(monkeypatch):
+    monkeypatch.setattr(settings, "model_prices", {"priced-model": [3.0, 15.0, 0.3]})
+    usage = SimpleNamespace(successful_requests=1, prompt_tokens=1_000_000,
+                            completion_tokens=100_000, cached_prompt_tokens=500_000)
+    with track("cost-run", "process_ticket", "T1"):
+        with track("cost-run", "code", "T1"):
+            record_llm(usage, "priced-model")
+        with track("cost-run", "review", "T1"):
+            record_llm(usage, "unpriced-model")
+
+    summary = get_run_metrics("cost-run").summary()
+    # 0.5M uncached at $3 + 0.5M cached at $0.3 + 0.1M output at $15
+    assert summary["tickets"]["T1"]["cost_usd"] == 3.15
+    assert summary["tickets"]["T1"]["input_tokens"] == 2_000_000
+    assert summary["nodes"]["review"]["cost_usd"] == 0.0
+    assert summary["cost_usd"] == 3.15
+    drop_run_metrics("cost-run")
@@ -0,0 +1,89 @@
+import json
+
+from pipeline.graph import nodes
+from pipeline.metrics import drop_run_metrics, get_run_metrics, track
+from pipeline.prompts import (
+    Part,
+    assemble,
+    compact_test_result,
+    estimate_tokens,
+    fair_shares,
+    shrink_spec,
+    truncate,
+)
+from pipeline.review_gate import GateResult
+
+
+def test_fair_shares_give_small_items_everything():
+    assert fair_shares([10, 500, 40], 200) == [10, 150, 40]
+    assert fair_shares([10, 20], 100) == [10, 20]
+
+
+def test_assemble_keeps_fixed_parts_and_fits_the_budget():
+    parts = [Part("task", "Do the thing. "), Part("spec", "x" * 4000, truncate)]
+    assert assemble("planner", parts, budget=0).text == "Do the thing. " + "x" * 4000
+
+    prompt = assemble("planner", parts, budget=200)
+    assert prompt.text.startswith("Do the thing. ")
+    assert "tokens omitted" in prompt.text
+    assert prompt.tokens <= 200
+    assert prompt.saved == estimate_tokens("Do the thing. " + "x" * 4000) - prompt.tokens
+
+
+def test_shrink_spec_keeps_every_heading():
+    spec = "\n\n".join(f"## Section {i}\n" + f"detail {i} " * 300 for i in range(5))
+    shrunk = shrink_spec(spec, 300)
+    assert estimate_tokens(shrunk) < estimate_tokens(spec) // 5
+    assert all(f"## Section {i}" in shrunk for i in range(5))
+
+
+def test_compact_test_result_keeps_failures_and_drops_what_the_gate_reports(monkeypatch):
+    monkeypatch.setattr(nodes.settings, "prompt_max_failures", 2)
+    result = {
+        "total": 40, "passed": 37, "failed": 3, "coverage": 91.0,
+        "failures": [{"id": f"t{i}", "message": "boom " * 100} for i in range(3)],
+        "file_coverage": {f"pkg/m{i}.py": 90.0 for i in range(200)},
+        "timings": {"wall": 3.2},
+        "baseline": {"coverage": 90.0, "file_coverage_delta": {"pkg/m1.py": 1.0}},
+    }
+    compact = compact_test_result(result, {"coverage_delta": {"pkg/m1.py": 1.0}})
+    assert [f["id"] for f in compact["failures"]] == ["t0", "t1"]
+    assert compact["failures_omitted"] == 1
+    assert len(compact["failures"][0]["message"]) == 300
+    assert "file_coverage" not in compact
+    assert "timings" not in compact
+    assert compact["baseline"] == {"coverage": 90.0}
+    assert compact_test_result(None) == {}
+
+
+def test_review_prompt_is_compacted_and_savings_are_recorded(monkeypatch):
+    ticket = nodes.Ticket(
+        gid="T1", title="t", dependencies=[], complexity="S", branch="feature/t1",
+        pr_number="7", test_result={
+            "total": 1, "passed": 1, "failed": 0, "coverage": 95.0,
+            "file_coverage": {f"pkg/m{i}.py": 90.0 for i in range(500)},
+        },
+        review_approved=None, retries=0, status="tested",
+    )
+    call = nodes._review_call(ticket, GateResult())
+    assert "file_coverage" not in call.prompt
+    assert json.dumps(ticket["test_result"]["file_coverage"]) not in call.prompt
+    assert call.saved > 2000
+
+    class Output:
+        token_usage = None
+
+        def __str__(self):
+            return '{"approved": true}'
+
+    class Pool:
+        def kickoff(self, _crew):
+            return Output()
+
+    monkeypatch.setattr(nodes, "get_agent_pool", lambda: Pool())
+    monkeypatch.setattr(nodes.settings, "cache_enabled", False)
+    call.build = lambda _: None
+    with track("prompt-run", "review", "T1"):
+        nodes._kickoff(call)
+    assert get_run_metrics("prompt-run").summary()["prompt_tokens_saved"] == call.saved
+    drop_run_metrics("prompt-run")
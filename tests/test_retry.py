@@ -0,0 +1,125 @@
+import json
+from collections import defaultdict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+import pipeline.graph.nodes as nodes
+import pipeline.graph.pipeline_graph as pg
+from pipeline.config import settings
+from pipeline.graph.state import Ticket
+from pipeline.graph.summary import final_tickets
+
+PLAN = json.dumps([
+    {"gid": "a", "title": "A", "dependencies": [], "complexity": "S"},
+    {"gid": "b", "title": "B", "dependencies": ["a"], "complexity": "S"},
+    {"gid": "c", "title": "C", "dependencies": [], "complexity": "S"},
+])
+PASSED = '{"total": 1, "passed": 1, "failed": 0, "coverage": 90.0}'
+FAILED = json.dumps({
+    "total": 1, "passed": 0, "failed": 1, "coverage": 90.0,
+    "failures": [{"id": "tests/test_x.py::test_x", "message": "assert 1 == 2"}],
+})
+
+
+def _gid(call):
+    return call.prompt.split("(GID: ", 1)[1].split(")", 1)[0] if call.node == "code" else None
+
+
+def test_failed_tickets_are_retried_without_replanning(monkeypatch):
+    for name, value in {
+        "dry_run": False, "cache_enabled": False, "review_gate": False,
+        "incremental_planning": False, "llm_notifier": False, "metrics_export_path": "",
+        "asana_access_token": "", "slack_bot_token": "", "retry_backoff_base": 0.0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    calls = defaultdict(list)
+
+    def fake_kickoff(call):
+        calls[call.node].append(call.prompt)
+        if call.node == "plan":
+            return PLAN
+        if call.node == "code":
+            gid = _gid(call)
+            calls[f"code:{gid}"].append(call.prompt)
+            return json.dumps({"branch": f"feature/{gid}", "pr_number": gid})
+        gid = call.context["branch"].split("/")[1]
+        if call.node == "test":
+            # a fails once, c never passes.
+            first_a = gid == "a" and len(calls["code:a"]) == 1
+            return FAILED if first_a or gid == "c" else PASSED
+        # b is rejected on its first review.
+        approved = not (gid == "b" and len(calls["code:b"]) == 1)
+        reason = "ok" if approved else "needs docstrings"
+        return json.dumps({"approved": approved, "reason": reason})
+
+    monkeypatch.setattr(nodes, "_kickoff", fake_kickoff)
+
+    graph = pg.build_graph(MemorySaver())
+    config = {"configurable": {"thread_id": "retry-test"}}
+    for _ in graph.stream(pg._initial_state("SPEC.md", "retry-test"), config=config):
+        pass
+    pg.drop_scheduler("retry-test")
+
+    snapshot = graph.get_state(config)
+    assert snapshot.next == ("human_gate",)
+    final = {t["gid"]: t for t in final_tickets(snapshot.values)}
+    assert {gid: t["status"] for gid, t in final.items()} == {
+        "a": "approved", "b": "approved", "c": "escalated",
+    }
+    assert final["c"]["retries"] == settings.max_ticket_retries
+
+    assert len(calls["plan"]) == 1
+    # b waits for a to pass: it first runs in the third wave, is rejected there and
+    # approved in the fourth.
+    assert [len(calls[f"code:{g}"]) for g in "abc"] == [2, 2, settings.max_ticket_retries]
+    retry_a = calls["code:a"][1]
+    assert "previous attempt failed: 1 test(s) failed" in retry_a
+    assert "tests/test_x.py::test_x: assert 1 == 2" in retry_a
+    assert "existing branch 'feature/a'" in retry_a
+    assert "review rejected: needs docstrings" in calls["code:b"][1]
+    assert "previous attempt" not in calls["code:b"][0]
+
+
+def test_backoff_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "retry_backoff_base", 1.0)
+    monkeypatch.setattr(settings, "retry_backoff_max", 3.0)
+    monkeypatch.setattr(pg.random, "uniform", lambda _low, high: high)
+
+    ticket = Ticket(gid="a", title="A", status="test_failed")
+    assert pg._backoff(ticket) == 0.0
+    waits = []
+    for retries in (1, 2, 3):
+        ticket.retries = retries
+        waits.append(pg._backoff(ticket))
+    assert waits == [1.0, 2.0, 3.0]
+    ticket.status = "blocked"
+    assert pg._backoff(ticket) == 0.0
+
+
+def test_dependents_of_an_escalated_ticket_are_blocked(monkeypatch):
+    monkeypatch.setattr(settings, "asana_access_token", "")
+    monkeypatch.setattr(settings, "slack_bot_token", "")
+    planned = [Ticket(gid="a", title="A"), Ticket(gid="b", title="B", dependencies=["a"]),
+               Ticket(gid="c", title="C", dependencies=["b"]), Ticket(gid="d", title="D")]
+    failed = Ticket(gid="a", title="A", status="test_failed",
+                    retries=settings.max_ticket_retries)
+
+    update = nodes.retry_node({
+        "run_id": "blocked-test", "tickets": planned, "failed_tickets": [failed],
+        "completed_tickets": [], "loop_count": 2,
+    })
+
+    assert {t["gid"]: t["status"] for t in update["failed_tickets"]} == {
+        "a": "escalated", "b": "blocked", "c": "blocked",
+    }
+    # d has not run yet; starting it is a new wave, not a retry.
+    assert update["loop_count"] == 2
+
+
+def test_previous_failure_tolerates_a_null_message():
+    ticket = Ticket(gid="a", title="A", status="test_failed", retries=1, test_result={
+        "total": 1, "passed": 0, "failed": 1,
+        "failures": [{"id": "tests/test_x.py::test_x", "message": None}],
+    })
+    assert "- tests/test_x.py::test_x: " in nodes._previous_failure(ticket)
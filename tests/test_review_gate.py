@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from pipeline import git_backend, review_gate
+from pipeline.baselines import BaselineStore
+from pipeline.config import settings
+from pipeline.graph import nodes
+from pipeline.graph.state import Ticket
+
+
+@pytest.fixture
+def gate_backend(backend, monkeypatch):
+    monkeypatch.setattr(review_gate, "get_git_backend", lambda: backend)
+    monkeypatch.setattr(settings, "review_max_diff_lines", 20)
+    return backend
+
+
+def _branch(backend, branch, files):
+    worktree = backend.checkout(branch, branch)
+    for path, content in files.items():
+        worktree.commit_file(path, f"add {path}", content=content)
+    worktree.flush()
+    backend.release(branch)
+
+
+def test_clean_change_passes(gate_backend):
+    _branch(gate_backend, "feature/ok", {"util.py": "def add(a, b):\n    return a + b\n"})
+    result = review_gate.pre_review("feature/ok", {"baseline": {"file_coverage_delta": {}}})
+
+    assert result.passed, result.reasons
+    assert result.stats["diff_lines"] == 2
+    assert result.stats["ruff_errors"] == 0
+
+
+def test_hard_rules_reject_without_the_reviewer(gate_backend, monkeypatch):
+    big = "".join(f"X_{i} = {i}\n" for i in range(30))
+    _branch(gate_backend, "feature/bad", {"big.py": big, "lint.py": "import os\n"})
+    test_result = {"baseline": {"file_coverage_delta": {"app.py": -5.0, "big.py": 0.0}}}
+
+    result = review_gate.pre_review("feature/bad", test_result)
+    assert not result.passed
+    assert result.reasons == [
+        "coverage dropped: app.py (-5.0%)",
+        "diff is 31 lines (limit 20)",
+        "ruff: 1 error(s), first F401 at lint.py:1",
+    ]
+
+    def no_llm(_call):
+        raise AssertionError("the Reviewer agent should not be called")
+
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(nodes, "_kickoff", no_llm)
+    state = {"run_id": "run-gate"}
+    ticket = {
+        "gid": "7", "title": "Big", "branch": "feature/bad", "pr_number": "1",
+        "test_result": test_result, "retries": 0, "status": "tested",
+    }
+    update = nodes.review_node(state, ticket)
+    assert update["failed_tickets"][0]["status"] == "review_rejected"
+    assert "diff is 31 lines" in ticket["review_reason"]
+    assert json.loads(nodes._rejection(result))["approved"] is False
+
+
+def test_coverage_drop_is_found_from_the_stored_runs(gate_backend, tmp_path, monkeypatch):
+    _branch(gate_backend, "feature/cov", {"app.py": "print('hi')\nprint('there')\n"})
+    store = BaselineStore(tmp_path / "baselines.sqlite", max_entries=10, max_bytes=0)
+    monkeypatch.setattr(review_gate, "get_baseline_store", lambda: store)
+    # What RunTestsTool left behind: the base's full run and the branch head's run.
+    base = gate_backend.mirror.rev_parse("origin/main")
+    head = gate_backend.mirror.rev_parse("refs/heads/feature/cov")
+    store.put(settings.github_repo, base, "all", "full",
+              {"failed": 0, "coverage": 100.0, "file_coverage": {"app.py": 100.0}})
+    store.put(settings.github_repo, head, "some", "incremental",
+              {"failed": 0, "file_coverage": {"app.py": 50.0}})
+
+    def agent(call):
+        assert call.node == "test", "the Reviewer agent should not be called"
+        return '{"total": 1, "passed": 1, "failed": 0, "coverage": 50.0}'
+
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(nodes, "_kickoff", agent)
+    state = {"run_id": "run-cov"}
+    ticket = Ticket(gid="8", title="Cov", branch="feature/cov", pr_number="2")
+    nodes.test_node(state, ticket)
+    assert "baseline" not in ticket["test_result"]
+
+    update = nodes.review_node(state, ticket)
+    assert update["failed_tickets"][0]["status"] == "review_rejected"
+    assert ticket["review_reason"] == "coverage dropped: app.py (-50.0%)"
+    store.close()
+
+
+@pytest.mark.usefixtures("gate_backend")
+def test_git_errors_leave_the_checks_to_the_reviewer():
+    result = review_gate.pre_review("feature/missing", None)
+    assert result.passed
+    assert result.stats["skipped"].startswith("git:")
+
+
+def test_unreachable_remote_leaves_the_checks_to_the_reviewer(tmp_path, monkeypatch):
+    monkeypatch.setattr(git_backend, "_backend", None)
+    monkeypatch.setattr(settings, "git_remote_url", str(tmp_path / "gone.git"))
+    monkeypatch.setattr(settings, "git_mirror_path", str(tmp_path / "mirror.git"))
+
+    result = review_gate.pre_review("feature/ok", None)
+    assert result.passed
+    assert result.stats["skipped"].startswith("git:")
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+import pipeline.graph.nodes as nodes
+import pipeline.graph.pipeline_graph as pg
+from pipeline.config import settings
+from pipeline.graph.scheduler import TicketScheduler
+
+
+def _ticket(gid, deps=(), complexity="M"):
+    return {"gid": gid, "title": gid, "dependencies": list(deps), "complexity": complexity,
+            "branch": None, "pr_number": None, "test_result": None,
+            "review_approved": None, "retries": 0, "status": "pending"}
+
+
+def test_topological_order_and_critical_path():
+    tickets = [
+        _ticket("docs", complexity="S"),
+        _ticket("api", deps=["db"], complexity="L"),
+        _ticket("db", complexity="M"),
+        _ticket("ui", deps=["api"], complexity="M"),
+    ]
+    scheduler = TicketScheduler(tickets, max_parallel=2)
+
+    assert scheduler.order.index("db") < scheduler.order.index("api") < scheduler.order.index("ui")
+    # db -> api -> ui is the critical path: 2 + 3 + 2
+    assert scheduler.priority["db"] == 7
+    assert scheduler.priority["docs"] == 1
+
+
+def test_ready_queue_prefers_critical_path():
+    tickets = [_ticket("docs", complexity="S"), _ticket("db"), _ticket("api", deps=["db"])]
+    scheduler = TicketScheduler(tickets, max_parallel=1)
+
+    assert scheduler.try_start("docs") is None
+    assert scheduler.try_start("db") is True
+    assert scheduler.try_start("docs") is None  # no free slot
+    scheduler.release("db", success=True)
+    assert scheduler.try_start("docs") is None  # api now outranks docs
+    assert scheduler.try_start("api") is True
+
+
+def test_failed_dependency_blocks_downstream():
+    tickets = [_ticket("a"), _ticket("b", deps=["a"]), _ticket("c", deps=["b"])]
+    scheduler = TicketScheduler(tickets, max_parallel=4)
+
+    assert scheduler.acquire("a")
+    scheduler.release("a", success=False)
+    assert scheduler.acquire("b") is False
+    assert scheduler.acquire("c") is False
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        TicketScheduler([_ticket("a", deps=["b"]), _ticket("b", deps=["a"])], max_parallel=2)
+
+
+def test_slot_is_reused_as_soon_as_one_finishes():
+    tickets = [_ticket("slow", complexity="XL"), _ticket("fast", complexity="S"),
+               _ticket("next", complexity="S")]
+    scheduler = TicketScheduler(tickets, max_parallel=2)
+    started: dict[str, float] = {}
+    durations = {"slow": 0.3, "fast": 0.05, "next": 0.05}
+
+    def branch(gid):
+        assert scheduler.acquire(gid, timeout=2)
+        started[gid] = time.monotonic()
+        time.sleep(durations[gid])
+        scheduler.release(gid, success=True)
+
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=branch, args=(g,)) for g in scheduler.order]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # "next" must not wait for "slow" to finish.
+    assert started["next"] - t0 < 0.25
+
+
+def test_branches_without_a_thread_do_not_stall_the_others():
+    # Two worker threads for four branches, as with a small LangGraph thread pool:
+    # "b" outranks the others but its branch only starts once a thread is free.
+    tickets = [_ticket("a", complexity="S"), _ticket("b", complexity="XL"),
+               _ticket("c", complexity="S"), _ticket("d", deps=["b"], complexity="S")]
+    scheduler = TicketScheduler(tickets, max_parallel=2)
+    finished = []
+
+    def branch(gid):
+        if scheduler.acquire(gid, timeout=2):
+            scheduler.release(gid, success=True)
+            finished.append(gid)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(branch, ["a", "c", "b", "d"]))
+
+    assert sorted(finished) == ["a", "b", "c", "d"]
+
+
+def test_graph_with_more_tickets_than_threads_finishes(tmp_path, monkeypatch):
+    # "b" outranks "a" and "c", which take the graph's two threads first.
+    plan = [_ticket("a", complexity="S"), _ticket("c", complexity="S"),
+            _ticket("b", complexity="XL"), _ticket("d", deps=["b"], complexity="S"),
+            _ticket("e", complexity="S"), _ticket("f", complexity="S")]
+    spec = tmp_path / "SPEC.md"
+    spec.write_text("spec", encoding="utf-8")
+    monkeypatch.setattr(settings, "dry_run", True)
+    monkeypatch.setattr(settings, "max_parallel_coders", 3)
+    monkeypatch.setattr(nodes, "_DRY_PLAN", json.dumps(plan))
+
+    graph = pg.build_graph(MemorySaver())
+    config = {"configurable": {"thread_id": "threads-test"}, "max_concurrency": 2}
+    run = threading.Thread(
+        target=lambda: list(graph.stream(pg._initial_state(str(spec), "threads-test"), config)),
+        daemon=True,
+    )
+    run.start()
+    run.join(timeout=10)
+
+    assert not run.is_alive(), "branches deadlocked waiting for a ticket without a thread"
+    done = {t["gid"] for t in graph.get_state(config).values["completed_tickets"]}
+    assert done == {"a", "b", "c", "d", "e", "f"}
+    pg.drop_scheduler("threads-test")
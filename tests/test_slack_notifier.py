@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pipeline import logger as run_log
+from pipeline.slack_notifier import SlackClient, SlackNotifier
+
+
+class FakeSlack(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        method = self.path.rsplit("/", 1)[-1]
+        if server.rate_limit_next:
+            server.rate_limit_next -= 1
+            self._reply(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": "0"})
+            return
+
+        server.calls.append((method, body))
+        if method == "chat.postMessage":
+            server.next_ts += 1
+            self._reply(200, {"ok": True, "channel": "C123", "ts": f"{server.next_ts}.0001"})
+            return
+        if method == "chat.update":
+            server.messages[body["ts"]] = body["text"]
+            self._reply(200, {"ok": True, "channel": body["channel"], "ts": body["ts"]})
+            return
+        self._reply(200, {"ok": False, "error": "unknown_method"})
+
+    def _reply(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slack():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSlack)
+    server.calls, server.messages = [], {}
+    server.rate_limit_next, server.next_ts = 0, 1000
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = SlackClient("xoxb-test", f"http://127.0.0.1:{server.server_address[1]}/api/",
+                         requests_per_minute=6000)
+    yield server, client
+    server.shutdown()
+
+
+def test_status_changes_are_coalesced_into_one_edited_message(slack):
+    server, client = slack
+    notifier = SlackNotifier(client, "#dev", interval=0.2)
+    notifier.start()
+    for status in ("in_progress", "tested", "approved"):
+        notifier.submit("run-1", "1", "Login page", status)
+        notifier.submit("run-1", "2", "Signup page", status)
+    notifier.flush(5)
+    notifier.submit("run-1", "2", "Signup page", "review_rejected")
+    notifier.flush(5)
+    notifier.stop()
+
+    assert [method for method, _ in server.calls] == ["chat.postMessage", "chat.update"]
+    assert server.calls[0][1]["channel"] == "#dev"
+    assert "2/2 tickets approved" in server.calls[0][1]["text"]
+    text = server.messages["1001.0001"]
+    assert "1/2 tickets approved" in text
+    assert "Signup page (review_rejected)" in text
+    assert server.calls[1][1]["channel"] == "C123"
+
+
+def test_debounce_waits_for_the_interval(slack):
+    server, client = slack
+    notifier = SlackNotifier(client, "#dev", interval=0.3)
+    notifier.start()
+    notifier.submit("run-1", "1", "Login page", "in_progress")
+    time.sleep(0.1)  # received, but the interval has not passed
+    assert server.calls == []
+    notifier.stop()
+    assert [method for method, _ in server.calls] == ["chat.postMessage"]
+
+
+def test_replies_go_in_the_run_thread_and_rate_limits_are_retried(slack):
+    server, client = slack
+    server.rate_limit_next = 1
+    notifier = SlackNotifier(client, "#dev", interval=10)
+    notifier.start()
+    notifier.submit("run-1", "1", "Login page", "approved")
+    notifier.reply("run-1", "All done")
+    notifier.stop()
+
+    (_, parent), (_, reply) = server.calls
+    assert "thread_ts" not in parent
+    assert reply == {"channel": "#dev", "text": "All done", "thread_ts": "1001.0001"}
+
+
+class DownSlack:
+    def post(self, *_args, **_kwargs):
+        raise OSError("connection refused")
+
+    def update(self, *_args):
+        raise OSError("connection refused")
+
+
+def test_failures_are_written_to_the_run_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_log, "LOG_DIR", tmp_path)
+    notifier = SlackNotifier(DownSlack(), "#dev", interval=10)
+    notifier.start()
+    notifier.submit("slack-down", "1", "Login page", "approved")
+    notifier.reply("slack-down", "All done")
+    notifier.stop()
+    run_log.flush_logs()
+
+    lines = [json.loads(line) for path in tmp_path.iterdir()
+             for line in path.read_text(encoding="utf-8").splitlines()]
+    events = [e["event"] for e in lines if e["run_id"] == "slack-down"]
+    # The reply tries once more to post its parent message first.
+    assert events == ["slack_update_failed", "slack_update_failed", "slack_reply_failed"]
+    assert lines[0]["data"] == {"error": "connection refused"}
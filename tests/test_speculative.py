@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import pipeline.graph.nodes as nodes
+from pipeline.config import settings
+from pipeline.graph.state import Ticket
+from pipeline.review_gate import GateResult
+
+PASSED = '{"total": 1, "passed": 1, "failed": 0, "coverage": 90.0}'
+FAILED = '{"total": 1, "passed": 0, "failed": 1, "failures": [{"id": "t", "message": "boom"}]}'
+APPROVED = '{"approved": true, "reason": "ok"}'
+REJECTED = '{"approved": false, "reason": "needs docstrings"}'
+
+
+@pytest.fixture(autouse=True)
+def live(monkeypatch):
+    for name, value in {
+        "dry_run": False, "cache_enabled": False, "review_gate": False,
+        "asana_access_token": "", "slack_bot_token": "",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def _ticket():
+    return Ticket(
+        gid="T1", title="t", dependencies=[], complexity="S", branch="feature/t1",
+        pr_number="1", test_result=None, review_approved=None, retries=0, status="in_progress",
+    )
+
+
+def _fake_agents(monkeypatch, outputs, delays):
+    """Answer each stage with ``outputs[node]`` after ``delays[node]`` seconds."""
+    started, cancelled = [], []
+
+    def kickoff(call):
+        started.append(call.node)
+        time.sleep(delays[call.node])
+        return outputs[call.node]
+
+    async def akickoff(call):
+        started.append(call.node)
+        try:
+            await asyncio.sleep(delays[call.node])
+        except asyncio.CancelledError:
+            cancelled.append(call.node)
+            raise
+        return outputs[call.node]
+
+    monkeypatch.setattr(nodes, "_kickoff", kickoff)
+    monkeypatch.setattr(nodes, "_akickoff", akickoff)
+    return started, cancelled
+
+
+def _run(mode, ticket):
+    task = {"run_id": "spec-run", "ticket": ticket}
+    if mode == "sync":
+        return nodes.speculative_test_review(task, ticket)
+    return asyncio.run(nodes.aspeculative_test_review(task, ticket))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_review_runs_alongside_tests(monkeypatch, mode):
+    _fake_agents(monkeypatch, {"test": PASSED, "review": APPROVED}, {"test": 0.2, "review": 0.2})
+    ticket = _ticket()
+    start = time.perf_counter()
+    res = _run(mode, ticket)
+    assert time.perf_counter() - start < 0.35
+    assert res == {"completed_tickets": [ticket]}
+    assert ticket["status"] == "approved"
+    assert ticket["test_result"]["passed"] == 1
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_failing_tests_cancel_the_review(monkeypatch, mode):
+    _, cancelled = _fake_agents(
+        monkeypatch, {"test": FAILED, "review": APPROVED}, {"test": 0.01, "review": 0.5}
+    )
+    ticket = _ticket()
+    res = _run(mode, ticket)
+    assert res["failed_tickets"] == [ticket]
+    assert (ticket["status"], ticket["retries"]) == ("test_failed", 1)
+    assert ticket["review_approved"] is None
+    if mode == "async":
+        assert cancelled == ["review"]
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_rejection_cancels_the_tests(monkeypatch, mode):
+    _, cancelled = _fake_agents(
+        monkeypatch, {"test": PASSED, "review": REJECTED}, {"test": 0.5, "review": 0.01}
+    )
+    ticket = _ticket()
+    start = time.perf_counter()
+    res = _run(mode, ticket)
+    assert time.perf_counter() - start < 0.4
+    assert res["failed_tickets"] == [ticket]
+    assert (ticket["status"], ticket["test_result"]) == ("review_rejected", None)
+    if mode == "async":
+        assert cancelled == ["test"]
+
+
+def test_coverage_drop_rejects_at_the_join(monkeypatch):
+    monkeypatch.setattr(settings, "review_gate", True)
+    monkeypatch.setattr(nodes, "pre_review", lambda *_: GateResult())
+    tested = json.dumps({
+        **json.loads(PASSED), "baseline": {"file_coverage_delta": {"app.py": -2.0}},
+    })
+    _fake_agents(monkeypatch, {"test": tested, "review": APPROVED}, {"test": 0, "review": 0})
+    ticket = _ticket()
+    _run("sync", ticket)
+    assert ticket["status"] == "review_rejected"
+    assert ticket["review_reason"] == "coverage dropped: app.py (-2.0%)"
+
+
+def test_losing_stage_is_kept_out_of_the_cache(monkeypatch):
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    cache = MagicMock()
+    cache.get.return_value = None
+    monkeypatch.setattr(nodes, "get_response_cache", lambda: cache)
+
+    class Pool:
+        def kickoff(self, crew):
+            if crew == "test":
+                time.sleep(0.2)
+                return PASSED
+            return REJECTED
+
+    monkeypatch.setattr(nodes, "get_agent_pool", Pool)
+    monkeypatch.setattr(nodes, "_test_crew", lambda _: "test")
+    monkeypatch.setattr(nodes, "_review_crew", lambda _: "review")
+    stage_done = threading.Event()
+    test_output = nodes._test_output
+
+    def tracked_test_output(ticket):
+        try:
+            return test_output(ticket)
+        finally:
+            stage_done.set()
+
+    monkeypatch.setattr(nodes, "_test_output", tracked_test_output)
+    ticket = _ticket()
+    res = _run("sync", ticket)
+
+    assert res["failed_tickets"] == [ticket]
+    assert stage_done.wait(2)
+    cache.put.assert_not_called()  # the tests passed, but after the review had rejected
@@ -0,0 +1,25 @@
+from pipeline.startup import ENTRY_MODULE, by_package, parse_importtime, profile_imports
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.decoder
+import time:       300 |        400 |   json
+import time:      1000 |       1400 | pipeline.config
+import time:      5000 |       5000 |   crewai.agent
+import time:      2000 |       7000 | crewai
+"""
+
+
+def test_parse_importtime_groups_by_top_level_import():
+    config, crewai = parse_importtime(SAMPLE)
+    assert [t.module for t in config] == ["json.decoder", "json", "pipeline.config"]
+    assert [t.depth for t in config] == [2, 1, 0]
+    assert crewai[-1].cumulative_us == 7000
+    assert by_package(config + crewai) == {"crewai": 7000, "pipeline.config": 1000, "json": 400}
+
+
+def test_entry_point_does_not_import_agent_frameworks():
+    (startup,) = profile_imports(ENTRY_MODULE)
+    packages = {t.package for t in startup}
+    assert "pipeline.graph" in packages
+    assert packages.isdisjoint({"crewai", "anthropic", "langchain_anthropic", "langgraph"})
@@ -1,4 +1,6 @@
-from pipeline.graph.state import Ticket
+import pytest
+
+from pipeline.graph.state import Ticket, merge_by_gid
 
 
 def test_ticket_structure():
@@ -16,3 +18,23 @@ def test_ticket_structure():
     )
     assert ticket["gid"] == "123"
     assert ticket["status"] == "pending"
+
+
+def test_ticket_json_round_trip_and_dict_access():
+    ticket = Ticket(gid="1", title="Login", dependencies=["0"],
+                    test_result={"total": 3, "passed": 3, "failed": 0, "coverage": 91.5})
+    ticket["status"] = "approved"
+
+    assert Ticket.from_json(ticket.to_json()) == ticket
+    assert ticket.get("review_reason") == ""
+    assert ticket.get("missing", "x") == "x"
+    with pytest.raises(KeyError):
+        ticket["missing"] = 1
+
+
+def test_ticket_results_are_replaced_by_gid():
+    first = [Ticket(gid="1", title="a", status="review_rejected"), Ticket(gid="2", title="b")]
+    retry = [Ticket(gid="1", title="a", status="review_rejected", retries=1)]
+
+    merged = merge_by_gid(first, retry)
+    assert [(t["gid"], t["retries"]) for t in merged] == [("1", 1), ("2", 0)]
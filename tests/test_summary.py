@@ -0,0 +1,81 @@
+import pipeline.graph.nodes as nodes
+from pipeline.config import settings
+from pipeline.graph.nodes import notify_node
+from pipeline.graph.summary import final_tickets, progress_bar, render_summary
+
+
+def _ticket(gid, title, status, **extra):
+    return {
+        "gid": gid, "title": title, "dependencies": [], "complexity": "low",
+        "branch": None, "pr_number": None, "test_result": None,
+        "review_approved": None, "retries": 0, "status": status, **extra,
+    }
+
+
+def _state():
+    login = _ticket("1", "Login", "pending")
+    signup = _ticket("2", "Signup", "pending")
+    search = _ticket("3", "Search", "pending")
+    return {
+        "spec_path": "SPEC.md",
+        "run_id": "run-1",
+        "tickets": [login, signup, search],
+        "completed_tickets": [
+            _ticket("1", "Login", "in_progress"),
+            _ticket("1", "Login", "approved", test_result={"coverage": 90.0}),
+            _ticket("2", "Signup", "approved", test_result={"coverage": 80.0}),
+        ],
+        "failed_tickets": [
+            _ticket("2", "Signup", "review_rejected", review_reason="too big"),
+            _ticket("3", "Search", "test_failed", test_result={
+                "failed": 2, "failures": [{"id": "tests/test_search.py::test_empty"}],
+            }),
+        ],
+        "human_approved": True,
+        "slack_posted": False,
+        "loop_count": 1,
+    }
+
+
+def test_final_tickets_prefer_approval_over_earlier_failures():
+    statuses = {t["gid"]: t["status"] for t in final_tickets(_state())}
+    assert statuses == {"1": "approved", "2": "approved", "3": "test_failed"}
+
+
+def test_render_summary():
+    summary = render_summary(_state())
+    assert summary.splitlines() == [
+        "*Pipeline run run-1*",
+        f"`{progress_bar(2, 3)}` 2/3 tickets approved",
+        "Average coverage: 85.0%",
+        "Failed (1):",
+        "• Search: 2 test(s) failed, first: tests/test_search.py::test_empty",
+    ]
+    assert progress_bar(1, 4, width=8) == "██░░░░░░"
+
+
+def test_notify_uses_the_template_unless_the_llm_is_requested(monkeypatch, capsys):
+    monkeypatch.setattr(settings, "dry_run", True)
+    monkeypatch.setattr(settings, "llm_notifier", False)
+    monkeypatch.setattr(settings, "metrics_export_path", "")
+    assert notify_node(_state()) == {"slack_posted": True}
+    assert "2/3 tickets approved" in capsys.readouterr().out
+
+
+def test_notify_counts_final_outcomes(monkeypatch):
+    monkeypatch.setattr(settings, "dry_run", True)
+    monkeypatch.setattr(settings, "metrics_export_path", "")
+    events = {}
+
+    class Recorder:
+        def log(self, event, _actor, data):
+            events[event] = data
+
+    monkeypatch.setattr(nodes, "get_run_logger", lambda _run_id: Recorder())
+    nodes._notify_update(_state())
+
+    # Signup was rejected once and then approved: it is not a failure.
+    assert (events["notify_complete"]["completed"], events["notify_complete"]["failed"]) == (2, 1)
+    prompt = nodes._notify_call(_state()).prompt
+    assert "Completed tickets: ['Login', 'Signup']" in prompt
+    assert "Failed tickets: ['Search']" in prompt
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import pipeline.graph.nodes as nodes
+from pipeline.baselines import BaselineStore
+from pipeline.config import settings
+from pipeline.graph.state import Ticket
+from pipeline.parsing import TEST_RESULT, parse_json_result
+from pipeline.tester_backend import (
+    TestMap,
+    record_comparison,
+    run_suite,
+    select,
+    shard,
+    take_comparison,
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "calc.py").write_text("def add(a, b):\n    return a + b\n", encoding="utf-8")
+    (tmp_path / "other.py").write_text("def mul(a, b):\n    return a * b\n", encoding="utf-8")
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    (tests / "test_calc.py").write_text(
+        "from calc import add\n\ndef test_add():\n    assert add(1, 2) == 3\n", encoding="utf-8"
+    )
+    (tests / "test_other.py").write_text(
+        "from other import mul\n\n"
+        "def test_mul():\n    assert mul(2, 2) == 4\n\n"
+        "def test_bad():\n    assert mul(2, 2) == 5\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+def test_select_uses_map_and_falls_back_to_full(tmp_path):
+    test_map = TestMap(tmp_path / "map.json")
+    collected = ["tests/test_a.py::test_x", "tests/test_b.py::test_y", "tests/test_c.py::test_new"]
+    assert select(["a.py"], collected, test_map) == (collected, "full")  # no map yet
+
+    test_map.update(
+        {"a.py": {"tests/test_a.py::test_x"}, "b.py": {"tests/test_b.py::test_y"}}, set(), full=True
+    )
+    assert select(["a.py"], collected, test_map) == (
+        ["tests/test_a.py::test_x", "tests/test_c.py::test_new"], "incremental"
+    )
+    assert select(["conftest.py"], collected, test_map)[1] == "full"
+
+
+def test_shard_keeps_modules_together():
+    ids = ["a.py::1", "a.py::2", "a.py::3", "b.py::1", "c.py::1"]
+    shards = shard(ids, 2)
+    assert sorted(len(s) for s in shards) == [2, 3]
+    assert any(s == ["a.py::1", "a.py::2", "a.py::3"] for s in shards)
+
+
+def test_run_suite_full_then_incremental(project, monkeypatch):
+    monkeypatch.setattr(settings, "test_shards", 2)
+    test_map = TestMap(project / "map.json")
+    store = BaselineStore(project / "baselines.sqlite", max_entries=10, max_bytes=0)
+
+    full = run_suite(project, None, test_map, store, "repo", "sha1")
+    assert (full["total"], full["passed"], full["failed"]) == (3, 2, 1)
+    assert full["selection"] == "full"
+    assert full["coverage"] == 100.0
+    assert len(full["timings"]["shards"]) == 2
+    assert test_map.files["calc.py"] == {"tests/test_calc.py::test_add"}
+
+    incremental = run_suite(project, ["calc.py"], TestMap(project / "map.json"))
+    assert incremental["selection"] == "incremental"
+    assert (incremental["total"], incremental["failed"]) == (1, 0)
+
+    again = run_suite(project, None, test_map, store, "repo", "sha1")
+    assert again["cached"] is True
+    assert again["total"] == 3
+    assert store.baseline("repo", "sha1")["failed"] == 1
+
+
+def test_tool_comparison_reaches_the_ticket_without_the_agent(monkeypatch):
+    comparison = {"sha": "base1", "coverage": 90.0, "failed": 0,
+                  "file_coverage_delta": {"calc.py": -2.0}, "coverage_dropped": True}
+    record_comparison("feature/cov", comparison)
+    monkeypatch.setattr(settings, "dry_run", False)
+    monkeypatch.setattr(nodes, "_kickoff", lambda _call: '{"total": 1, "passed": 1, "failed": 0}')
+    ticket = Ticket(gid="C1", title="cov", branch="feature/cov")
+
+    nodes.test_node({"run_id": "cov-run"}, ticket)
+    assert ticket["test_result"]["baseline"] == comparison
+    assert take_comparison("feature/cov") is None
+    assert parse_json_result(json.dumps(ticket["test_result"]), TEST_RESULT) is not None
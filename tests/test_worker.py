@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+import pipeline.graph.pipeline_graph as pg
+import pipeline.worker as worker_module
+from pipeline import jobqueue
+from pipeline import logger as run_log
+from pipeline.config import settings
+from pipeline.graph.summary import final_tickets
+from pipeline.jobqueue import SqliteJobQueue
+from pipeline.worker import Worker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SqliteJobQueue(tmp_path / "jobs.sqlite", lease_seconds=0.05, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_expired_lease_requeues_the_job(queue):
+    queue.put("j1", "run", "a", {"n": 1})
+    first = queue.claim("w1")
+    assert (first.id, first.status, first.attempts) == ("j1", "leased", 1)
+    assert queue.claim("w2") is None
+    assert queue.heartbeat("j1", "w1")
+
+    time.sleep(0.1)  # w1 crashed: no heartbeat
+    second = queue.claim("w2")
+    assert (second.id, second.worker, second.attempts) == ("j1", "w2", 2)
+    assert not queue.heartbeat("j1", "w1")
+    assert not queue.complete("j1", "w1", {"stale": True})
+    assert queue.complete("j1", "w2", {"ok": True})
+    assert queue.get("j1").result == {"ok": True}
+
+    queue.put("j1", "run", "a", {"n": 1})  # a resumed run finds the finished job
+    assert queue.get("j1").status == "done"
+
+
+def test_job_fails_after_max_attempts_and_can_be_requeued(queue):
+    queue.put("j1", "run", "a", {})
+    queue.claim("w1")
+    time.sleep(0.1)
+    queue.claim("w2")
+    time.sleep(0.1)
+    assert queue.claim("w3") is None
+    job = queue.get("j1")
+    assert job.status == "failed"
+    assert job.error == "lease expired 2 time(s), last held by w2"
+
+    queue.put("j1", "run", "a", {})
+    assert (queue.get("j1").status, queue.claim("w3").attempts) == ("queued", 1)
+
+
+def test_release_hands_a_job_back(queue):
+    queue.put("j1", "run", "a", {})
+    queue.claim("w1")
+    assert queue.release("j1", "w1")
+    job = queue.get("j1")
+    assert (job.status, job.worker, job.attempts) == ("queued", None, 0)
+
+
+def test_finished_jobs_do_not_keep_their_run_logger(queue, monkeypatch):
+    monkeypatch.setattr(worker_module, "run_job", lambda _job: {"completed_tickets": []})
+    queue.put("j1", "logger-run", "a", {})
+    Worker(queue, name="w").execute(queue.claim("w"))
+    assert queue.get("j1").status == "done"
+    assert "logger-run" not in run_log._loggers
+
+
+def test_pipeline_runs_ticket_branches_on_workers(tmp_path, monkeypatch):
+    plan = (
+        '[{"gid": "a", "title": "A", "dependencies": [], "complexity": "S"},'
+        ' {"gid": "b", "title": "B", "dependencies": ["a"], "complexity": "S"},'
+        ' {"gid": "c", "title": "C", "dependencies": [], "complexity": "S"}]'
+    )
+    monkeypatch.setattr("pipeline.graph.nodes._DRY_PLAN", plan)
+    for name, value in {
+        "dry_run": True, "ticket_executor": "queue", "job_poll_seconds": 0.01,
+        "job_queue_path": str(tmp_path / "jobs.sqlite"), "metrics_export_path": "",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setattr(jobqueue, "_queue", None)
+
+    worker = Worker(jobqueue.get_job_queue(), name="w", concurrency=2)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        graph = pg.build_graph(MemorySaver())
+        config = {"configurable": {"thread_id": "worker-test"}}
+        for _ in graph.stream(pg._initial_state("SPEC.md", "worker-test"), config=config):
+            pass
+    finally:
+        worker.stop()
+        thread.join()
+        pg.drop_scheduler("worker-test")
+
+    final = {t["gid"]: t["status"] for t in final_tickets(graph.get_state(config).values)}
+    assert final == {"a": "approved", "b": "approved", "c": "approved"}
+    assert worker.processed == 3
+    assert jobqueue.get_job_queue().counts() == {"done": 3}
+    jobqueue.get_job_queue().close()